@@ -0,0 +1,47 @@
+# Команда 'build_openapi_schema' строит схему OpenAPI и записывает ее в файл
+# settings.OPENAPI_SCHEMA_FILE (или --file), см. api/spectacular/schema.py.
+# Запускается при сборке или развертывании, чтобы процессы не строили схему
+# при запуске или первом запросе.
+#
+#   python manage.py build_openapi_schema
+#   python manage.py build_openapi_schema --check   # файл совпадает с кодом
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.spectacular.schema import dump_schema, generate_schema, schema_hash
+
+
+class Command(BaseCommand):
+    help = 'Построение готовой схемы OpenAPI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Путь к файлу схемы (по умолчанию OPENAPI_SCHEMA_FILE)')
+        parser.add_argument('--check', action='store_true',
+                            help='Только проверить, что файл совпадает с текущим кодом')
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.OPENAPI_SCHEMA_FILE
+        if not path:
+            raise CommandError('Не задан путь к файлу схемы (OPENAPI_SCHEMA_FILE или --file).')
+
+        schema = generate_schema()
+        content = dump_schema(schema)
+        if options['check']:
+            try:
+                with open(path, 'rb') as file:
+                    current = file.read()
+            except FileNotFoundError:
+                raise CommandError(f'Файл схемы {path} не найден.')
+            if current != content:
+                raise CommandError(f'Файл схемы {path} устарел: выполните build_openapi_schema.')
+            self.stdout.write(self.style.SUCCESS('Файл схемы совпадает с текущим кодом'))
+            return
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+        self.stdout.write(f'Схема записана в {path} ({len(content)} байт, хэш {schema_hash(schema)})')
@@ -0,0 +1,167 @@
+# Команда 'profile_startup' измеряет холодный запуск процесса: запускает
+# отдельный интерпретатор с -X importtime, выполняет в нем те же шаги, что и
+# воркер до первого ответа, и выводит:
+#
+#   - время этапов: загрузка настроек, django.setup(), импорт URLconf
+#     (представления и сериализаторы), загрузка схемы OpenAPI;
+#   - время по приложениям: импорт модулей приложения и его ready();
+#     модули, не относящиеся к приложениям, группируются по пакету верхнего
+#     уровня;
+#   - самые медленные модули (собственное время импорта).
+#
+#   python manage.py profile_startup
+#   python manage.py profile_startup --disable-apps djoser,admin --save startup.json
+#
+# --disable-apps передается дочернему процессу как DISABLED_APPS, что
+# позволяет сравнить профили без изменения окружения (см. settings.OPTIONAL_APPS).
+
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Код дочернего процесса. Результат выводится последней строкой stdout.
+# Аргумент --schema включает загрузку схемы OpenAPI.
+CHILD = '''
+import json, sys, time
+timings = {}
+ready_times = {}
+started = time.perf_counter()
+
+import django
+from django.apps.config import AppConfig
+create = AppConfig.create.__func__
+
+def timed_create(cls, entry):
+    app_config = create(cls, entry)
+    ready = app_config.ready
+    def timed_ready():
+        ready_started = time.perf_counter()
+        ready()
+        ready_times[app_config.name] = time.perf_counter() - ready_started
+    app_config.ready = timed_ready
+    return app_config
+
+AppConfig.create = classmethod(timed_create)
+
+point = time.perf_counter()
+from django.conf import settings
+settings.INSTALLED_APPS
+timings['settings'] = time.perf_counter() - point
+
+point = time.perf_counter()
+django.setup()
+timings['setup'] = time.perf_counter() - point
+
+point = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+timings['urlconf'] = time.perf_counter() - point
+
+if '--schema' in sys.argv:
+    from django.apps import apps
+    if apps.is_installed('drf_spectacular'):
+        point = time.perf_counter()
+        from api.spectacular.schema import get_schema_cache
+        get_schema_cache().hash
+        timings['schema'] = time.perf_counter() - point
+
+timings['total'] = time.perf_counter() - started
+from django.apps import apps
+print(json.dumps({
+    'timings': timings,
+    'ready': ready_times,
+    'apps': [app_config.name for app_config in apps.get_app_configs()],
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Профиль холодного запуска: время этапов, приложений и модулей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--disable-apps', help='Значение DISABLED_APPS для дочернего процесса')
+        parser.add_argument('--schema', action='store_true', help='Также загрузить или построить схему OpenAPI')
+        parser.add_argument('--top', type=int, default=20, help='Количество самых медленных модулей в отчете')
+        parser.add_argument('--save', help='Сохранить результаты в JSON-файл')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        if options['disable_apps'] is not None:
+            env['DISABLED_APPS'] = options['disable_apps']
+
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD] + (['--schema'] if options['schema'] else []),
+            env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Дочерний процесс завершился с ошибкой:\n{result.stderr[-4000:]}')
+
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        modules = self._parse_importtime(result.stderr)
+        report['by_app'] = self._group(modules, report['apps'], report['ready'])
+        report['modules'] = sorted(modules, key=lambda module: module['self_ms'], reverse=True)
+
+        self._print(report, options['top'])
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результаты сохранены в {options["save"]}')
+
+    # Строки -X importtime: "import time: <self us> | <cumulative us> | <имя>"
+    @staticmethod
+    def _parse_importtime(output):
+        modules = []
+        for line in output.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            parts = line[len('import time:'):].split('|')
+            if len(parts) != 3 or not parts[0].strip().isdigit():
+                continue
+            modules.append({
+                'name': parts[2].strip(),
+                'self_ms': int(parts[0]) / 1000,
+                'cumulative_ms': int(parts[1]) / 1000,
+            })
+        return modules
+
+    # Собственное время модулей суммируется по приложению (самому длинному
+    # совпадающему имени пакета) или по пакету верхнего уровня
+    @staticmethod
+    def _group(modules, app_names, ready_times):
+        groups = defaultdict(lambda: {'import_ms': 0.0, 'ready_ms': 0.0, 'modules': 0, 'app': False})
+        by_length = sorted(app_names, key=len, reverse=True)
+        for module in modules:
+            name = module['name']
+            app = next((app for app in by_length if name == app or name.startswith(app + '.')), None)
+            group = groups[app or name.split('.')[0]]
+            group['app'] = app is not None
+            group['import_ms'] += module['self_ms']
+            group['modules'] += 1
+        for app, seconds in ready_times.items():
+            groups[app]['ready_ms'] = seconds * 1000
+            groups[app]['app'] = True
+        for group in groups.values():
+            group['total_ms'] = round(group['import_ms'] + group['ready_ms'], 3)
+            group['import_ms'] = round(group['import_ms'], 3)
+            group['ready_ms'] = round(group['ready_ms'], 3)
+        return dict(sorted(groups.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+    def _print(self, report, top):
+        self.stdout.write('Этапы запуска:')
+        for name, seconds in report['timings'].items():
+            self.stdout.write(f'  {name:<12}{seconds * 1000:>10.1f} ms')
+
+        self.stdout.write(f'\n{"приложение / пакет":<40}{"импорт ms":>11}{"ready ms":>10}{"модулей":>9}')
+        for name, group in list(report["by_app"].items())[:top]:
+            label = name if group['app'] else f'({name})'
+            self.stdout.write(
+                f'{label:<40}{group["import_ms"]:>11.1f}{group["ready_ms"]:>10.1f}{group["modules"]:>9}'
+            )
+
+        self.stdout.write(f'\n{"модуль":<60}{"свое ms":>10}{"всего ms":>10}')
+        for module in report['modules'][:top]:
+            self.stdout.write(f'{module["name"]:<60}{module["self_ms"]:>10.1f}{module["cumulative_ms"]:>10.1f}')
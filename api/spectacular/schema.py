@@ -0,0 +1,99 @@
+# Модуль 'schema.py' отвечает за готовую схему OpenAPI.
+#
+# drf-spectacular строит схему, обходя все представления и сериализаторы,
+# и делает это на каждый запрос к /schema/. Здесь схема строится один раз:
+#
+#   - при сборке или развертывании командой build_openapi_schema, которая
+#     записывает ее в файл settings.OPENAPI_SCHEMA_FILE. Если путь задан и
+#     файл есть, процесс только читает его при первом запросе (за
+#     соответствие файла коду отвечает развертывание, см. --check);
+#   - если путь не задан (по умолчанию) или файла нет, схема строится при
+#     первом запросе и хранится в памяти процесса.
+#
+# Схема в обоих случаях проходит через JSON, поэтому ответы совпадают.
+# Готовые тела ответов (YAML, JSON) кэшируются по формату, а ETag строится
+# по хэшу содержимого схемы: клиенты, в том числе Swagger UI, получают 304
+# или кэшируют схему по адресу с ?v=<хэш> без повторной загрузки.
+
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from drf_spectacular.settings import spectacular_settings
+
+
+# Строит схему для текущего кода (как команда spectacular) и приводит ее к
+# JSON-совместимым типам
+def generate_schema():
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(urlconf=spectacular_settings.SERVE_URLCONF)
+    schema = generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+    return json.loads(OpenApiJsonRenderer().render(schema))
+
+
+# Содержимое файла схемы
+def dump_schema(schema):
+    return json.dumps(schema, ensure_ascii=False, indent=2).encode('utf-8') + b'\n'
+
+
+# Хэш содержимого схемы (не зависит от форматирования файла)
+def schema_hash(schema):
+    canonical = json.dumps(schema, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+# Класс, отвечающий за схему процесса и готовые тела ответов
+class SchemaCache:
+    def __init__(self, path):
+        self.path = path
+        self._schema = None
+        self._hash = None
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._schema is None:
+                if self.path and os.path.exists(self.path):
+                    with open(self.path, 'rb') as file:
+                        schema = json.load(file)
+                else:
+                    schema = generate_schema()
+                self._hash = schema_hash(schema)
+                self._schema = schema
+
+    @property
+    def hash(self):
+        if self._schema is None:
+            self._load()
+        return self._hash
+
+    # Возвращает тело ответа для рендерера (форматы кэшируются по media type)
+    def render(self, renderer, renderer_context=None):
+        if self._schema is None:
+            self._load()
+        key = (type(renderer), renderer.media_type)
+        body = self._bodies.get(key)
+        if body is None:
+            body = renderer.render(self._schema, renderer.media_type, renderer_context)
+            self._bodies[key] = body
+        return body
+
+    def clear(self):
+        with self._lock:
+            self._schema = None
+            self._hash = None
+            self._bodies = {}
+
+
+_schema_cache = None
+
+
+def get_schema_cache():
+    global _schema_cache
+    if _schema_cache is None:
+        _schema_cache = SchemaCache(settings.OPENAPI_SCHEMA_FILE)
+    return _schema_cache
@@ -1,7 +1,7 @@
 from django.urls import path
 
-from drf_spectacular.views import SpectacularSwaggerView, SpectacularAPIView
+from api.spectacular.views import CachedSpectacularSwaggerView
 
 urlpatterns = [
-    path('', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('', CachedSpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
 ]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_spectacular.plumbing import set_query_parameters
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.utils import extend_schema
+
+from api.spectacular.schema import get_schema_cache
+
+# Срок хранения схемы, запрошенной по адресу с хэшем (?v=)
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+# Представление, отвечающее за схему OpenAPI из готового файла или кэша
+# процесса (см. api/spectacular/schema.py). Запросы с ?lang= и ?version=
+# обрабатываются drf-spectacular как обычно.
+class CachedSpectacularAPIView(SpectacularAPIView):
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('lang') or request.GET.get('version') or self.custom_settings:
+            return super().get(request, *args, **kwargs)
+
+        cache = get_schema_cache()
+        renderer = request.accepted_renderer
+        etag = f'"{cache.hash}-{renderer.format}"'
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            body = cache.render(renderer, {'request': request, 'view': self})
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = HttpResponse(body, content_type=content_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+        response['ETag'] = etag
+
+        # Адрес с хэшем содержимого не меняется, пока не изменится схема
+        if request.GET.get('v') == cache.hash:
+            patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+# Представление, отвечающее за Swagger UI. Схема запрашивается по адресу с
+# хэшем содержимого, поэтому браузер загружает ее один раз на версию схемы.
+class CachedSpectacularSwaggerView(SpectacularSwaggerView):
+    def _get_schema_url(self, request):
+        schema_url = super()._get_schema_url(request)
+        if request.GET.get('lang') or request.GET.get('version') or self.url:
+            return schema_url
+        return set_query_parameters(url=schema_url, v=get_schema_cache().hash)
+
@@ -1,8 +1,6 @@
+from django.apps import apps
 from django.urls import path, include
 
-#documantions
-from api.spectacular.urls import urlpatterns as doc_urls
-
 #apps_url
 from product.urls import urlpatterns as product_urls 
 
@@ -11,7 +9,11 @@ app_name = 'api'
 urlpatterns = []
 
 
-urlpatterns += doc_urls
+#documantions
+if apps.is_installed('drf_spectacular'):
+    from api.spectacular.urls import urlpatterns as doc_urls
+
+    urlpatterns += doc_urls
 
 #apps_url
 urlpatterns += product_urls 
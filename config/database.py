@@ -0,0 +1,13 @@
+# Модуль 'database.py' отвечает за настройку соединений с базой данных
+# при их открытии (сигнал connection_created).
+
+from django.conf import settings
+
+
+# Применяет settings.SQLITE_PRAGMAS к каждому новому соединению SQLite
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,273 @@
+# Модуль 'instrumentation.py' отвечает за измерение времени обработки запросов
+# (включается настройкой REQUEST_INSTRUMENTATION).
+#
+# Для каждого запроса собираются:
+#   - количество SQL-запросов и суммарное время в базе (execute_wrapper);
+#   - время работы сериализаторов DRF (валидация, сохранение, представление);
+#   - время рендеринга ответа;
+#   - общее время обработки.
+# Значения возвращаются в заголовке Server-Timing, пишутся строкой JSON в лог
+# 'request.metrics' и накапливаются в гистограммах по эндпоинтам, доступных
+# в текстовом формате Prometheus по адресу /metrics/. Гистограммы хранятся в
+# памяти процесса: при нескольких воркерах каждый отдает свои значения.
+#
+# Если инструментирование выключено, промежуточный слой исключается из цепочки
+# при запуске (MiddlewareNotUsed), а сериализаторы не оборачиваются.
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+logger = logging.getLogger('request.metrics')
+
+# Метрики текущего запроса (None - запрос не измеряется)
+_current = ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+
+
+# Метрики одного запроса
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.spans = {}
+        self._depth = {}
+
+    # Учет одного SQL-запроса (см. record_query)
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    # Учитывается только внешний интервал: вложенные сериализаторы входят во
+    # время родительского.
+    @contextmanager
+    def span(self, name):
+        depth = self._depth.get(name, 0)
+        self._depth[name] = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[name] = depth
+            if not depth:
+                self.spans[name] = self.spans.get(name, 0.0) + time.perf_counter() - start
+
+
+# Гистограмма с метками в формате Prometheus
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted(self._series.items())
+            for labels, (counts, total, count) in series:
+                label_text = ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels)
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+                lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return '\n'.join(lines)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+HISTOGRAMS = {
+    'total': Histogram('http_request_duration_seconds', 'Время обработки запроса.', DURATION_BUCKETS),
+    'db': Histogram('http_request_db_duration_seconds', 'Время выполнения SQL-запросов.', DURATION_BUCKETS),
+    'queries': Histogram('http_request_db_queries', 'Количество SQL-запросов.', QUERY_COUNT_BUCKETS),
+    'serializer': Histogram('http_request_serializer_duration_seconds', 'Время работы сериализаторов.',
+                            DURATION_BUCKETS),
+    'render': Histogram('http_request_render_duration_seconds', 'Время рендеринга ответа.', DURATION_BUCKETS),
+}
+
+
+# Постоянная обертка execute_wrapper: запрос учитывается в метриках запроса из
+# _current. sync_to_async переносит контекст в свой поток, поэтому запросы
+# асинхронного ORM попадают в метрики своего запроса, даже если конкурентные
+# запросы выполняются через одно и то же соединение.
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+# Устанавливает record_query в соединение один раз (соединения создаются
+# отдельно для каждого потока)
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+# Контекстный менеджер для измерения произвольного участка кода в рамках запроса
+@contextmanager
+def timing_span(name):
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.span(name):
+        yield
+
+
+def _timed(name, method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return method(*args, **kwargs)
+        with metrics.span(name):
+            return method(*args, **kwargs)
+    wrapper._instrumented = True
+    return wrapper
+
+
+# Оборачивает основные методы сериализаторов DRF. Вызывается один раз при
+# создании промежуточного слоя, только если инструментирование включено.
+def instrument_serializers():
+    from rest_framework import serializers
+
+    targets = (
+        (serializers.BaseSerializer, ('is_valid', 'save')),
+        (serializers.Serializer, ('to_representation',)),
+        (serializers.ListSerializer, ('to_representation',)),
+    )
+    for cls, names in targets:
+        for name in names:
+            method = cls.__dict__[name]
+            if not getattr(method, '_instrumented', False):
+                setattr(cls, name, _timed('serializer', method))
+
+
+# Промежуточный слой, измеряющий запросы
+class RequestInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instrument_serializers()
+        connection_created.connect(_on_connection_created, dispatch_uid='request-instrumentation')
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, metrics)
+        return response
+
+    # Рендеринг ответа DRF выполняется после выхода из представления; время
+    # отсчитывается от момента перед рендерингом до post-render callback.
+    def process_template_response(self, request, response):
+        metrics = _current.get()
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def finish_render(rendered):
+                metrics.spans['render'] = metrics.spans.get('render', 0.0) + time.perf_counter() - start
+
+            response.add_post_render_callback(finish_render)
+        return response
+
+    def _finish(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        serializer = metrics.spans.get('serializer', 0.0)
+        render = metrics.spans.get('render', 0.0)
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f'serializer;dur={serializer * 1000:.2f}',
+            f'render;dur={render * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+
+        match = request.resolver_match
+        route = match.route if match is not None else '<unmatched>'
+        labels = (('method', request.method), ('route', route))
+        HISTOGRAMS['total'].observe(labels, total)
+        HISTOGRAMS['db'].observe(labels, metrics.db_time)
+        HISTOGRAMS['queries'].observe(labels, metrics.queries)
+        HISTOGRAMS['serializer'].observe(labels, serializer)
+        HISTOGRAMS['render'].observe(labels, render)
+
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'serializer_ms': round(serializer * 1000, 2),
+            'render_ms': round(render * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }, ensure_ascii=False))
+
+
+# Представление, отдающее накопленные гистограммы в текстовом формате Prometheus
+def metrics_view(request):
+    body = '\n'.join(histogram.expose() for histogram in HISTOGRAMS.values()) + '\n'
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,77 @@
+# Модуль 'routers.py' отвечает за распределение запросов к базе данных между
+# основной базой и репликами (settings.DATABASE_REPLICAS).
+#
+# Чтение данных каталога в запросах GET/HEAD/OPTIONS направляется на реплику,
+# выбранную один раз на весь HTTP-запрос: версия каталога и сами данные
+# читаются из одного источника и согласованы между собой. Запись всегда идет
+# в основную базу, а после первой записи все последующие чтения того же
+# запроса закрепляются за основной базой (read-your-writes).
+
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Реплика, выбранная для текущего запроса (None - читать из основной базы)
+_replica = ContextVar('catalog_replica', default=None)
+
+
+# Роутер базы данных для приложения каталога
+class CatalogReplicaRouter:
+    route_app_labels = {'product'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        # Запись закрепляет оставшуюся часть запроса за основной базой
+        _replica.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик поддерживается репликацией, а не миграциями
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+# Промежуточный слой, выбирающий реплику для безопасных (читающих) запросов
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _choose_replica(self, request):
+        if settings.DATABASE_REPLICAS and request.method in self.SAFE_METHODS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _replica.set(self._choose_replica(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _replica.reset(token)
+
+    async def __acall__(self, request):
+        token = _replica.set(self._choose_replica(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _replica.reset(token)
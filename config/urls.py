@@ -1,9 +1,28 @@
-from django.contrib import admin
+from django.apps import apps
+from django.conf import settings
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
      path('api/', include('api.urls')),
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
 ]
+
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns += [
+        path('admin/', admin.site.urls),
+    ]
+
+if apps.is_installed('drf_spectacular'):
+    from api.spectacular.views import CachedSpectacularAPIView
+
+    urlpatterns += [
+        path('schema/', CachedSpectacularAPIView.as_view(), name='schema'),
+    ]
+
+if settings.REQUEST_INSTRUMENTATION:
+    from config.instrumentation import metrics_view
+
+    urlpatterns += [
+        path('metrics/', metrics_view, name='metrics'),
+    ]
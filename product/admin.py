@@ -1,12 +1,64 @@
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import F
+from product.models.catalogChangeModel import CatalogChange
+from product.models.categoryDeletionJobModel import CategoryDeletionJob
 from product.models.productCategoryModel import ProductCategory
 from product.models.productModel import Product
+from product.services.catalogChanges import record_catalog_changes
 # Register your models here.
 
+# Изменения через админку также увеличивают версию каталога, чтобы кэши
+# списков не отдавали устаревшие данные, и записываются в журнал изменений
+class CatalogVersionAdminMixin:
+    change_entity = None
+
+    # Изменения, которые вызовет удаление объектов с указанными id
+    def deletion_changes(self, ids):
+        return [(self.change_entity, CatalogChange.DELETED, ids)]
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            # Версия объекта для If-Match (см. services/conditionalUpdate.py)
+            if change:
+                obj.version = F('version') + 1
+            super().save_model(request, obj, form, change)
+            if change:
+                obj.refresh_from_db(fields=['version'])
+            op = CatalogChange.UPDATED if change else CatalogChange.CREATED
+            record_catalog_changes((self.change_entity, op, [obj.pk]))
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            changes = self.deletion_changes([obj.pk])
+            super().delete_model(request, obj)
+            record_catalog_changes(*changes)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            changes = self.deletion_changes(list(queryset.values_list('pk', flat=True)))
+            super().delete_queryset(request, queryset)
+            record_catalog_changes(*changes)
+
 @admin.register(ProductCategory)
-class ProductCategoryAdmin(admin.ModelAdmin):
+class ProductCategoryAdmin(CatalogVersionAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'name', 'description')
+    change_entity = CatalogChange.CATEGORY
+
+    # Товары категорий удаляются каскадно
+    def deletion_changes(self, ids):
+        product_ids = list(Product.objects.filter(categoryID__in=ids).values_list('id', flat=True))
+        return [(CatalogChange.PRODUCT, CatalogChange.DELETED, product_ids)] + super().deletion_changes(ids)
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(CatalogVersionAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'name', 'description', 'price', 'categoryID')
+    list_select_related = ('categoryID',)
+    change_entity = CatalogChange.PRODUCT
+
+@admin.register(CategoryDeletionJob)
+class CategoryDeletionJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'category_id', 'category_name', 'status', 'deleted', 'total', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('category_id', 'category_name', 'total', 'deleted', 'error', 'created_at', 'updated_at',
+                       'finished_at')
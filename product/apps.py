@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProductConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'product'
+
+    def ready(self):
+        from product.services.catalogChanges import install_change_feed
+        from product.services.catalogSnapshot import rebuild_catalog_snapshots
+        from product.services.catalogVersion import catalog_version_changed
+        from product.services.categoryCache import invalidate_category_cache
+        from product.services.categoryStats import install_category_stats
+        from product.services.productSearch import install_search_index
+
+        # Полнотекстовый индекс создается после миграций приложения
+        post_migrate.connect(install_search_index, sender=self)
+        # Триггеры статистики категорий - также после миграций
+        post_migrate.connect(install_category_stats, sender=self)
+        # Начало журнала изменений - версия каталога на момент его появления
+        post_migrate.connect(install_change_feed, sender=self)
+        # Снимки списков пересобираются после изменения каталога
+        catalog_version_changed.connect(rebuild_catalog_snapshots)
+        # Кэш категорий процесса сбрасывается после записи категорий
+        catalog_version_changed.connect(invalidate_category_cache)
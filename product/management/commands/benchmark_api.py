@@ -0,0 +1,456 @@
+# Команда 'benchmark_api' - воспроизводимый нагрузочный тест API товаров.
+# Запускается на тестовой базе данных (основная база не затрагивается):
+# для каждого размера каталога база заполняется детерминированными данными,
+# после чего эндпоинты списка, создания, обновления и удаления вызываются
+# внутри процесса через тестовый клиент Django (или AsyncClient для ASGI).
+#
+# Для каждого сценария выводятся p50/p95/p99 задержки, пропускная способность,
+# количество SQL-запросов на запрос и пиковое потребление памяти (tracemalloc,
+# измеряется на прогреве, чтобы не искажать замер задержек).
+#
+#   python manage.py benchmark_api --sizes 1k 100k --save bench.json
+#   python manage.py benchmark_api --sizes 1k 100k --baseline bench.json --threshold 0.2
+#
+# При сравнении с базовым результатом команда завершается с ошибкой, если
+# задержка p95/p99 или память выросли, а пропускная способность упала больше
+# чем на --threshold, либо выросло количество запросов к базе.
+
+import asyncio
+import json
+import math
+import platform
+import random
+import time
+import tracemalloc
+from contextlib import ExitStack
+from decimal import Decimal
+
+import django
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.services.catalogVersion import bump_catalog_version
+
+# Размер каталога: (количество товаров, количество категорий)
+SIZES = {
+    '1k': (1_000, 10),
+    '100k': (100_000, 100),
+    '1m': (1_000_000, 1_000),
+}
+
+SCENARIOS = ('list', 'list_cursor', 'list_filtered', 'create', 'update', 'delete')
+
+# Ожидаемые коды ответов: любой другой код прерывает тест
+EXPECTED_STATUS = {
+    'list': (200,),
+    'list_cursor': (200,),
+    'list_filtered': (200,),
+    'create': (201,),
+    'update': (200,),
+    'delete': (200, 204),
+}
+
+URLS = {
+    'sync': {
+        'list': '/api/products/',
+        'create': '/api/products/create/',
+        'update': '/api/products/update/{pk}/',
+        'delete': '/api/products/delete/{pk}/',
+    },
+    'async': {
+        'list': '/api/async/products/',
+        'create': '/api/async/products/create/',
+        'update': '/api/async/products/update/{pk}/',
+        'delete': '/api/async/products/delete/{pk}/',
+    },
+}
+
+WORDS = (
+    'легкий', 'прочный', 'компактный', 'классический', 'надежный', 'удобный', 'стальной', 'деревянный',
+    'пластиковый', 'беспроводной', 'универсальный', 'набор', 'корпус', 'модуль', 'кабель', 'фильтр',
+    'датчик', 'держатель', 'контроллер', 'адаптер', 'для', 'дома', 'офиса', 'улицы', 'кухни', 'сада',
+    'черный', 'белый', 'серый', 'синий', 'большой', 'малый', 'новый', 'усиленный', 'гибкий', 'ручной',
+)
+
+BENCHMARK_PREFIX = 'bench-'
+LIST_PAGE_SIZE = 100
+
+
+# Счетчик SQL-запросов для connection.execute_wrapper
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _install_counter(counter):
+    stack = ExitStack()
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(counter))
+    return stack
+
+
+def _request_kwargs(payload):
+    if payload is None:
+        return {}
+    return {'data': payload, 'content_type': 'application/json'}
+
+
+def _percentile(sorted_values, percent):
+    # Метод ближайшего ранга
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = 'Воспроизводимый нагрузочный тест API товаров на тестовой базе данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['1k'],
+                            help='Размеры каталога')
+        parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS),
+                            help='Сценарии')
+        parser.add_argument('--requests', type=int, default=200, help='Количество замеряемых запросов на сценарий')
+        parser.add_argument('--warmup', type=int, default=20,
+                            help='Количество запросов прогрева (на них измеряется память)')
+        parser.add_argument('--seed', type=int, default=42, help='Начальное значение генератора данных')
+        parser.add_argument('--client', choices=('sync', 'async'), default='sync',
+                            help='sync - тестовый клиент и синхронные представления, '
+                                 'async - AsyncClient и асинхронные представления')
+        parser.add_argument('--response-cache', action='store_true',
+                            help='Не отключать кэш ответов списков (CATALOG_RESPONSE_CACHE)')
+        parser.add_argument('--keepdb', action='store_true', help='Сохранить тестовую базу между запусками')
+        parser.add_argument('--save', help='Сохранить результаты в JSON-файл')
+        parser.add_argument('--baseline', help='JSON-файл с базовыми результатами для сравнения')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Допустимое относительное ухудшение (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        self.options = options
+        results = {}
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            cache_override = {} if options['response_cache'] else {'CATALOG_RESPONSE_CACHE': None}
+            with override_settings(**cache_override):
+                for size in options['sizes']:
+                    results[size] = self._run_size(size)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        report = {'meta': self._meta(), 'results': results}
+        self._print(results)
+
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результаты сохранены в {options["save"]}')
+
+        if options['baseline']:
+            self._compare(report, options['baseline'], options['threshold'])
+
+    def _meta(self):
+        return {
+            'vendor': connection.vendor,
+            'client': self.options['client'],
+            'requests': self.options['requests'],
+            'seed': self.options['seed'],
+            'response_cache': self.options['response_cache'],
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        }
+
+    # Заполнение базы
+
+    def _flush(self):
+        tables = [model._meta.db_table for model in apps.get_app_config('product').get_models()]
+        sql = connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True)
+        connection.ops.execute_sql_flush(sql)
+
+    # Детерминированный каталог: распределение товаров по категориям
+    # неравномерное (закон Ципфа), цены - логнормальные.
+    def _seed(self, size):
+        products_count, categories_count = SIZES[size]
+        rnd = random.Random(self.options['seed'])
+        self._flush()
+
+        ProductCategory.objects.bulk_create([
+            ProductCategory(name=f'Категория {index:05d}', description=f'Описание категории {index}')
+            for index in range(categories_count)
+        ], batch_size=1000)
+        category_ids = list(ProductCategory.objects.order_by('id').values_list('id', flat=True))
+
+        cum_weights = []
+        total = 0.0
+        for rank in range(1, categories_count + 1):
+            total += 1 / rank ** 0.8
+            cum_weights.append(total)
+
+        batch_size = 5000
+        for start in range(0, products_count, batch_size):
+            count = min(batch_size, products_count - start)
+            categories = rnd.choices(category_ids, cum_weights=cum_weights, k=count)
+            Product.objects.bulk_create([
+                Product(
+                    name=f'Товар {start + offset:07d}',
+                    description=' '.join(rnd.choices(WORDS, k=rnd.randint(8, 30))),
+                    price=Decimal(min(rnd.lognormvariate(7, 1), 10 ** 6)).quantize(Decimal('0.01')),
+                    categoryID_id=category_id,
+                )
+                for offset, category_id in enumerate(categories)
+            ], batch_size=batch_size)
+            self.stdout.write(f'\r  {size}: {start + count}/{products_count}', ending='')
+        self.stdout.write('')
+
+        bump_catalog_version()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return category_ids
+
+    # Сценарии
+
+    def _run_size(self, size):
+        self.stdout.write(f'Подготовка каталога {size}...')
+        started = time.perf_counter()
+        category_ids = self._seed(size)
+        self.stdout.write(f'  готово за {time.perf_counter() - started:.1f} с')
+
+        context = {
+            'size': size,
+            'urls': URLS[self.options['client']],
+            'categories': category_ids,
+            'rnd': random.Random(self.options['seed'] + 1),
+            'created': [],
+        }
+        results = {}
+        for name in self.options['scenarios']:
+            if name in ('update', 'delete'):
+                context['created'] = list(
+                    Product.objects.filter(name__startswith=BENCHMARK_PREFIX).order_by('id').values_list('id', flat=True)
+                )
+                if not context['created']:
+                    self.stdout.write(f'  {name}: пропущен (нет товаров, созданных сценарием create)')
+                    continue
+            results[name] = self._run_scenario(name, context)
+        return results
+
+    def _requests(self, name, context):
+        urls, rnd, categories = context['urls'], context['rnd'], context['categories']
+
+        if name == 'list':
+            while True:
+                yield 'get', f'{urls["list"]}?page_size={LIST_PAGE_SIZE}', None
+
+        elif name == 'list_cursor':
+            first = f'{urls["list"]}?page_size={LIST_PAGE_SIZE}'
+            url = first
+            while True:
+                response = yield 'get', url, None
+                url = response.json().get('next') or first
+
+        elif name == 'list_filtered':
+            while True:
+                low = rnd.randint(100, 2000)
+                yield 'get', (
+                    f'{urls["list"]}?category={rnd.choice(categories)}'
+                    f'&price_min={low}&price_max={low * 3}&page_size={LIST_PAGE_SIZE}'
+                ), None
+
+        elif name == 'create':
+            index = 0
+            while True:
+                index += 1
+                yield 'post', urls['create'], {
+                    'name': f'{BENCHMARK_PREFIX}{context["size"]}-{index}',
+                    'description': ' '.join(rnd.choices(WORDS, k=12)),
+                    'price': f'{rnd.uniform(10, 5000):.2f}',
+                    'categoryID': rnd.choice(categories),
+                }
+
+        elif name == 'update':
+            ids = context['created']
+            index = 0
+            while True:
+                pk = ids[index % len(ids)]
+                index += 1
+                yield 'put', urls['update'].format(pk=pk), {
+                    'name': f'{BENCHMARK_PREFIX}{context["size"]}-upd-{pk}',
+                    'description': ' '.join(rnd.choices(WORDS, k=12)),
+                    'price': f'{rnd.uniform(10, 5000):.2f}',
+                    'categoryID': rnd.choice(categories),
+                }
+
+        elif name == 'delete':
+            for pk in context['created']:
+                yield 'delete', urls['delete'].format(pk=pk), None
+
+    def _run_scenario(self, name, context):
+        if self.options['client'] == 'async':
+            latencies, queries, peak = asyncio.run(self._drive_async(name, context))
+        else:
+            latencies, queries, peak = self._drive_sync(name, context)
+
+        if not latencies:
+            raise CommandError(f'Сценарий {name}: не выполнено ни одного замеряемого запроса.')
+
+        elapsed = sum(latencies)
+        ordered = sorted(latencies)
+        result = {
+            'requests': len(latencies),
+            'p50_ms': round(_percentile(ordered, 50) * 1000, 3),
+            'p95_ms': round(_percentile(ordered, 95) * 1000, 3),
+            'p99_ms': round(_percentile(ordered, 99) * 1000, 3),
+            'mean_ms': round(elapsed / len(latencies) * 1000, 3),
+            'rps': round(len(latencies) / elapsed, 1),
+            'queries_max': max(queries),
+            'queries_mean': round(sum(queries) / len(queries), 2),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+        self.stdout.write(
+            f'  {name:<14} p50={result["p50_ms"]:.2f}ms p95={result["p95_ms"]:.2f}ms '
+            f'rps={result["rps"]:.0f} queries={result["queries_max"]}'
+        )
+        return result
+
+    def _check(self, name, method, url, response):
+        if response.status_code not in EXPECTED_STATUS[name]:
+            raise CommandError(
+                f'Сценарий {name}: {method.upper()} {url} вернул {response.status_code}: '
+                f'{response.content[:500].decode("utf-8", "replace")}'
+            )
+
+    def _drive_sync(self, name, context):
+        client = Client()
+        counter = _QueryCounter()
+        latencies, queries = [], []
+        requests = self._requests(name, context)
+        warmup, total = self.options['warmup'], self.options['warmup'] + self.options['requests']
+        response = None
+        peak = 0
+
+        with _install_counter(counter):
+            tracemalloc.start()
+            try:
+                for index in range(total):
+                    try:
+                        method, url, payload = requests.send(response) if response is not None else next(requests)
+                    except StopIteration:
+                        break
+                    if index == warmup:
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+
+                    before = counter.count
+                    started = time.perf_counter()
+                    response = getattr(client, method)(url, **_request_kwargs(payload))
+                    latency = time.perf_counter() - started
+                    self._check(name, method, url, response)
+
+                    if index >= warmup:
+                        latencies.append(latency)
+                        queries.append(counter.count - before)
+            finally:
+                if tracemalloc.is_tracing():
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+        return latencies, queries, peak
+
+    # Асинхронный ORM выполняет запросы в потоке sync_to_async, поэтому
+    # счетчик запросов устанавливается на соединения этого потока.
+    async def _drive_async(self, name, context):
+        client = AsyncClient()
+        counter = _QueryCounter()
+        latencies, queries = [], []
+        requests = self._requests(name, context)
+        warmup, total = self.options['warmup'], self.options['warmup'] + self.options['requests']
+        response = None
+        peak = 0
+
+        stack = await sync_to_async(_install_counter)(counter)
+        tracemalloc.start()
+        try:
+            for index in range(total):
+                try:
+                    method, url, payload = requests.send(response) if response is not None else next(requests)
+                except StopIteration:
+                    break
+                if index == warmup:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                before = counter.count
+                started = time.perf_counter()
+                response = await getattr(client, method)(url, **_request_kwargs(payload))
+                latency = time.perf_counter() - started
+                self._check(name, method, url, response)
+
+                if index >= warmup:
+                    latencies.append(latency)
+                    queries.append(counter.count - before)
+        finally:
+            if tracemalloc.is_tracing():
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            await sync_to_async(stack.close)()
+        return latencies, queries, peak
+
+    # Отчет и сравнение
+
+    def _print(self, results):
+        header = (f'{"size":<6}{"scenario":<15}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}'
+                  f'{"req/s":>10}{"queries":>9}{"peak KB":>11}')
+        self.stdout.write(header)
+        for size, scenarios in results.items():
+            for name, result in scenarios.items():
+                self.stdout.write(
+                    f'{size:<6}{name:<15}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}'
+                    f'{result["p99_ms"]:>10.2f}{result["rps"]:>10.0f}{result["queries_max"]:>9}'
+                    f'{result["peak_memory_kb"]:>11.0f}'
+                )
+
+    def _compare(self, report, path, threshold):
+        with open(path, encoding='utf-8') as file:
+            baseline = json.load(file)
+
+        for key in ('vendor', 'client', 'response_cache'):
+            if baseline.get('meta', {}).get(key) != report['meta'][key]:
+                self.stdout.write(self.style.WARNING(
+                    f'Базовый результат получен с другим значением {key}: '
+                    f'{baseline.get("meta", {}).get(key)!r} вместо {report["meta"][key]!r}'
+                ))
+
+        regressions = []
+        for size, scenarios in report['results'].items():
+            for name, current in scenarios.items():
+                base = baseline.get('results', {}).get(size, {}).get(name)
+                if base is None:
+                    continue
+                for metric in ('p95_ms', 'p99_ms', 'peak_memory_kb'):
+                    if base[metric] and current[metric] > base[metric] * (1 + threshold):
+                        regressions.append(f'{size}/{name}: {metric} {base[metric]} -> {current[metric]}')
+                if base['rps'] and current['rps'] < base['rps'] * (1 - threshold):
+                    regressions.append(f'{size}/{name}: rps {base["rps"]} -> {current["rps"]}')
+                if current['queries_max'] > base['queries_max']:
+                    regressions.append(
+                        f'{size}/{name}: queries_max {base["queries_max"]} -> {current["queries_max"]}'
+                    )
+
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(f'  {line}'))
+            raise CommandError(f'Обнаружены регрессии относительно {path}: {len(regressions)}')
+        self.stdout.write(self.style.SUCCESS(f'Регрессий относительно {path} не обнаружено (порог {threshold:.0%}).'))
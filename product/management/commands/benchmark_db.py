@@ -0,0 +1,117 @@
+# Команда 'benchmark_db' измеряет пропускную способность чтения и записи
+# для текущего профиля базы данных (DATABASE_URL, SQLITE_PRAGMAS, CONN_MAX_AGE).
+# Нагрузка выполняется во временной таблице, данные каталога не затрагиваются.
+#
+#   python manage.py benchmark_db --readers 8 --writers 2 --duration 10 --compare
+
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, connections, transaction
+from django.test.utils import override_settings
+
+TABLE = '"BenchmarkScratch"'
+
+# Настройки SQLite по умолчанию (без профиля): журнал с откатом,
+# полная синхронизация, кэш и mmap по умолчанию.
+BASELINE_SQLITE_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+    'cache_size': -2000,
+    'mmap_size': 0,
+}
+
+
+class Command(BaseCommand):
+    help = 'Нагрузочный тест чтения/записи для текущего профиля базы данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='Количество потоков чтения')
+        parser.add_argument('--writers', type=int, default=1, help='Количество потоков записи')
+        parser.add_argument('--duration', type=float, default=5.0, help='Длительность каждого прогона, с')
+        parser.add_argument('--rows', type=int, default=10000, help='Количество строк во временной таблице')
+        parser.add_argument('--compare', action='store_true',
+                            help='Дополнительно выполнить прогон без профиля: PRAGMA по умолчанию и '
+                                 'новое соединение на каждую операцию')
+
+    def handle(self, *args, **options):
+        self.rows = options['rows']
+        self._create_table()
+        try:
+            results = []
+            if options['compare']:
+                pragmas = BASELINE_SQLITE_PRAGMAS if connection.vendor == 'sqlite' else None
+                results.append(('baseline', self._run(options, reconnect=True, pragmas=pragmas)))
+            results.append(('profile', self._run(options, reconnect=False)))
+        finally:
+            self._drop_table()
+
+        self.stdout.write(f'{"run":<10}{"reads/s":>12}{"writes/s":>12}{"errors":>10}')
+        for name, (reads, writes, errors, elapsed) in results:
+            self.stdout.write(f'{name:<10}{reads / elapsed:>12.0f}{writes / elapsed:>12.0f}{errors:>10}')
+
+    def _create_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+            cursor.execute(f'CREATE TABLE {TABLE} ("id" integer PRIMARY KEY, "value" varchar(100) NOT NULL)')
+            for start in range(0, self.rows, 1000):
+                batch = [(pk, f'value-{pk}') for pk in range(start, min(start + 1000, self.rows))]
+                cursor.executemany(f'INSERT INTO {TABLE} ("id", "value") VALUES (%s, %s)', batch)
+
+    def _drop_table(self):
+        connections.close_all()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+    def _run(self, options, reconnect, pragmas=None):
+        # Все соединения закрываются, чтобы новые открылись уже с нужными PRAGMA
+        connections.close_all()
+        counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['duration']
+
+        def worker(operation, counter):
+            rnd = random.Random(threading.get_ident())
+            done = errors = 0
+            try:
+                while time.perf_counter() < deadline:
+                    try:
+                        operation(rnd.randrange(self.rows))
+                        done += 1
+                    except DatabaseError:
+                        errors += 1
+                    if reconnect:
+                        connection.close()
+            finally:
+                connection.close()
+                with lock:
+                    counters[counter] += done
+                    counters['errors'] += errors
+
+        threads = [threading.Thread(target=worker, args=(self._read, 'reads')) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=(self._write, 'writes')) for _ in range(options['writers'])]
+
+        with override_settings(**({'SQLITE_PRAGMAS': pragmas} if pragmas is not None else {})):
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        return counters['reads'], counters['writes'], counters['errors'], elapsed
+
+    @staticmethod
+    def _read(pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT "value" FROM {TABLE} WHERE "id" = %s', [pk])
+            cursor.fetchone()
+
+    @staticmethod
+    def _write(pk):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'UPDATE {TABLE} SET "value" = %s WHERE "id" = %s', [f'value-{time.time_ns()}', pk])
@@ -0,0 +1,135 @@
+# Команда 'benchmark_serialization' сравнивает быстрый путь чтения списков
+# (строки values() + скомпилированные функции + CatalogJSONRenderer, см.
+# product/serializers/fastSerializer.py) с сериализаторами DRF и
+# JSONRenderer. Запускается на тестовой базе данных.
+#
+#   python manage.py benchmark_serialization --rows 20000 --save serialization.json
+#
+# Для нескольких наборов полей замеряется время построения страницы: запрос
+# к базе, сериализация и кодирование в JSON. Побайтное совпадение ответов
+# проверяют тесты (product/tests/testSerializationEquivalence.py).
+
+import json
+import platform
+import random
+import statistics
+import time
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from product.models.productModel import Product
+from product.renderers.jsonRenderer import CatalogJSONRenderer
+from product.serializers.fastSerializer import get_row_serializer
+from product.serializers.fieldsetSerializer import SparseFieldset
+from product.serializers.productCategorySerializer import ProductCategorySerializerRead
+from product.serializers.productSerializer import ProductSerializerRead
+from product.testing.serializationEquivalence import create_random_catalog
+
+# Наборы параметров для замера: (название, сериализатор, параметры запроса)
+CASES = (
+    ('products', ProductSerializerRead, ''),
+    ('products_fields', ProductSerializerRead, 'fields=id,name,price'),
+    ('products_collapsed', ProductSerializerRead, 'fields=id,name,price,categoryID'),
+    ('categories', ProductCategorySerializerRead, ''),
+)
+
+
+class Command(BaseCommand):
+    help = 'Замер быстрого пути сериализации списков каталога'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Количество товаров в тестовом каталоге')
+        parser.add_argument('--categories', type=int, default=200, help='Количество категорий')
+        parser.add_argument('--page-size', type=int, default=1000, help='Количество записей на странице')
+        parser.add_argument('--repeat', type=int, default=30, help='Количество замеров для каждого набора полей')
+        parser.add_argument('--seed', type=int, default=42, help='Начальное значение генератора данных')
+        parser.add_argument('--keepdb', action='store_true', help='Сохранить тестовую базу между запусками')
+        parser.add_argument('--save', help='Сохранить результаты в JSON-файл')
+
+    def handle(self, *args, **options):
+        self.options = options
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            self._seed()
+            results = {name: self._measure(serializer_class, query) for name, serializer_class, query in CASES}
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        self._print(results)
+        if options['save']:
+            report = {
+                'meta': {
+                    'vendor': connection.vendor,
+                    'rows': options['rows'],
+                    'page_size': options['page_size'],
+                    'repeat': options['repeat'],
+                    'seed': options['seed'],
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                },
+                'results': results,
+            }
+            with open(options['save'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результаты сохранены в {options["save"]}')
+
+    # Заполнение базы случайными данными
+
+    def _seed(self):
+        rnd = random.Random(self.options['seed'])
+        tables = [model._meta.db_table for model in apps.get_app_config('product').get_models()]
+        connection.ops.execute_sql_flush(
+            connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True)
+        )
+
+        category_ids = create_random_catalog(rnd, self.options['rows'], self.options['categories'])
+        self.stdout.write(f'Тестовый каталог: {self.options["rows"]} товаров, {len(category_ids)} категорий')
+
+    # Замер
+
+    def _measure(self, serializer_class, query):
+        fieldset = SparseFieldset(serializer_class, QueryDict(query))
+        trimmed_class = fieldset.get_serializer_class()
+        row_serializer = get_row_serializer(trimmed_class)
+        model = serializer_class.Meta.model
+        queryset = Product.objects.with_category() if model is Product else model.objects.all()
+        page_size = self.options['page_size']
+
+        def drf():
+            objects = list(fieldset.apply(queryset, required=('id',)).order_by('id')[:page_size])
+            return JSONRenderer().render(trimmed_class(objects, many=True).data)
+
+        def fast():
+            rows = list(row_serializer.apply(queryset, required=('id',)).order_by('id')[:page_size])
+            return CatalogJSONRenderer().render(row_serializer.serialize(rows))
+
+        result = {}
+        for name, function in (('drf', drf), ('fast', fast)):
+            function()
+            timings = []
+            for _ in range(self.options['repeat']):
+                started = time.perf_counter()
+                body = function()
+                timings.append((time.perf_counter() - started) * 1000)
+            result[f'{name}_ms'] = round(statistics.median(timings), 3)
+            result['bytes'] = len(body)
+        result['speedup'] = round(result['drf_ms'] / result['fast_ms'], 2) if result['fast_ms'] else None
+        return result
+
+    def _print(self, results):
+        self.stdout.write(f'{"case":<22}{"drf ms":>10}{"fast ms":>10}{"speedup":>9}{"KB":>9}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<22}{result["drf_ms"]:>10.2f}{result["fast_ms"]:>10.2f}'
+                f'{result["speedup"]:>8.2f}x{result["bytes"] / 1024:>9.0f}'
+            )
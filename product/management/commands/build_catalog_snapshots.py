@@ -0,0 +1,44 @@
+# Команда 'build_catalog_snapshots' строит снимки выгрузки каталога и
+# (с --base-url) списков для текущей версии каталога, см.
+# product/services/catalogSnapshot.py. Используется при развертывании, чтобы
+# первые запросы после запуска сразу обслуживались из снимков.
+#
+#   python manage.py build_catalog_snapshots --base-url https://shop.example.com
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from product.services.catalogSnapshot import ListSnapshotSource, SnapshotSkipped, get_snapshot_store
+from product.views.productExportView import EXPORT_FORMATS, ExportSnapshotSource
+
+LIST_URLS = (
+    'api:list-products', 'api:list-product-categories',
+    'api:async-list-products', 'api:async-list-product-categories',
+)
+
+
+class Command(BaseCommand):
+    help = 'Построение снимков выгрузки и списков каталога'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', action='append', default=[],
+                            help='Адрес сервиса (схема и хост), для которого строятся снимки списков; '
+                                 'можно указать несколько раз')
+
+    def handle(self, *args, **options):
+        store = get_snapshot_store()
+        if store is None:
+            raise CommandError('Снимки отключены (CATALOG_SNAPSHOTS).')
+
+        sources = [ExportSnapshotSource(export_format) for export_format in EXPORT_FORMATS]
+        for base_url in options['base_url']:
+            sources.extend(ListSnapshotSource(base_url.rstrip('/') + reverse(name)) for name in LIST_URLS)
+
+        for source in sources:
+            try:
+                snapshot = store.build(source)
+            except SnapshotSkipped:
+                self.stdout.write(f'{source.key}: пропущен (каталог пуст)')
+                continue
+            sizes = ', '.join(f'{encoding} {size / 1024:.0f} KB' for encoding, size in snapshot.sizes.items())
+            self.stdout.write(f'{source.key}: версия {snapshot.version}, {sizes}')
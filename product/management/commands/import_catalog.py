@@ -0,0 +1,140 @@
+# Команда 'import_catalog' загружает каталог товаров из CSV или JSONL
+# (файл или stdin) пакетами, см. product/services/catalogImport.py.
+#
+#   python manage.py import_catalog supplier.csv --create-categories
+#   zcat supplier.jsonl.gz | python manage.py import_catalog - --format jsonl --checkpoint import.ckpt
+#
+# После фиксации каждого пакета количество обработанных строк сохраняется в
+# файл контрольной точки; после сбоя импорт продолжается с --resume, уже
+# загруженные строки пропускаются без повторной проверки.
+
+import io
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.services.catalogImport import FORMATS, ON_DUPLICATE, CatalogImporter, ImportStats, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Потоковый импорт каталога товаров из CSV или JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Путь к файлу или "-" для чтения из stdin')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Формат данных (по умолчанию определяется по расширению файла)')
+        parser.add_argument('--batch-size', type=int, help='Количество строк в одной транзакции')
+        parser.add_argument('--create-categories', action='store_true',
+                            help='Создавать категории, указанные по названию и отсутствующие в базе')
+        parser.add_argument('--on-duplicate', choices=ON_DUPLICATE, default='skip',
+                            help='Поведение для товаров, уже существующих в категории')
+        parser.add_argument('--max-errors', type=int, default=1000,
+                            help='Прервать импорт, если некорректных строк больше (0 - без ограничения)')
+        parser.add_argument('--errors-file', help='Записывать ошибки строк в JSONL-файл')
+        parser.add_argument('--checkpoint', help='Файл контрольной точки (по умолчанию <source>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='Продолжить импорт с контрольной точки')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        from_stdin = source == '-'
+
+        file_format = options['format']
+        if file_format is None:
+            if from_stdin:
+                raise CommandError('Для чтения из stdin укажите --format.')
+            file_format = os.path.splitext(source)[1].lstrip('.').lower()
+            if file_format == 'ndjson':
+                file_format = 'jsonl'
+            if file_format not in FORMATS:
+                raise CommandError(f'Не удалось определить формат файла {source}; укажите --format.')
+
+        checkpoint = options['checkpoint'] or (None if from_stdin else f'{source}.checkpoint')
+        if options['resume'] and not checkpoint:
+            raise CommandError('Для продолжения импорта из stdin укажите --checkpoint.')
+        self.source_id = 'stdin' if from_stdin else os.path.abspath(source)
+        self.source_size = None if from_stdin else os.path.getsize(source)
+
+        skip, stats = 0, ImportStats()
+        if options['resume']:
+            skip, stats = self._load_checkpoint(checkpoint)
+            self.stdout.write(f'Продолжение импорта: пропуск {skip} уже обработанных строк')
+
+        if from_stdin:
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        else:
+            stream = open(source, encoding='utf-8-sig', newline='')
+        errors_file = open(options['errors_file'], 'a', encoding='utf-8') if options['errors_file'] else None
+
+        importer = CatalogImporter(
+            create_categories=options['create_categories'],
+            on_duplicate=options['on_duplicate'],
+            batch_size=options['batch_size'],
+        )
+        importer.stats = stats
+        self.started = time.perf_counter()
+        self.start_rows = stats.rows
+
+        def on_batch(stats, errors):
+            if checkpoint:
+                self._save_checkpoint(checkpoint, stats)
+            for number, detail in errors:
+                line = json.dumps({'row': number, 'errors': detail}, ensure_ascii=False)
+                if errors_file is not None:
+                    errors_file.write(line + '\n')
+                else:
+                    self.stderr.write(line)
+            self._progress(stream, stats)
+            if options['max_errors'] and stats.invalid > options['max_errors']:
+                raise CommandError(
+                    f'Превышено допустимое количество некорректных строк ({options["max_errors"]}). '
+                    f'Загруженные пакеты сохранены; после исправления продолжите импорт с --resume.'
+                )
+
+        try:
+            rows = islice(read_rows(stream, file_format), skip, None)
+            stats = importer.run(rows, on_batch=on_batch)
+        finally:
+            self.stdout.write('')
+            if not from_stdin:
+                stream.close()
+            if errors_file is not None:
+                errors_file.close()
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импорт завершен: строк {stats.rows}, добавлено {stats.inserted}, '
+            f'дубликатов {stats.duplicates}, с ошибками {stats.invalid}'
+        ))
+
+    def _progress(self, stream, stats):
+        elapsed = time.perf_counter() - self.started
+        rate = (stats.rows - self.start_rows) / elapsed if elapsed else 0
+        line = (f'\rстрок {stats.rows}, добавлено {stats.inserted}, дубликатов {stats.duplicates}, '
+                f'с ошибками {stats.invalid}, {rate:.0f} строк/с')
+        if self.source_size:
+            line += f', {stream.buffer.tell() / self.source_size:.0%}'
+        self.stdout.write(line, ending='')
+        self.stdout.flush()
+
+    def _save_checkpoint(self, path, stats):
+        data = {'source': self.source_id, 'size': self.source_size, 'stats': stats.as_dict()}
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(temporary, path)
+
+    def _load_checkpoint(self, path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            raise CommandError(f'Файл контрольной точки {path} не найден.')
+        if data.get('source') != self.source_id or data.get('size') != self.source_size:
+            raise CommandError(f'Контрольная точка {path} относится к другому источнику данных.')
+        stats = ImportStats(**data['stats'])
+        return stats.rows, stats
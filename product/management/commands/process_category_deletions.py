@@ -0,0 +1,64 @@
+# Команда 'process_category_deletions' выполняет задачи удаления категорий
+# (CategoryDeletionJob): ожидающие, а также прерванные - в статусе running,
+# не обновлявшиеся дольше --stale секунд (например, после перезапуска процесса,
+# в фоновом потоке которого выполнялась задача).
+#
+#   python manage.py process_category_deletions
+#   python manage.py process_category_deletions --loop --interval 10
+#   python manage.py process_category_deletions --job 42 --retry-failed
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from product.models.categoryDeletionJobModel import CategoryDeletionJob
+from product.services.categoryDeletion import run_deletion_job
+
+
+class Command(BaseCommand):
+    help = 'Выполнение задач фонового удаления категорий'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help='Выполнить только задачу с указанным id')
+        parser.add_argument('--stale', type=int, default=300,
+                            help='Через сколько секунд без обновления задача running считается прерванной')
+        parser.add_argument('--retry-failed', action='store_true', help='Повторить задачи, завершившиеся ошибкой')
+        parser.add_argument('--loop', action='store_true', help='Работать непрерывно')
+        parser.add_argument('--interval', type=float, default=5.0, help='Пауза между проверками в режиме --loop, с')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self._process(options)
+            if not options['loop']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+
+    def _process(self, options):
+        jobs = CategoryDeletionJob.objects.all()
+        if options['job'] is not None:
+            jobs = jobs.filter(pk=options['job'])
+        if options['retry_failed']:
+            jobs.filter(status=CategoryDeletionJob.FAILED).update(
+                status=CategoryDeletionJob.PENDING, error='', finished_at=None,
+            )
+
+        cutoff = timezone.now() - timedelta(seconds=options['stale'])
+        ready = jobs.filter(
+            Q(status=CategoryDeletionJob.PENDING)
+            | Q(status=CategoryDeletionJob.RUNNING, updated_at__lt=cutoff)
+        ).order_by('id').values_list('id', flat=True)
+
+        processed = 0
+        for job_id in ready:
+            if not run_deletion_job(job_id, stale_after=options['stale']):
+                continue
+            processed += 1
+            job = CategoryDeletionJob.objects.get(pk=job_id)
+            message = f'Задача {job.pk}: категория {job.category_id}, удалено товаров {job.deleted}, статус {job.status}'
+            self.stdout.write(self.style.SUCCESS(message) if job.status == CategoryDeletionJob.DONE
+                              else self.style.ERROR(f'{message}: {job.error}'))
+        return processed
@@ -0,0 +1,31 @@
+# Команда 'prune_catalog_changes' удаляет из журнала изменений каталога
+# записи старше --days дней (по умолчанию CATALOG_CHANGES_RETENTION_DAYS).
+# Клиенты, которые запросят изменения с меньшего номера, получат ответ 410 и
+# должны будут выполнить полную синхронизацию, см. product/services/catalogChanges.py.
+#
+#   python manage.py prune_catalog_changes
+#   python manage.py prune_catalog_changes --days 7
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from product.services.catalogChanges import prune_catalog_changes
+
+
+class Command(BaseCommand):
+    help = 'Очистка журнала изменений каталога'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CATALOG_CHANGES_RETENTION_DAYS,
+                            help='Сколько дней хранить записи журнала')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Количество записей, удаляемых за раз')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days не может быть отрицательным.')
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted, start = prune_catalog_changes(before, chunk_size=options['chunk_size'])
+        self.stdout.write(f'Удалено записей: {deleted}. Журнал доступен с номера {start}')
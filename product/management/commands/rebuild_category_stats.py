@@ -0,0 +1,40 @@
+# Команда 'rebuild_category_stats' пересчитывает таблицу статистики категорий
+# (CategoryStats) по всем товарам и проверяет, что она совпадает с агрегацией
+# по таблице Product, см. product/services/categoryStats.py.
+#
+#   python manage.py rebuild_category_stats           # пересчет и проверка
+#   python manage.py rebuild_category_stats --check   # только проверка
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from product.services.categoryStats import get_stats_backend, verify_category_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчет и проверка статистики товаров по категориям'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Только проверить таблицу, не изменяя ее')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Псевдоним базы данных')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        backend = get_stats_backend(using)
+        if backend is None:
+            raise CommandError('Статистика категорий не поддерживается для этой СУБД.')
+
+        if not options['check']:
+            # Триггеры создаются повторно на случай, если они были удалены
+            backend.install()
+            backend.rebuild()
+            self.stdout.write('Статистика пересчитана')
+
+        mismatches = verify_category_stats(using)
+        for category_id, expected, actual in mismatches:
+            self.stderr.write(
+                f'Категория {category_id}: ожидается (количество, сумма, мин, макс) = {expected}, сохранено {actual}'
+            )
+        if mismatches:
+            raise CommandError(f'Статистика не совпадает для {len(mismatches)} категорий.')
+        self.stdout.write(self.style.SUCCESS('Статистика совпадает с данными товаров'))
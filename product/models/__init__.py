@@ -0,0 +1,6 @@
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.models.catalogVersionModel import CatalogVersion
+from product.models.categoryDeletionJobModel import CategoryDeletionJob
+from product.models.categoryStatsModel import CategoryStats
+from product.models.catalogChangeModel import CatalogChange
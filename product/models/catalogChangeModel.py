@@ -0,0 +1,43 @@
+from django.db import models
+
+# Класс, отвечающий за запись журнала изменений каталога.
+# Каждая транзакция записи товаров или категорий добавляет по строке на
+# созданный, измененный или удаленный объект. Номер изменения - значение
+# версии каталога, полученное в этой транзакции (см. services/catalogChanges.py),
+# поэтому номера возрастают в порядке фиксации транзакций.
+
+class CatalogChange(models.Model):
+    PRODUCT = 'product'
+    CATEGORY = 'category'
+    ENTITY_CHOICES = (
+        (PRODUCT, 'Товар'),
+        (CATEGORY, 'Категория'),
+    )
+
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    OP_CHOICES = (
+        (CREATED, 'Создание'),
+        (UPDATED, 'Изменение'),
+        (DELETED, 'Удаление'),
+    )
+
+    # атрибут "Seq" - номер изменения (версия каталога после транзакции).
+    seq = models.BigIntegerField("Seq", db_column="Seq", db_index=True)
+
+    # атрибут "Entity" - тип измененного объекта.
+    entity = models.CharField("Entity", db_column="Entity", max_length=20, choices=ENTITY_CHOICES)
+
+    # атрибут "ObjectID" - id измененного объекта (без внешнего ключа:
+    # запись хранится и после удаления объекта).
+    object_id = models.BigIntegerField("ObjectID", db_column="ObjectID")
+
+    # атрибут "Op" - вид изменения.
+    op = models.CharField("Op", db_column="Op", max_length=20, choices=OP_CHOICES)
+
+    # атрибут "CreatedAt" - время изменения (используется при очистке журнала).
+    created_at = models.DateTimeField("CreatedAt", db_column="CreatedAt", auto_now_add=True)
+
+    class Meta:
+        db_table = "CatalogChange"
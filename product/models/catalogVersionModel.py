@@ -0,0 +1,19 @@
+from django.db import models
+
+# Класс, отвечающий за хранение счетчиков версий каталога.
+# Каждая запись каталога в рамках своей транзакции увеличивает счетчик,
+# поэтому после фиксации транзакции все кэши, привязанные к старой версии,
+# перестают использоваться.
+
+class CatalogVersion(models.Model):
+    # атрибут "Scope" - область, к которой относится счетчик (например, "catalog").
+    scope = models.CharField("Scope", db_column="Scope", primary_key=True, max_length=50)
+
+    # атрибут "Value" - текущее значение счетчика.
+    value = models.BigIntegerField("Value", db_column="Value", default=0)
+
+    # атрибут "UpdatedAt" - время последнего изменения счетчика.
+    updated_at = models.DateTimeField("UpdatedAt", db_column="UpdatedAt", auto_now=True)
+
+    class Meta:
+        db_table = "CatalogVersion"
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+# Класс, отвечающий за представление задачи фонового удаления категории.
+# Категории с большим количеством товаров удаляются частями: товары пачками
+# ограниченного размера, затем сама категория (см. services/categoryDeletion.py).
+
+class CategoryDeletionJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает выполнения'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Завершена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    # атрибут "CategoryID" - id удаляемой категории (без внешнего ключа:
+    # задача хранится и после удаления категории).
+    category_id = models.BigIntegerField("CategoryID", db_column="CategoryID", db_index=True)
+
+    # атрибут "CategoryName" - название категории на момент создания задачи.
+    category_name = models.CharField("CategoryName", db_column="CategoryName", max_length=100)
+
+    # атрибут "Status" - состояние задачи.
+    status = models.CharField("Status", db_column="Status", max_length=20, choices=STATUS_CHOICES, default=PENDING)
+
+    # атрибут "Total" - количество товаров в категории на момент создания задачи.
+    total = models.BigIntegerField("Total", db_column="Total", default=0)
+
+    # атрибут "Deleted" - количество уже удаленных товаров.
+    deleted = models.BigIntegerField("Deleted", db_column="Deleted", default=0)
+
+    # атрибут "Error" - текст ошибки, если задача завершилась неудачно.
+    error = models.TextField("Error", db_column="Error", blank=True, default='')
+
+    # атрибут "CreatedAt" - время создания задачи.
+    created_at = models.DateTimeField("CreatedAt", db_column="CreatedAt", auto_now_add=True)
+
+    # атрибут "UpdatedAt" - время последнего изменения (используется для
+    # обнаружения задач, выполнение которых прервалось).
+    updated_at = models.DateTimeField("UpdatedAt", db_column="UpdatedAt", default=timezone.now)
+
+    # атрибут "FinishedAt" - время завершения задачи.
+    finished_at = models.DateTimeField("FinishedAt", db_column="FinishedAt", null=True, blank=True)
+
+    class Meta:
+        db_table = "CategoryDeletionJob"
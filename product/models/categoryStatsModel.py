@@ -0,0 +1,32 @@
+from django.db import models
+
+# Класс, отвечающий за сводную статистику товаров категории.
+# Строки таблицы поддерживаются триггерами базы данных на таблице Product
+# (см. product/services/categoryStats.py) в той же транзакции, что и запись
+# товаров, поэтому чтение статистики не требует агрегации по товарам.
+
+class CategoryStats(models.Model):
+    # атрибут "CategoryID" - категория, к которой относится статистика.
+    category = models.OneToOneField(
+        'product.ProductCategory',
+        models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name="CategoryID",
+        db_column="CategoryID",
+    )
+
+    # атрибут "ProductCount" - количество товаров в категории.
+    product_count = models.BigIntegerField("ProductCount", db_column="ProductCount", default=0)
+
+    # атрибут "PriceSum" - сумма цен товаров (для средней цены).
+    price_sum = models.DecimalField("PriceSum", db_column="PriceSum", max_digits=30, decimal_places=2, default=0)
+
+    # атрибут "MinPrice" - минимальная цена товара (пусто, если товаров нет).
+    min_price = models.DecimalField("MinPrice", db_column="MinPrice", max_digits=19, decimal_places=2, null=True)
+
+    # атрибут "MaxPrice" - максимальная цена товара (пусто, если товаров нет).
+    max_price = models.DecimalField("MaxPrice", db_column="MaxPrice", max_digits=19, decimal_places=2, null=True)
+
+    class Meta:
+        db_table = "CategoryStats"
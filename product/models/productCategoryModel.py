@@ -9,5 +9,12 @@ class ProductCategory(models.Model):
     # атрибут "Description" - описание категории (необязательно).
     description = models.TextField("Description", db_column="Description", null=True, blank=True)
 
+    # атрибут "UpdatedAt" - время последнего изменения категории.
+    updated_at = models.DateTimeField("UpdatedAt", db_column="UpdatedAt", auto_now=True)
+
+    # атрибут "Version" - версия категории, увеличивается при каждом изменении
+    # (ETag / If-Match, см. services/conditionalUpdate.py).
+    version = models.PositiveIntegerField("Version", db_column="Version", default=1, editable=False)
+
     class Meta:
         db_table = "ProductCategory"
\ No newline at end of file
@@ -1,5 +1,14 @@
 from django.db import models
 
+# Набор запросов для товаров. Все пути чтения, которые отдают товар вместе
+# с вложенной категорией, должны строиться через with_category(), чтобы
+# категория загружалась JOIN-ом, а не отдельным запросом на каждую строку.
+
+class ProductQuerySet(models.QuerySet):
+    def with_category(self):
+        return self.select_related('categoryID')
+
+
 # Класс, отвечающий за представление сущности "Товар"
 
 class Product(models.Model):
@@ -17,8 +26,31 @@ class Product(models.Model):
         'product.ProductCategory', 
         models.CASCADE, 
         verbose_name="CategoryID",
-        db_column="CategoryID"
+        db_column="CategoryID",
+        # Поиск по категории обслуживается составными индексами из Meta.indexes
+        db_index=False,
     )
 
+    # атрибут "UpdatedAt" - время последнего изменения товара.
+    updated_at = models.DateTimeField("UpdatedAt", db_column="UpdatedAt", auto_now=True)
+
+    # атрибут "Version" - версия товара, увеличивается при каждом изменении
+    # (ETag / If-Match, см. services/conditionalUpdate.py).
+    version = models.PositiveIntegerField("Version", db_column="Version", default=1, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         db_table = "Product"
+        constraints = [
+            # Название товара уникально в пределах категории
+            models.UniqueConstraint(fields=['name', 'categoryID'], name='product_name_category_uniq'),
+        ]
+        indexes = [
+            # Сортировка и фильтрация по цене (в т.ч. постраничная выдача по (price, id))
+            models.Index(fields=['price', 'id'], name='product_price_idx'),
+            # Фильтрация по категории с сортировкой по id (а также поиск товаров категории)
+            models.Index(fields=['categoryID', 'id'], name='product_category_id_idx'),
+            # Фильтрация по категории с сортировкой/диапазоном по цене
+            models.Index(fields=['categoryID', 'price', 'id'], name='product_category_price_idx'),
+        ]
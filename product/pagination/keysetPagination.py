@@ -0,0 +1,199 @@
+# Модуль 'keysetPagination.py' отвечает за постраничную выдачу списков каталога
+# по ключу (keyset/cursor pagination). В отличие от OFFSET, стоимость запроса
+# страницы не зависит от того, насколько глубоко клиент пролистал список:
+# каждая страница - это один SELECT с условием WHERE по ключу сортировки и LIMIT.
+
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# Класс, отвечающий за постраничную выдачу по ключу сортировки
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    # Поля сортировки. Последнее поле обязано быть уникальным (обычно 'id'),
+    # чтобы позиция в списке определялась однозначно.
+    ordering = ('id',)
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        self.page_size = settings.CATALOG_PAGE_SIZE
+        self.max_page_size = settings.CATALOG_MAX_PAGE_SIZE
+        self.cursor = None
+        self.has_next = False
+        self.has_previous = False
+        self.page = []
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request)
+        return self._build_page(list(queryset))
+
+    # Асинхронный вариант для представлений, работающих под ASGI
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request)
+        return self._build_page([instance async for instance in queryset])
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request, queryset.model)
+
+        position, reverse = self.cursor or (None, False)
+        ordering = self._reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, position))
+
+        # Запрашиваем на одну запись больше, чтобы узнать о наличии следующей
+        # страницы без отдельного запроса COUNT/EXISTS.
+        return queryset[:self.page_size + 1]
+
+    def _build_page(self, results):
+        position, reverse = self.cursor or (None, False)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # Параметры запроса: request.query_params для DRF, request.GET для Django
+    @staticmethod
+    def _query_params(request):
+        return getattr(request, 'query_params', request.GET)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(self._query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    # Курсор непрозрачен для клиента: это base64 от позиции последней/первой
+    # записи страницы, направления и сортировки, для которой он был выдан.
+    def encode_cursor(self, position, reverse):
+        payload = {'p': position, 'o': list(self.ordering)}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        encoded = base64.urlsafe_b64encode(raw).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    # model - модель списка: значения позиции приводятся к типам полей
+    # сортировки, чтобы курсор с неверными типами давал 404, а не ошибку базы
+    def decode_cursor(self, request, model=None):
+        encoded = self._query_params(request).get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+            ordering = tuple(payload['o'])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if ordering != self.ordering or not isinstance(position, list) \
+                or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        if model is not None:
+            try:
+                position = [
+                    self._prepare(model, field.lstrip('-'), value) for field, value in zip(self.ordering, position)
+                ]
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    # Значение позиции в типе поля сортировки (поля связей - через '__')
+    @staticmethod
+    def _prepare(model, name, value):
+        if value is None:
+            return None
+        if not isinstance(value, (int, str)):
+            raise TypeError(value)
+        field = None
+        for part in name.split('__'):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return value
+            model = field.related_model
+        return field.get_prep_value(field.to_python(value))
+
+    # Позиция записи: instance - экземпляр модели или строка values()
+    def _position(self, instance):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            position.append(value if isinstance(value, (int, str)) or value is None else str(value))
+        return position
+
+    # Условие "строго после позиции" для лексикографического порядка:
+    # (a > x) OR (a = x AND b > y) OR ...
+    @staticmethod
+    def _keyset_filter(ordering, position):
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def _reverse_ordering(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
@@ -0,0 +1,33 @@
+# Модуль 'jsonRenderer.py' отвечает за кодирование ответов API в JSON.
+# Результат побайтно совпадает с rest_framework.renderers.JSONRenderer при
+# настройках по умолчанию (UNICODE_JSON, COMPACT_JSON, STRICT_JSON), но
+# кодировщик создается один раз, а не на каждый ответ. Тот же кодировщик
+# используют асинхронные представления, поэтому их ответы совпадают с
+# ответами APIView.
+
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+_encoder = encoders.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+# Кодирует данные в JSON так же, как JSONRenderer
+def render_json(data):
+    # U+2028 и U+2029 допустимы в JSON, но не в JavaScript, поэтому
+    # экранируются, как и в JSONRenderer.
+    ret = _encoder.encode(data).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+    return ret.encode()
+
+
+# Класс, отвечающий за компактный JSON без создания кодировщика на каждый ответ
+class CatalogJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Отступы (?format=json; indent=4, Browsable API) и нестандартные
+        # настройки обрабатывает JSONRenderer
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict \
+                or self.encoder_class is not encoders.JSONEncoder:
+            return super().render(data, accepted_media_type, renderer_context)
+        return render_json(data)
@@ -0,0 +1,41 @@
+# Модуль 'catalogChangeSerializer.py' отвечает за параметры и ответ журнала
+# изменений каталога (см. services/catalogChanges.py).
+
+from django.conf import settings
+from rest_framework import serializers
+
+from product.models.catalogChangeModel import CatalogChange
+
+
+# Класс, отвечающий за параметры запроса журнала изменений
+class CatalogChangeFeedParamsSerializer(serializers.Serializer):
+    since = serializers.IntegerField(
+        required=False, min_value=0,
+        help_text="Номер next_since из предыдущего ответа. Без параметра возвращается текущий номер",
+    )
+    limit = serializers.IntegerField(required=False, min_value=1, help_text="Количество изменений на странице")
+
+    def validate_limit(self, value):
+        return min(value, settings.CATALOG_CHANGES_MAX_PAGE_SIZE)
+
+    @property
+    def page_size(self):
+        return self.validated_data.get('limit', settings.CATALOG_CHANGES_PAGE_SIZE)
+
+
+# Класс, отвечающий за просмотр изменения. Для созданных и измененных
+# объектов object содержит текущее состояние объекта (в формате списков
+# товаров и категорий), для удаленных - null.
+class CatalogChangeSerializerRead(serializers.Serializer):
+    seq = serializers.IntegerField()
+    entity = serializers.ChoiceField(choices=CatalogChange.ENTITY_CHOICES)
+    id = serializers.IntegerField()
+    op = serializers.ChoiceField(choices=CatalogChange.OP_CHOICES)
+    object = serializers.JSONField(allow_null=True)
+
+
+# Класс, отвечающий за просмотр страницы журнала изменений
+class CatalogChangeFeedSerializerRead(serializers.Serializer):
+    changes = CatalogChangeSerializerRead(many=True)
+    next_since = serializers.IntegerField(help_text="Значение since для следующего запроса")
+    has_more = serializers.BooleanField(help_text="Есть ли изменения после next_since")
@@ -0,0 +1,24 @@
+# Модуль 'categoryDeletionJobSerializer.py' отвечает за сериализацию задач
+# фонового удаления категорий (модель CategoryDeletionJob).
+
+from rest_framework import serializers
+
+from product.models.categoryDeletionJobModel import CategoryDeletionJob
+
+
+# Класс, отвечающий за просмотр задачи удаления категории
+class CategoryDeletionJobSerializerRead(serializers.ModelSerializer):
+    class Meta:
+        model = CategoryDeletionJob
+        fields = (
+            'id',
+            'category_id',
+            'category_name',
+            'status',
+            'total',
+            'deleted',
+            'error',
+            'created_at',
+            'updated_at',
+            'finished_at',
+        )
@@ -0,0 +1,29 @@
+# Модуль 'categoryStatsSerializer.py' отвечает за сериализацию статистики
+# товаров по категориям (таблица CategoryStats, см. services/categoryStats.py).
+
+from decimal import Decimal
+
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+
+
+# Класс, отвечающий за просмотр статистики категории. Объект - строка
+# values() категории с полями статистики (пусто, если товаров не было).
+class CategoryStatsSerializerRead(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    product_count = serializers.SerializerMethodField()
+    min_price = serializers.DecimalField(source='stats__min_price', max_digits=19, decimal_places=2, read_only=True)
+    max_price = serializers.DecimalField(source='stats__max_price', max_digits=19, decimal_places=2, read_only=True)
+    avg_price = serializers.SerializerMethodField()
+
+    def get_product_count(self, row) -> int:
+        return row['stats__product_count'] or 0
+
+    # Средняя цена округляется до копеек, как и цены товаров
+    @extend_schema_field(serializers.DecimalField(max_digits=19, decimal_places=2, allow_null=True))
+    def get_avg_price(self, row):
+        if not row['stats__product_count']:
+            return None
+        average = Decimal(row['stats__price_sum']) / row['stats__product_count']
+        return self.fields['min_price'].to_representation(average)
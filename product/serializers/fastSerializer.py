@@ -0,0 +1,234 @@
+# Модуль 'fastSerializer.py' отвечает за быстрый путь чтения списков каталога.
+#
+# Сериализатор DRF на каждую запись вызывает get_attribute() и
+# to_representation() каждого поля, а ORM перед этим создает экземпляры
+# моделей. Для сериализаторов чтения, состоящих из простых полей, это не
+# нужно: по классу сериализатора один раз строится (и кэшируется) функция
+# "строка values() -> словарь", которая возвращает те же ключи в том же
+# порядке и те же значения, что и serializer.data:
+#
+#   - строковые и целочисленные поля передаются как есть (values() уже
+#     возвращает str и int);
+#   - DecimalField форматируется тем же округлением, что и в DRF;
+#   - вложенный ModelSerializer связи строится из колонок 'связь__поле',
+#     PrimaryKeyRelatedField - из колонки внешнего ключа;
+#   - вложенная категория (при включенном CATEGORY_CACHE) выбирается только
+#     колонкой внешнего ключа, а строится по строкам кэша категорий
+#     (см. product/services/categoryCache.py): JOIN не нужен, и каждая
+#     категория страницы сериализуется один раз;
+#   - None остается None, как и в Serializer.to_representation().
+#
+# Если в сериализаторе есть поле другого типа, быстрый путь не используется
+# и ответ строится сериализатором DRF. Быстрый путь отключается настройкой
+# CATALOG_FAST_SERIALIZATION. Совпадение ответов проверяется тестами
+# (см. product/testing/serializationEquivalence.py).
+
+import decimal
+from functools import lru_cache, partial
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from product.models.productCategoryModel import ProductCategory
+from product.services.categoryCache import CategoryCache, get_category_cache
+
+# Поля сериализатора и типы полей модели, для которых значение из values()
+# (str или int) совпадает с to_representation()
+_PLAIN_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.ReadOnlyField)
+_PLAIN_INTERNAL_TYPES = frozenset((
+    'AutoField', 'BigAutoField', 'SmallAutoField',
+    'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+    'PositiveIntegerField', 'PositiveBigIntegerField', 'PositiveSmallIntegerField',
+    'CharField', 'TextField', 'SlugField', 'EmailField', 'URLField',
+))
+
+
+class _Unsupported(Exception):
+    pass
+
+
+# Класс, отвечающий за сериализацию строк values() скомпилированной функцией.
+# related - связи, которые строятся по кэшу категорий: пары (колонка внешнего
+# ключа, функция "строка кэша -> словарь"); factory получает для каждой связи
+# словарь {id: словарь} и возвращает функцию сериализации строки.
+class RowSerializer:
+    def __init__(self, columns, factory, related=()):
+        self.columns = columns
+        self.factory = factory
+        self.related = related
+
+    # Заменяет queryset на values() с нужными колонками. required - поля,
+    # которые должны быть в строке в любом случае (поля сортировки курсора).
+    def apply(self, queryset, required=()):
+        columns = dict.fromkeys(self.columns + tuple(field.lstrip('-') for field in required))
+        return queryset.values(*columns)
+
+    def _ids(self, rows, column):
+        return {row[column] for row in rows if row[column] is not None}
+
+    def serialize(self, rows, request=None):
+        cache = get_category_cache()
+        related = []
+        for column, function in self.related:
+            categories = cache.get_many(self._ids(rows, column), request=request)
+            related.append({pk: function(row) for pk, row in categories.items()})
+        return list(map(self.factory(*related), rows))
+
+    async def aserialize(self, rows, request=None):
+        cache = get_category_cache()
+        related = []
+        for column, function in self.related:
+            categories = await cache.aget_many(self._ids(rows, column), request=request)
+            related.append({pk: function(row) for pk, row in categories.items()})
+        return list(map(self.factory(*related), rows))
+
+
+# Возвращает RowSerializer для класса сериализатора или None, если быстрый
+# путь для него невозможен
+@lru_cache(maxsize=256)
+def get_row_serializer(serializer_class):
+    compiler = _Compiler()
+    try:
+        expression = compiler.serializer(serializer_class(), serializer_class.Meta.model, '')
+    except _Unsupported:
+        return None
+
+    arguments = ', '.join(name for name, _, _ in compiler.related)
+    source = (
+        f'def make_serializer({arguments}):\n'
+        f'    def serialize_row(row):\n'
+        f'        return {expression}\n'
+        f'    return serialize_row\n'
+    )
+    namespace = dict(compiler.namespace)
+    exec(compile(source, f'<row serializer {serializer_class.__name__}>', 'exec'), namespace)
+    related = tuple((column, function) for _, column, function in compiler.related)
+    return RowSerializer(tuple(compiler.columns), namespace['make_serializer'], related)
+
+
+def _read_serializer(fieldset):
+    serializer_class = fieldset.get_serializer_class()
+    row_serializer = get_row_serializer(serializer_class) if settings.CATALOG_FAST_SERIALIZATION else None
+    return serializer_class, row_serializer
+
+
+# Возвращает queryset и функцию сериализации списка объектов: быстрый путь
+# через values() или сериализатор DRF, если быстрый путь недоступен.
+# request передается кэшу категорий (версия каталога, уже прочитанная
+# запросом, позволяет не проверять актуальность кэша отдельным запросом).
+def read_path(fieldset, queryset, required=(), request=None):
+    serializer_class, row_serializer = _read_serializer(fieldset)
+    if row_serializer is None:
+        return fieldset.apply(queryset, required=required), lambda objects: serializer_class(objects, many=True).data
+    return row_serializer.apply(queryset, required=required), partial(row_serializer.serialize, request=request)
+
+
+# То же для асинхронных представлений: функция сериализации - корутина
+def aread_path(fieldset, queryset, required=(), request=None):
+    serializer_class, row_serializer = _read_serializer(fieldset)
+    if row_serializer is None:
+        async def serialize(objects):
+            return serializer_class(objects, many=True).data
+        return fieldset.apply(queryset, required=required), serialize
+    return row_serializer.apply(queryset, required=required), partial(row_serializer.aserialize, request=request)
+
+
+# Класс, отвечающий за построение выражения Python для сериализатора
+class _Compiler:
+    def __init__(self, namespace=None):
+        self.columns = {}
+        self.namespace = {} if namespace is None else namespace
+        # Связи из кэша категорий: (имя аргумента, колонка, функция)
+        self.related = []
+
+    def _column(self, name):
+        self.columns[name] = None
+        return f'row[{name!r}]'
+
+    def serializer(self, serializer, model, prefix):
+        items = []
+        for field in serializer._readable_fields:
+            items.append(f'{field.field_name!r}: {self.field(field, model, prefix)}')
+        return '{' + ', '.join(items) + '}'
+
+    def field(self, field, model, prefix):
+        if len(field.source_attrs) != 1:
+            raise _Unsupported(field.source)
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise _Unsupported(field.source)
+        if not model_field.concrete:
+            raise _Unsupported(field.source)
+        column = f'{prefix}{field.source}'
+
+        if isinstance(field, serializers.ModelSerializer):
+            if not model_field.many_to_one:
+                raise _Unsupported(field.source)
+            cached = self._cached_related(field, model_field, column)
+            if cached is not None:
+                return cached
+            # Как и в DRF, при отсутствии связанного объекта возвращается None
+            nested = self.serializer(field, model_field.related_model, f'{column}__')
+            return f'(None if {self._column(column)} is None else {nested})'
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if not model_field.many_to_one or field.pk_field is not None:
+                raise _Unsupported(field.source)
+            return self._column(column)
+
+        if type(field) is serializers.DecimalField:
+            formatter = self._formatter(_decimal_formatter(field))
+            return f'(None if (value := {self._column(column)}) is None else {formatter}(value))'
+
+        if isinstance(field, _PLAIN_FIELDS) and not model_field.is_relation \
+                and model_field.get_internal_type() in _PLAIN_INTERNAL_TYPES:
+            return self._column(column)
+
+        raise _Unsupported(field.source)
+
+    # Вложенная категория по строкам кэша категорий или None, если ее поля
+    # не входят в строку кэша (тогда используется JOIN)
+    def _cached_related(self, field, model_field, column):
+        if model_field.related_model is not ProductCategory or not settings.CATEGORY_CACHE:
+            return None
+        compiler = _Compiler(self.namespace)
+        expression = compiler.serializer(field, ProductCategory, '')
+        if compiler.related or not set(compiler.columns) <= set(CategoryCache.FIELDS):
+            return None
+
+        name = f'related_{len(self.related)}'
+        source = f'def serialize_related(row):\n    return {expression}\n'
+        namespace = dict(self.namespace)
+        exec(compile(source, f'<related serializer {type(field).__name__}>', 'exec'), namespace)
+        self.related.append((name, column, namespace['serialize_related']))
+        return f'(None if (key := {self._column(column)}) is None else {name}.get(key))'
+
+    def _formatter(self, function):
+        name = f'format_{len(self.namespace)}'
+        self.namespace[name] = function
+        return name
+
+
+# Форматирование Decimal так же, как DecimalField.to_representation(), без
+# повторного чтения настроек на каждое значение
+def _decimal_formatter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or getattr(field, 'normalize_output', False) \
+            or field.decimal_places is None:
+        return field.to_representation
+
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    to_representation = field.to_representation
+
+    def format_decimal(value):
+        if value.__class__ is not decimal.Decimal:
+            return to_representation(value)
+        return format(value.quantize(quantum, rounding=rounding, context=context), 'f')
+    return format_decimal
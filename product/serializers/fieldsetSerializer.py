@@ -0,0 +1,122 @@
+# Модуль 'fieldsetSerializer.py' отвечает за выборочные поля ответа
+# (sparse fieldsets) в представлениях чтения каталога:
+#
+#   ?fields=id,name,price  - вернуть только перечисленные поля;
+#   ?expand=category       - вернуть категорию товара вложенным объектом.
+#
+# Без параметров ответ не меняется. Если указан fields, а expand=category нет,
+# поле categoryID возвращается как id категории и JOIN не выполняется.
+# Запрос к базе сужается через only() (поля сортировки загружаются всегда,
+# они нужны для курсора), а сериализатор строится с нужным набором полей;
+# построенные классы кэшируются.
+
+from functools import lru_cache
+
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+FIELDS_PARAMETER = OpenApiParameter('fields', str, description='Поля ответа через запятую, например id,name,price')
+EXPAND_PARAMETER = OpenApiParameter('expand', str, enum=['category'],
+                                    description='Вернуть категорию вложенным объектом (при указании fields)')
+
+
+# Класс, отвечающий за разбор параметров ?fields= и ?expand=
+class SparseFieldset:
+    PARAMS = ('fields', 'expand')
+
+    # serializer_class - полный сериализатор чтения. Его атрибут expandable
+    # описывает связи, которые можно развернуть:
+    # {имя в expand: (поле сериализатора, поля модели связи)}.
+    def __init__(self, serializer_class, query_params):
+        self.serializer_class = serializer_class
+        self.expandable = getattr(serializer_class, 'expandable', {})
+        self.errors = {}
+
+        available = serializer_class.Meta.fields
+        self.fields = self._parse(query_params, 'fields')
+        self.expand = self._parse(query_params, 'expand')
+
+        if self.fields is not None:
+            unknown = [name for name in self.fields if name not in available]
+            if unknown:
+                self.errors['fields'] = [f"Неизвестные поля: {', '.join(unknown)}. Доступны: {', '.join(available)}."]
+            elif not self.fields:
+                self.errors['fields'] = ["Не указано ни одного поля."]
+        if self.expand is not None:
+            unknown = [name for name in self.expand if name not in self.expandable]
+            if unknown:
+                allowed = ', '.join(self.expandable) or 'нет'
+                self.errors['expand'] = [f"Неизвестные связи: {', '.join(unknown)}. Доступны: {allowed}."]
+
+    @staticmethod
+    def _parse(query_params, name):
+        value = query_params.get(name)
+        if value is None:
+            return None
+        return tuple(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+
+    def is_valid(self):
+        return not self.errors
+
+    # Параметры не переданы: используется полный сериализатор и запрос
+    @property
+    def is_default(self):
+        return self.fields is None and self.expand is None
+
+    def _selection(self):
+        fields = self.fields or tuple(self.serializer_class.Meta.fields)
+        if self.fields is None:
+            # Без ?fields= связи развернуты, как и в полном ответе
+            expanded = frozenset(self.expandable) if self.expand is None else frozenset(self.expand)
+        else:
+            expanded = frozenset(self.expand or ())
+        for name in expanded:
+            field = self.expandable[name][0]
+            if field not in fields:
+                fields += (field,)
+        return fields, expanded
+
+    def get_serializer_class(self):
+        if self.is_default:
+            return self.serializer_class
+        fields, expanded = self._selection()
+        collapsed = tuple(
+            field for name, (field, _) in self.expandable.items() if name not in expanded and field in fields
+        )
+        return _trimmed_serializer(self.serializer_class, fields, collapsed)
+
+    # Сужает queryset до нужных колонок. required - поля, которые должны быть
+    # загружены в любом случае (например, поля сортировки курсора).
+    def apply(self, queryset, required=()):
+        if self.is_default:
+            return queryset
+        fields, expanded = self._selection()
+        columns = list(dict.fromkeys(('id',) + tuple(field.lstrip('-') for field in required) + fields))
+
+        related = []
+        for name, (field, related_fields) in self.expandable.items():
+            if name in expanded:
+                related.append(field)
+                columns.extend(f'{field}__{related_field}' for related_field in related_fields)
+
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+
+
+# Строит (и кэширует) подкласс сериализатора с указанными полями. Связи из
+# collapsed возвращаются как первичный ключ без загрузки связанного объекта.
+@lru_cache(maxsize=256)
+def _trimmed_serializer(serializer_class, fields, collapsed):
+    attrs = {
+        'Meta': type('Meta', (serializer_class.Meta,), {'fields': fields}),
+    }
+    # Объявленные поля, не вошедшие в выборку, удаляются из подкласса
+    for name in serializer_class._declared_fields:
+        if name not in fields:
+            attrs[name] = None
+    for name in collapsed:
+        attrs[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+    name = f'{serializer_class.__name__}Fields'
+    return type(name, (serializer_class,), attrs)
@@ -3,11 +3,25 @@
 # Классы, содержащиеся в этом пакете, отвечают за сериализацию/десериализацию для каждой 
 # требуемой CRUD операции.
 
+from django.db import IntegrityError, transaction
+from product.models.catalogChangeModel import CatalogChange
 from product.models.productCategoryModel import ProductCategory
+from product.services.catalogChanges import record_catalog_changes
+from product.services.categoryDeletion import delete_category
+from product.services.conditionalUpdate import conditional_update
+from product.services.integrityErrors import is_unique_violation
 from rest_framework import serializers
 from rest_framework.exceptions import ParseError
 
 
+# Преобразует нарушение уникальности названия категории в ошибку валидации,
+# остальные нарушения ограничений выбрасываются дальше
+def raise_duplicate_category(exc):
+    if not is_unique_violation(exc, ProductCategory, ('name',)):
+        raise exc
+    raise serializers.ValidationError("Категория с таким именем уже существует.")
+
+
 # Класс, отвечающий за создание категории продутка
 class ProductCategorySerializerCreate(serializers.ModelSerializer):
     description = serializers.CharField(
@@ -23,6 +37,8 @@ class ProductCategorySerializerCreate(serializers.ModelSerializer):
             'name',
             'description'
         )
+        # Уникальность названия обеспечивается ограничением в базе
+        extra_kwargs = {'name': {'validators': []}}
     # Валидация названия категории
     def validate_name(self, value):
         if len(value) < 2:
@@ -38,12 +54,13 @@ class ProductCategorySerializerCreate(serializers.ModelSerializer):
         return value
     
     def create(self, validated_data):
-        name = validated_data.get('name')
-        if ProductCategory.objects.filter(name=name).exists():
-            raise serializers.ValidationError("Категория с таким именем уже существует.")
-        
         # Создаем категорию с валидированными данными
-        prodCat = ProductCategory.objects.create(**validated_data)
+        try:
+            with transaction.atomic():
+                prodCat = ProductCategory.objects.create(**validated_data)
+                record_catalog_changes((CatalogChange.CATEGORY, CatalogChange.CREATED, [prodCat.pk]))
+        except IntegrityError as exc:
+            raise_duplicate_category(exc)
         return prodCat
 
 # Класс, отвечающий за просмотр категории продутка
@@ -68,6 +85,7 @@ class ProductCategorySerializerUpdate(serializers.ModelSerializer):
     class Meta:
         model = ProductCategory
         fields = ('id', 'name', 'description')
+        extra_kwargs = {'name': {'validators': []}}
     
     # Валидация названия категории
     def validate_name(self, value):
@@ -83,22 +101,28 @@ class ProductCategorySerializerUpdate(serializers.ModelSerializer):
             raise serializers.ValidationError("Описание категории не может превышать 500 символов.")
         return value
 
-    def update(self, instance, validated_data):
-        # Валидация и обновление полей
-        instance.name = validated_data.get('name', instance.name)
-        instance.description = validated_data.get('description', instance.description)
-        instance.save()
-        return instance
+    # Записывает переданные поля категории pk одним условным UPDATE (versions -
+    # допустимые версии из If-Match, см. services/conditionalUpdate.py) и
+    # возвращает новую версию категории
+    def update_by_pk(self, pk, validated_data, versions=None):
+        try:
+            with transaction.atomic():
+                version = conditional_update(ProductCategory, pk, validated_data, versions)
+                record_catalog_changes((CatalogChange.CATEGORY, CatalogChange.UPDATED, [pk]))
+        except IntegrityError as exc:
+            raise_duplicate_category(exc)
+        return version
 
 # Класс, отвечающий за удаление категории продукта
 class ProductCategorySerializerDelete(serializers.Serializer):
     id = serializers.IntegerField()
 
+    # Возвращает None, если категория удалена сразу, или задачу
+    # CategoryDeletionJob для большой категории (см. services/categoryDeletion.py)
     def delete(self, validated_data):
         category_id = validated_data.get('id')
         try:
             productCategory = ProductCategory.objects.get(id=category_id)
-            productCategory.delete()
-            return {"message": "Категория успешно удалена."}  # Возвращаем сообщение об успешном удалении
         except ProductCategory.DoesNotExist:
             raise serializers.ValidationError("Категория с таким ID не найдена.")
+        return delete_category(productCategory)
@@ -0,0 +1,170 @@
+# Модуль 'productFilterSerializer.py' отвечает за разбор и валидацию параметров
+# фильтрации и сортировки списка товаров. Допускаются только сочетания
+# параметров, которые обслуживаются индексами модели Product; остальные
+# отклоняются с ошибкой 400, чтобы запрос не превращался в полный просмотр таблицы.
+
+import sys
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework import serializers
+
+from product.serializers.fieldsetSerializer import SparseFieldset
+
+
+# Наименьшая строка, большая всех строк, начинающихся с prefix, или None,
+# если такой строки нет (prefix состоит из символов U+10FFFF). Последний
+# символ U+10FFFF увеличить нельзя, поэтому он отбрасывается и увеличивается
+# предыдущий; суррогаты (U+D800-U+DFFF) не кодируются в UTF-8 и пропускаются.
+def prefix_upper_bound(prefix):
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+# Класс, отвечающий за параметры фильтрации списка товаров
+class ProductFilterSerializer(serializers.Serializer):
+    category = serializers.CharField(required=False, help_text="ID категории")
+    price_min = serializers.DecimalField(max_digits=19, decimal_places=2, min_value=Decimal('0'), required=False)
+    price_max = serializers.DecimalField(max_digits=19, decimal_places=2, min_value=Decimal('0'), required=False)
+    name_prefix = serializers.CharField(required=False, max_length=100)
+    ordering = serializers.ChoiceField(
+        choices=('id', '-id', 'price', '-price', 'name', '-name'),
+        required=False,
+    )
+
+    # Параметры пагинации, которые не являются фильтрами, но допустимы в запросе
+    PAGINATION_PARAMS = ('cursor', 'page_size')
+
+    # Ключ сортировки для постраничной выдачи. Последнее поле уникально.
+    ORDERINGS = {
+        'id': ('id',),
+        '-id': ('-id',),
+        'price': ('price', 'id'),
+        '-price': ('-price', '-id'),
+        'name': ('name', 'id'),
+        '-name': ('-name', '-id'),
+    }
+
+    # Фильтры, допустимые при каждой сортировке:
+    #   id    - индекс (CategoryID, id);
+    #   price - индексы (Price, id) и (CategoryID, Price, id);
+    #   name  - уникальный индекс (Name, CategoryID).
+    # Категория допускается только одна: для нескольких категорий индекс
+    # (CategoryID, ...) не дает общего порядка, и каждая страница сортировала
+    # бы все товары этих категорий.
+    ALLOWED_FILTERS = {
+        'id': {'category'},
+        'price': {'category', 'price_min', 'price_max'},
+        'name': {'name_prefix'},
+    }
+
+    def to_internal_value(self, data):
+        unknown = set(data) - set(self.fields) - set(self.PAGINATION_PARAMS) - set(SparseFieldset.PARAMS)
+        if unknown:
+            raise serializers.ValidationError({
+                name: ["Неизвестный параметр запроса."] for name in sorted(unknown)
+            })
+        return super().to_internal_value(data)
+
+    # Валидация списка категорий
+    def validate_category(self, value):
+        try:
+            category_ids = sorted({int(part) for part in value.split(',') if part.strip()})
+        except ValueError:
+            raise serializers.ValidationError("Категории должны быть перечислены через запятую числами.")
+        if not category_ids:
+            raise serializers.ValidationError("Не указано ни одной категории.")
+        if len(category_ids) > settings.CATALOG_MAX_FILTER_CATEGORIES:
+            raise serializers.ValidationError(
+                f"Можно указать не более {settings.CATALOG_MAX_FILTER_CATEGORIES} категорий."
+            )
+        return category_ids
+
+    # Валидация префикса названия
+    def validate_name_prefix(self, value):
+        if len(value) < 2:
+            raise serializers.ValidationError("Префикс названия должен содержать минимум 2 символа.")
+        return value
+
+    # Общая валидация: выбор сортировки и проверка сочетания параметров
+    def validate(self, data):
+        if 'price_min' in data and 'price_max' in data and data['price_min'] > data['price_max']:
+            raise serializers.ValidationError("Минимальная цена не может превышать максимальную.")
+
+        ordering = data.get('ordering')
+        if ordering is None:
+            if 'name_prefix' in data:
+                ordering = 'name'
+            elif 'price_min' in data or 'price_max' in data:
+                ordering = 'price'
+            else:
+                ordering = 'id'
+        data['ordering'] = ordering
+
+        filters = set(data) - {'ordering'}
+        allowed = self.ALLOWED_FILTERS[ordering.lstrip('-')]
+        if not filters <= allowed:
+            raise serializers.ValidationError(
+                f"Сочетание параметров {', '.join(sorted(filters - allowed))} "
+                f"с сортировкой '{ordering}' не поддерживается."
+            )
+        if len(data.get('category', ())) > 1:
+            raise serializers.ValidationError({'category': ["В списке товаров можно указать только одну категорию."]})
+        return data
+
+    @property
+    def has_filters(self):
+        return bool(set(self.validated_data) - {'ordering'})
+
+    @property
+    def keyset_ordering(self):
+        return self.ORDERINGS[self.validated_data['ordering']]
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if 'category' in data:
+            queryset = queryset.filter(categoryID__in=data['category'])
+        if 'price_min' in data:
+            queryset = queryset.filter(price__gte=data['price_min'])
+        if 'price_max' in data:
+            queryset = queryset.filter(price__lte=data['price_max'])
+        if 'name_prefix' in data:
+            # Диапазон [prefix, prefix+1) позволяет использовать индекс по Name
+            # независимо от того, как СУБД обрабатывает LIKE.
+            prefix = data['name_prefix']
+            queryset = queryset.filter(name__gte=prefix, name__startswith=prefix)
+            upper = prefix_upper_bound(prefix)
+            if upper is not None:
+                queryset = queryset.filter(name__lt=upper)
+        return queryset
+
+
+# Класс, отвечающий за параметры полнотекстового поиска товаров
+class ProductSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200, help_text="Поисковый запрос")
+    category = serializers.CharField(required=False, help_text="ID категорий через запятую")
+    page = serializers.IntegerField(required=False, min_value=1, default=1)
+    page_size = serializers.IntegerField(required=False, min_value=1)
+
+    validate_category = ProductFilterSerializer.validate_category
+
+    # Валидация поискового запроса
+    def validate_q(self, value):
+        if len(value.strip()) < 2:
+            raise serializers.ValidationError("Поисковый запрос должен содержать минимум 2 символа.")
+        return value.strip()
+
+    # Глубина выдачи ограничена, чтобы OFFSET оставался небольшим
+    def validate(self, data):
+        page_size = min(data.get('page_size') or settings.CATALOG_PAGE_SIZE, settings.CATALOG_MAX_PAGE_SIZE)
+        data['page_size'] = page_size
+        if data['page'] * page_size > settings.CATALOG_SEARCH_MAX_RESULTS:
+            raise serializers.ValidationError(
+                f"Поиск возвращает не более {settings.CATALOG_SEARCH_MAX_RESULTS} результатов; уточните запрос."
+            )
+        return data
@@ -3,13 +3,66 @@
 # Классы, содержащиеся в этом пакете, отвечают за сериализацию/десериализацию для каждой 
 # требуемой CRUD операции.
 
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from product.models.catalogChangeModel import CatalogChange
 from product.models.productModel import Product
 from product.models.productCategoryModel import ProductCategory
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from product.serializers.productCategorySerializer import ProductCategorySerializerRead
+from product.services.catalogChanges import record_catalog_changes
+from product.services.categoryCache import category_from_row, get_category_cache
+from product.services.conditionalUpdate import conditional_update
+from product.services.integrityErrors import is_foreign_key_violation, is_unique_violation
+
+CATEGORY_DOES_NOT_EXIST = "Категория с таким ID не существует."
+
+
+# Преобразует нарушение ограничения product_name_category_uniq в ошибку валидации
+# с тем же текстом, что возвращался при проверке через SELECT. Нарушение
+# внешнего ключа CategoryID означает, что категория удалена после проверки по
+# кэшу. Остальные нарушения ограничений выбрасываются дальше.
+def raise_duplicate_product(exc, name=None):
+    if is_foreign_key_violation(exc, Product, 'categoryID'):
+        raise serializers.ValidationError({'categoryID': [CATEGORY_DOES_NOT_EXIST]})
+    if not is_unique_violation(exc, Product, ('name', 'categoryID')):
+        raise exc
+    if name is None:
+        message = "Товар с таким названием в этой категории уже существует."
+    else:
+        message = f"Товар с названием '{name}' в этой категории уже существует."
+    raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+
+
+# Поле категории товара: существование категории проверяется по кэшу
+# категорий процесса (см. categoryCache.py), без запроса к базе
+class CachedCategoryField(serializers.PrimaryKeyRelatedField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', ProductCategory.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        row = get_category_cache().get(pk, request=self.context.get('request'))
+        if row is None:
+            self.fail('does_not_exist', pk_value=data)
+        return category_from_row(row)
+
 
 # Класс, отвечающий за создание продутка
 class ProductSerializerCreate(serializers.ModelSerializer):
+    categoryID = CachedCategoryField()
     description = serializers.CharField(
         required=False,
         allow_blank=True,
@@ -23,6 +76,8 @@ class ProductSerializerCreate(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ('id', 'name', 'description', 'price', 'categoryID')
+        # Уникальность (name, categoryID) обеспечивается ограничением в базе
+        validators = []
 
     # Валидация названия товара
     def validate_name(self, value):
@@ -38,26 +93,15 @@ class ProductSerializerCreate(serializers.ModelSerializer):
             raise serializers.ValidationError("Описание товара не может превышать 500 символов.")
         return value
     
-    # Валидация категории
-    def validate_categoryID(self, value):
-        if not ProductCategory.objects.filter(id=value.id).exists():
-            raise serializers.ValidationError("Категория с таким ID не существует.")
-        return value
-    
-    # Общая валидация для создания продукта
-    def validate(self, data):
-        name = data.get('name')
-        categoryID = data.get('categoryID')
-
-        # Проверка наличия товара с таким же названием и категорией
-        if Product.objects.filter(name=name, categoryID=categoryID).exists():
-            raise serializers.ValidationError(
-                f"Товар с названием '{name}' в этой категории уже существует."
-            )
-        return data
-    
     def create(self, validated_data):
-        product = Product.objects.create(**validated_data)
+        # Проверка наличия товара с таким же названием и категорией
+        # выполняется ограничением product_name_category_uniq
+        try:
+            with transaction.atomic():
+                product = Product.objects.create(**validated_data)
+                record_catalog_changes((CatalogChange.PRODUCT, CatalogChange.CREATED, [product.pk]))
+        except IntegrityError as exc:
+            raise_duplicate_product(exc, validated_data.get('name'))
         return product
 
 
@@ -66,12 +110,16 @@ class ProductSerializerRead(serializers.ModelSerializer):
     # Вложенный сериализатор для категории продукта
     categoryID = ProductCategorySerializerRead(read_only=True)
 
+    # Связи для ?expand= (см. fieldsetSerializer.py)
+    expandable = {'category': ('categoryID', ProductCategorySerializerRead.Meta.fields)}
+
     class Meta:
         model = Product
         fields = ('id', 'name', 'description', 'price', 'categoryID')
 
 # Класс, отвечающий за обновление продутка
 class ProductSerializerUpdate(serializers.ModelSerializer):
+    categoryID = CachedCategoryField()
     description = serializers.CharField(
         required=False,
         allow_blank=True,
@@ -86,6 +134,7 @@ class ProductSerializerUpdate(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ('id', 'name', 'description', 'price', 'categoryID')
+        validators = []
 
     # Валидация названия товара
     def validate_name(self, value):
@@ -107,19 +156,17 @@ class ProductSerializerUpdate(serializers.ModelSerializer):
             raise serializers.ValidationError("Цена должна быть положительным числом.")
         return value
 
-    # Валидация категории
-    def validate_categoryID(self, value):
-        if not ProductCategory.objects.filter(id=value.id).exists():
-            raise serializers.ValidationError("Категория с таким ID не существует.")
-        return value
-
-    def update(self, instance, validated_data):
-        instance.name = validated_data.get('name', instance.name)
-        instance.description = validated_data.get('description', instance.description)
-        instance.price = validated_data.get('price', instance.price)
-        instance.categoryID = validated_data.get('categoryID', instance.categoryID)
-        instance.save()
-        return instance
+    # Записывает переданные поля товара pk одним условным UPDATE (versions -
+    # допустимые версии из If-Match, см. services/conditionalUpdate.py) и
+    # возвращает новую версию товара
+    def update_by_pk(self, pk, validated_data, versions=None):
+        try:
+            with transaction.atomic():
+                version = conditional_update(Product, pk, validated_data, versions)
+                record_catalog_changes((CatalogChange.PRODUCT, CatalogChange.UPDATED, [pk]))
+        except IntegrityError as exc:
+            raise_duplicate_product(exc, validated_data.get('name'))
+        return version
 
 # Класс, отвечающий за удаление продукта
 class ProductSerializerDelete(serializers.Serializer):
@@ -128,8 +175,288 @@ class ProductSerializerDelete(serializers.Serializer):
     def delete(self, validated_data):
         product_id = validated_data.get('id')
         try:
-            product = Product.objects.get(id=product_id)
-            product.delete()
+            with transaction.atomic():
+                product = Product.objects.get(id=product_id)
+                product.delete()
+                record_catalog_changes((CatalogChange.PRODUCT, CatalogChange.DELETED, [product_id]))
         except Product.DoesNotExist:
             raise serializers.ValidationError("Товар с таким ID не найден.")
 
+
+# Класс, отвечающий за проверку одного товара при пакетном создании.
+# Правила полей те же, что и у ProductSerializerCreate, но категория принимается
+# как идентификатор, а проверки, требующие запросов к базе, выполняются
+# один раз для всего пакета в ProductSerializerBulkCreate.
+class ProductSerializerBulkItem(ProductSerializerCreate):
+    categoryID = serializers.IntegerField()
+
+    class Meta:
+        model = Product
+        fields = ('name', 'description', 'price', 'categoryID')
+        validators = []
+
+
+# Базовый класс пакетных операций над товарами. Поля каждого элемента проверяются
+# без обращения к базе, после чего validate_batch() выполняет проверки,
+# требующие запросов, одним набором запросов на весь пакет.
+class ProductSerializerBulkBase(serializers.ListSerializer):
+    child_class = None
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('child', self.child_class())
+        kwargs.setdefault('allow_empty', False)
+        kwargs.setdefault('max_length', settings.PRODUCT_BULK_MAX_ITEMS)
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='not_a_list')
+        if not self.allow_empty and len(data) == 0:
+            message = self.error_messages['empty']
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='empty')
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages['max_length'].format(max_length=self.max_length)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='max_length')
+
+        # Проверка полей каждого товара (без запросов к базе)
+        items = []
+        errors = []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+
+        self.validate_batch(items, errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def validate_batch(self, items, errors):
+        pass
+
+    # Существование всех категорий пакета проверяется по кэшу категорий;
+    # отсутствующие в кэше загружаются одним запросом IN
+    def _validate_categories(self, items, errors):
+        category_ids = {item['categoryID'] for item in items if item is not None and 'categoryID' in item}
+        existing = get_category_cache().get_many(category_ids, request=self.context.get('request'))
+        for index, item in enumerate(items):
+            if item is not None and 'categoryID' in item and item['categoryID'] not in existing:
+                errors[index].setdefault('categoryID', []).append(CATEGORY_DOES_NOT_EXIST)
+                items[index] = None
+
+
+# Класс, отвечающий за пакетное создание товаров
+class ProductSerializerBulkCreate(ProductSerializerBulkBase):
+    child_class = ProductSerializerBulkItem
+
+    def validate_batch(self, items, errors):
+        self._validate_categories(items, errors)
+        self._validate_duplicates(items, errors)
+
+    # Дубликаты (name, categoryID) ищутся внутри пакета и одним запросом в базе
+    def _validate_duplicates(self, items, errors):
+        valid = [(index, item) for index, item in enumerate(items) if item is not None]
+        if not valid:
+            return
+
+        existing = set(
+            Product.objects.filter(
+                name__in={item['name'] for _, item in valid},
+                categoryID__in={item['categoryID'] for _, item in valid},
+            ).values_list('name', 'categoryID')
+        )
+        seen = set()
+        for index, item in valid:
+            key = (item['name'], item['categoryID'])
+            if key in existing:
+                message = f"Товар с названием '{item['name']}' в этой категории уже существует."
+            elif key in seen:
+                message = f"Товар с названием '{item['name']}' в этой категории повторяется в запросе."
+            else:
+                seen.add(key)
+                continue
+            errors[index].setdefault(api_settings.NON_FIELD_ERRORS_KEY, []).append(message)
+
+    def create(self, validated_data):
+        products = [
+            Product(
+                name=item['name'],
+                description=item.get('description', ''),
+                price=item['price'],
+                categoryID_id=item['categoryID'],
+            )
+            for item in validated_data
+        ]
+        try:
+            with transaction.atomic():
+                products = Product.objects.bulk_create(products, batch_size=settings.PRODUCT_BULK_BATCH_SIZE)
+                record_catalog_changes(
+                    (CatalogChange.PRODUCT, CatalogChange.CREATED, [product.pk for product in products]),
+                )
+                return products
+        except IntegrityError as exc:
+            # Конкурентная вставка того же товара между проверкой и INSERT
+            raise_duplicate_product(exc)
+
+
+# Класс, отвечающий за проверку одного товара при пакетном обновлении/создании.
+# Товар определяется либо по 'id', либо по паре (name, categoryID);
+# передаются только изменяемые поля.
+class ProductSerializerBulkUpsertItem(ProductSerializerBulkItem):
+    id = serializers.IntegerField(required=False)
+    price = serializers.DecimalField(
+        max_digits=19, decimal_places=2,
+        min_value=Decimal('0.01'),
+        required=False,
+    )
+    categoryID = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = Product
+        fields = ('id', 'name', 'description', 'price', 'categoryID')
+        extra_kwargs = {'name': {'required': False}}
+        validators = []
+
+    def validate(self, data):
+        if 'id' not in data and ('name' not in data or 'categoryID' not in data):
+            raise serializers.ValidationError("Для товара без ID обязательны поля 'name' и 'categoryID'.")
+        return data
+
+
+# Класс, отвечающий за пакетное обновление/создание товаров (upsert).
+# Существующие товары загружаются двумя запросами (по id и по (name, categoryID)),
+# изменения записываются через bulk_update только в изменившиеся колонки.
+class ProductSerializerBulkUpsert(ProductSerializerBulkBase):
+    child_class = ProductSerializerBulkUpsertItem
+
+    # Соответствие полей запроса атрибутам модели
+    UPDATE_FIELDS = (
+        ('name', 'name'),
+        ('description', 'description'),
+        ('price', 'price'),
+        ('categoryID', 'categoryID_id'),
+    )
+
+    def validate_batch(self, items, errors):
+        self._validate_categories(items, errors)
+        valid = [(index, item) for index, item in enumerate(items) if item is not None]
+
+        by_id = Product.objects.in_bulk({item['id'] for _, item in valid if 'id' in item})
+
+        # Итоговый ключ (name, categoryID) каждого товара после применения изменений
+        keys = {}
+        for index, item in valid:
+            if 'id' in item:
+                instance = by_id.get(item['id'])
+                if instance is None:
+                    errors[index].setdefault('id', []).append("Товар с таким ID не найден.")
+                    items[index] = None
+                    continue
+                keys[index] = (item.get('name', instance.name), item.get('categoryID', instance.categoryID_id))
+            else:
+                keys[index] = (item['name'], item['categoryID'])
+
+        by_key = {
+            (product.name, product.categoryID_id): product
+            for product in Product.objects.filter(
+                name__in={name for name, _ in keys.values()},
+                categoryID__in={category for _, category in keys.values()},
+            )
+        }
+
+        self._targets = {}
+        seen_keys = set()
+        seen_ids = set()
+        for index, key in keys.items():
+            item = items[index]
+            existing = by_key.get(key)
+            instance = by_id[item['id']] if 'id' in item else existing
+
+            if instance is None and 'price' not in item:
+                errors[index].setdefault('price', []).append("Для создания товара требуется цена.")
+            elif existing is not None and instance is not None and existing.id != instance.id:
+                errors[index].setdefault(api_settings.NON_FIELD_ERRORS_KEY, []).append(
+                    f"Товар с названием '{key[0]}' в этой категории уже существует."
+                )
+            elif key in seen_keys or (instance is not None and instance.id in seen_ids):
+                errors[index].setdefault(api_settings.NON_FIELD_ERRORS_KEY, []).append(
+                    f"Товар с названием '{key[0]}' в этой категории повторяется в запросе."
+                )
+            else:
+                seen_keys.add(key)
+                if instance is not None:
+                    seen_ids.add(instance.id)
+                self._targets[index] = instance
+                continue
+            items[index] = None
+
+    # Заменяет выражение F('version') + 1 в обновленных экземплярах новыми
+    # версиями (строки заблокированы UPDATE до конца транзакции)
+    @staticmethod
+    def _refresh_versions(instances):
+        instances = {instance.pk: instance for instance in instances}
+        if not instances:
+            return
+        for pk, product in Product.objects.only('version').in_bulk(list(instances)).items():
+            instances[pk].version = product.version
+
+    def save(self, **kwargs):
+        results = []
+        to_create = []
+        to_update = defaultdict(list)
+
+        now = timezone.now()
+        for index, item in enumerate(self.validated_data):
+            instance = self._targets[index]
+            if instance is None:
+                instance = Product(
+                    name=item['name'],
+                    description=item.get('description', ''),
+                    price=item['price'],
+                    categoryID_id=item['categoryID'],
+                )
+                to_create.append(instance)
+                results.append({'index': index, 'instance': instance, 'status': 'created'})
+                continue
+
+            changed = []
+            for field, attname in self.UPDATE_FIELDS:
+                if field in item and getattr(instance, attname) != item[field]:
+                    setattr(instance, attname, item[field])
+                    changed.append(field)
+
+            # Товары группируются по набору изменившихся колонок, чтобы UPDATE
+            # затрагивал только их.
+            if changed:
+                # bulk_update не обновляет auto_now-поля сам
+                instance.updated_at = now
+                instance.version = F('version') + 1
+                to_update[tuple(changed) + ('updated_at', 'version')].append(instance)
+            results.append({'index': index, 'instance': instance, 'status': 'updated' if changed else 'unchanged'})
+
+        batch_size = settings.PRODUCT_BULK_BATCH_SIZE
+        try:
+            with transaction.atomic():
+                Product.objects.bulk_create(to_create, batch_size=batch_size)
+                for fields, instances in to_update.items():
+                    Product.objects.bulk_update(instances, fields, batch_size=batch_size)
+                self._refresh_versions(instance for instances in to_update.values() for instance in instances)
+                if to_create or to_update:
+                    record_catalog_changes(
+                        (CatalogChange.PRODUCT, CatalogChange.CREATED, [instance.pk for instance in to_create]),
+                        (CatalogChange.PRODUCT, CatalogChange.UPDATED,
+                         [instance.pk for instances in to_update.values() for instance in instances]),
+                    )
+        except IntegrityError as exc:
+            raise_duplicate_product(exc)
+
+        self.instance = [result['instance'] for result in results]
+        return [
+            {'index': result['index'], 'id': result['instance'].id, 'status': result['status']}
+            for result in results
+        ]
@@ -0,0 +1,141 @@
+# Модуль 'catalogChanges.py' отвечает за журнал изменений каталога, по
+# которому внешние системы синхронизируют свою копию каталога за O(изменений),
+# а не выгружают списки целиком.
+#
+# Каждая транзакция записи товаров или категорий вызывает
+# record_catalog_changes(): версия каталога увеличивается, и для каждого
+# затронутого объекта добавляется строка CatalogChange с номером, равным новой
+# версии. Строка версии блокируется до фиксации транзакции, поэтому следующая
+# транзакция получает больший номер только после фиксации предыдущей: номера
+# возрастают в порядке фиксации, и клиент, прочитавший изменения до номера N,
+# уже не получит новых изменений с номером меньше N.
+#
+# Клиент запоминает next_since из ответа и передает его в следующем запросе
+# (?since=). Начальный номер для полной синхронизации возвращается запросом
+# без since. Старые записи удаляются командой prune_catalog_changes; номер,
+# до которого журнал очищен, хранится в CatalogVersion (scope
+# CHANGES_PRUNED), и запрос с меньшим since завершается ошибкой
+# ChangeFeedExpired - клиент должен выполнить полную синхронизацию.
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Max
+
+from product.models.catalogChangeModel import CatalogChange
+from product.models.catalogVersionModel import CatalogVersion
+from product.services.catalogVersion import CATALOG, CATEGORIES, bump_catalog_version, get_catalog_version
+
+CHANGES_PRUNED = 'catalog-changes-pruned'
+
+
+# Журнал не содержит изменений после since (он очищен или since больше
+# текущей версии каталога)
+class ChangeFeedExpired(Exception):
+    pass
+
+
+# Увеличивает версию каталога и записывает изменения в журнал. changes -
+# кортежи (entity, op, ids). Должна вызываться внутри транзакции записи
+# (собственная точка сохранения не создается). Возвращает номер изменения.
+def record_catalog_changes(*changes):
+    with transaction.atomic(savepoint=False):
+        seq = bump_catalog_version()
+        # Отдельная версия категорий сбрасывает кэши категорий процессов
+        if any(entity == CatalogChange.CATEGORY and ids for entity, _, ids in changes):
+            bump_catalog_version(scope=CATEGORIES)
+        CatalogChange.objects.bulk_create(
+            [
+                CatalogChange(seq=seq, entity=entity, object_id=object_id, op=op)
+                for entity, op, ids in changes
+                for object_id in ids
+            ],
+            batch_size=settings.PRODUCT_BULK_BATCH_SIZE,
+        )
+    return seq
+
+
+# Номер, до которого журнал очищен (изменения с меньшими номерами недоступны)
+def get_feed_start():
+    value, _ = get_catalog_version(scope=CHANGES_PRUNED)
+    return value
+
+
+# Возвращает изменения после since: (изменения, next_since, has_more).
+# Изменение - словарь {seq, entity, id, op}; для каждого объекта возвращается
+# только последнее изменение. Изменения одной транзакции не разделяются между
+# страницами, поэтому страница может быть больше limit. Если since равен None,
+# возвращается только текущий номер.
+def read_catalog_changes(since, limit, request=None):
+    # Изменения читаются не дальше версии, прочитанной до них: транзакции
+    # с меньшими номерами к этому моменту уже зафиксированы.
+    version, _ = get_catalog_version(scope=CATALOG, request=request)
+    if since is None:
+        return [], version, False
+    if since > version:
+        raise ChangeFeedExpired
+
+    changes = CatalogChange.objects.filter(seq__gt=since, seq__lte=version).order_by('seq', 'id')
+    columns = ('seq', 'entity', 'object_id', 'op')
+    rows = list(changes.values_list(*columns)[:limit + 1])
+    has_more = len(rows) > limit
+    if has_more:
+        last = rows[limit][0]
+        rows = [row for row in rows[:limit] if row[0] < last]
+        if not rows:
+            # Одна транзакция изменила больше limit объектов
+            rows = list(changes.filter(seq=last).values_list(*columns))
+        next_since = rows[-1][0]
+    else:
+        next_since = version
+
+    # Проверка после чтения: журнал мог быть очищен во время запроса
+    if since < get_feed_start():
+        raise ChangeFeedExpired
+
+    latest = {}
+    for seq, entity, object_id, op in rows:
+        previous = latest.pop((entity, object_id), None)
+        # Объект, созданный после since, остается созданным для клиента
+        if previous is not None and previous['op'] == CatalogChange.CREATED and op != CatalogChange.DELETED:
+            op = CatalogChange.CREATED
+        latest[(entity, object_id)] = {'seq': seq, 'entity': entity, 'id': object_id, 'op': op}
+    return list(latest.values()), next_since, has_more
+
+
+# Удаляет записи журнала, созданные раньше before, пачками по chunk_size.
+# Возвращает (количество удаленных записей, номер начала журнала).
+def prune_catalog_changes(before, chunk_size=10000):
+    bound = CatalogChange.objects.filter(created_at__lt=before).aggregate(seq=Max('seq'))['seq']
+    if bound is None:
+        return 0, get_feed_start()
+
+    # Граница сдвигается до удаления: клиент с меньшим since получает
+    # ошибку, а не неполный список изменений
+    with transaction.atomic():
+        CatalogVersion.objects.select_for_update().filter(scope=CHANGES_PRUNED).first()
+        start = max(get_feed_start(), bound)
+        CatalogVersion.objects.update_or_create(scope=CHANGES_PRUNED, defaults={'value': start})
+
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                CatalogChange.objects.filter(seq__lte=start).order_by('id').values_list('id', flat=True)[:chunk_size]
+            )
+            if ids:
+                CatalogChange.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+        if len(ids) < chunk_size:
+            return deleted, start
+
+
+# Обработчик post_migrate: журнал начинается с текущей версии каталога.
+# Изменений, сделанных до появления журнала, в нем нет, поэтому клиенты с
+# меньшим since должны выполнить полную синхронизацию.
+def install_change_feed(sender, using='default', **kwargs):
+    if router.allow_migrate(using, sender.label) is False:
+        return
+    if CatalogVersion.objects.using(using).filter(scope=CHANGES_PRUNED).exists():
+        return
+    version = CatalogVersion.objects.using(using).filter(scope=CATALOG).values_list('value', flat=True).first()
+    CatalogVersion.objects.using(using).get_or_create(scope=CHANGES_PRUNED, defaults={'value': version or 0})
@@ -0,0 +1,259 @@
+# Модуль 'catalogImport.py' отвечает за потоковый импорт каталога товаров
+# (CSV или JSONL) пакетами. Используется командой import_catalog.
+#
+# Каждая строка содержит name, description, price и категорию: либо
+# 'categoryID' (id), либо 'category' (название). Поля проверяются по правилам
+# ProductSerializerBulkItem без запросов к базе; категории разрешаются по
+# словарю название -> id, загруженному один раз. Дубликаты (name, categoryID)
+# ищутся одним запросом на пакет. Каждый пакет записывается в отдельной
+# транзакции вместе с увеличением версии каталога; в PostgreSQL строки
+# загружаются через COPY во временную таблицу и переносятся одним INSERT.
+#
+# Память не зависит от размера входных данных: в памяти находятся только
+# текущий пакет и словарь категорий.
+
+import csv
+import io
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from product.models.catalogChangeModel import CatalogChange
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.serializers.productSerializer import ProductSerializerBulkItem
+from product.services.catalogChanges import record_catalog_changes
+
+FORMATS = ('csv', 'jsonl')
+ON_DUPLICATE = ('skip', 'error')
+
+STAGING_TABLE = '"ProductImportStaging"'
+
+
+# Ошибка в данных строки; строка пропускается
+class RowError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+# Читает строки источника как словари. Возвращает пары (номер строки, данные);
+# некорректная строка JSONL возвращается как RowError.
+def read_rows(stream, file_format):
+    if file_format == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row
+        return
+
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, RowError({api_settings.NON_FIELD_ERRORS_KEY: [f'Некорректный JSON: {exc}']})
+            continue
+        if not isinstance(row, dict):
+            row = RowError({api_settings.NON_FIELD_ERRORS_KEY: ['Строка должна быть JSON-объектом.']})
+        yield number, row
+
+
+# Результат импорта (накапливается между пакетами)
+class ImportStats:
+    def __init__(self, rows=0, inserted=0, duplicates=0, invalid=0):
+        self.rows = rows
+        self.inserted = inserted
+        self.duplicates = duplicates
+        self.invalid = invalid
+
+    def as_dict(self):
+        return {'rows': self.rows, 'inserted': self.inserted, 'duplicates': self.duplicates, 'invalid': self.invalid}
+
+
+# Класс, отвечающий за импорт пакетами
+class CatalogImporter:
+    def __init__(self, create_categories=False, on_duplicate='skip', batch_size=None):
+        self.create_categories = create_categories
+        self.on_duplicate = on_duplicate
+        self.batch_size = batch_size or settings.PRODUCT_BULK_BATCH_SIZE
+        self.validator = ProductSerializerBulkItem()
+        self.category_ids = dict(ProductCategory.objects.values_list('name', 'id'))
+        self.known_ids = set(self.category_ids.values())
+        self.stats = ImportStats()
+        self._staging_ready = False
+
+    # Импортирует строки пакетами. on_batch(stats, errors) вызывается после
+    # фиксации каждого пакета; errors - список пар (номер строки, ошибки).
+    def run(self, rows, on_batch=None):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            errors = self.import_batch(batch)
+            if on_batch is not None:
+                on_batch(self.stats, errors)
+        return self.stats
+
+    def import_batch(self, batch):
+        errors = []
+        items = []
+        new_categories = set()
+
+        for number, row in batch:
+            try:
+                item, category_name = self._validate_row(row)
+            except RowError as exc:
+                errors.append((number, exc.errors))
+                continue
+            if category_name is not None:
+                new_categories.add(category_name)
+            items.append((number, item, category_name))
+
+        invalid = len(errors)
+
+        with transaction.atomic():
+            category_ids = self._create_categories(new_categories) if new_categories else []
+            for _, item, category_name in items:
+                if category_name is not None:
+                    item['categoryID'] = self.category_ids[category_name]
+
+            products, duplicates = self._split_duplicates(items)
+            if self.on_duplicate == 'error':
+                for number, item in duplicates:
+                    message = f"Товар с названием '{item['name']}' в этой категории уже существует."
+                    errors.append((number, {api_settings.NON_FIELD_ERRORS_KEY: [message]}))
+
+            inserted = self._insert(products) if products else []
+            if inserted or category_ids:
+                record_catalog_changes(
+                    (CatalogChange.CATEGORY, CatalogChange.CREATED, category_ids),
+                    (CatalogChange.PRODUCT, CatalogChange.CREATED, inserted),
+                )
+
+        errors.sort(key=lambda error: error[0])
+        self.stats.rows += len(batch)
+        self.stats.inserted += len(inserted)
+        # Сюда же попадают строки, вставленные конкурентно (ON CONFLICT DO NOTHING)
+        self.stats.duplicates += len(duplicates) + len(products) - len(inserted)
+        self.stats.invalid += invalid
+        return errors
+
+    # Проверка строки без запросов к базе. Возвращает данные товара и название
+    # категории, которую нужно создать (или None).
+    def _validate_row(self, row):
+        if isinstance(row, RowError):
+            raise row
+
+        data = {key: value for key, value in row.items() if key in ('name', 'description', 'price', 'categoryID')}
+        category_name = None
+        if data.get('categoryID') in (None, ''):
+            name = (row.get('category') or '').strip()
+            if not name:
+                raise RowError({'categoryID': ['Не указана категория (categoryID или category).']})
+            if len(name) > ProductCategory._meta.get_field('name').max_length:
+                raise RowError({'category': ['Название категории слишком длинное.']})
+            if name in self.category_ids:
+                data['categoryID'] = self.category_ids[name]
+            elif self.create_categories:
+                data['categoryID'] = 0
+                category_name = name
+            else:
+                raise RowError({'category': [f"Категория '{name}' не существует."]})
+
+        try:
+            item = dict(self.validator.run_validation(data))
+        except serializers.ValidationError as exc:
+            raise RowError(exc.detail)
+
+        if category_name is None and item['categoryID'] not in self.known_ids:
+            raise RowError({'categoryID': ['Категория с таким ID не существует.']})
+        return item, category_name
+
+    def _create_categories(self, names):
+        names = sorted(names - set(self.category_ids))
+        # Категория могла быть создана конкурентно: конфликты пропускаются,
+        # а id читаются заново.
+        ProductCategory.objects.bulk_create([ProductCategory(name=name) for name in names], ignore_conflicts=True)
+        created = dict(ProductCategory.objects.filter(name__in=names).values_list('name', 'id'))
+        self.category_ids.update(created)
+        self.known_ids.update(created.values())
+        return list(created.values())
+
+    # Дубликаты ищутся одним запросом в базе и внутри пакета
+    def _split_duplicates(self, items):
+        if not items:
+            return [], []
+        existing = set(
+            Product.objects.filter(
+                name__in={item['name'] for _, item, _ in items},
+                categoryID__in={item['categoryID'] for _, item, _ in items},
+            ).values_list('name', 'categoryID')
+        )
+        products, duplicates = [], []
+        for number, item, _ in items:
+            key = (item['name'], item['categoryID'])
+            if key in existing:
+                duplicates.append((number, item))
+            else:
+                existing.add(key)
+                products.append(item)
+        return products, duplicates
+
+    # Возвращает id вставленных товаров
+    def _insert(self, items):
+        if connection.vendor == 'postgresql':
+            return self._copy_insert(items)
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    name=item['name'],
+                    description=item.get('description', ''),
+                    price=item['price'],
+                    categoryID_id=item['categoryID'],
+                )
+                for item in items
+            ],
+            batch_size=settings.PRODUCT_BULK_BATCH_SIZE,
+        )
+        return [product.pk for product in products]
+
+    # PostgreSQL: COPY во временную таблицу и перенос одним INSERT. Строки,
+    # вставленные конкурентно после проверки дубликатов, пропускаются.
+    def _copy_insert(self, items):
+        columns = [Product._meta.get_field(name).column for name in ('name', 'description', 'price', 'categoryID')]
+        quoted = ', '.join(connection.ops.quote_name(column) for column in columns)
+        updated_at = connection.ops.quote_name(Product._meta.get_field('updated_at').column)
+        version = connection.ops.quote_name(Product._meta.get_field('version').column)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for item in items:
+            writer.writerow((item['name'], item.get('description', ''), item['price'], item['categoryID']))
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            if not self._staging_ready:
+                cursor.execute(
+                    f'CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} ('
+                    f'{connection.ops.quote_name(columns[0])} varchar(100) NOT NULL, '
+                    f'{connection.ops.quote_name(columns[1])} text NOT NULL, '
+                    f'{connection.ops.quote_name(columns[2])} numeric(19, 2) NOT NULL, '
+                    f'{connection.ops.quote_name(columns[3])} bigint NOT NULL'
+                    f') ON COMMIT DELETE ROWS'
+                )
+                self._staging_ready = True
+            cursor.copy_expert(f'COPY {STAGING_TABLE} ({quoted}) FROM STDIN WITH (FORMAT csv)', buffer)
+            cursor.execute(
+                f'INSERT INTO "{Product._meta.db_table}" ({quoted}, {updated_at}, {version}) '
+                f'SELECT {quoted}, %s, %s FROM {STAGING_TABLE} '
+                f'ON CONFLICT ON CONSTRAINT product_name_category_uniq DO NOTHING RETURNING "id"',
+                [timezone.now(), Product._meta.get_field('version').default],
+            )
+            return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,359 @@
+# Модуль 'catalogSnapshot.py' отвечает за готовые снимки (snapshots) ответов
+# каталога: полных списков без параметров запроса и выгрузки каталога.
+#
+# Снимок - это тело ответа для определенной версии каталога, уже закодированное
+# в JSON (NDJSON/CSV) и сжатое gzip и brotli (если установлен пакет brotli).
+# Снимки хранятся в файлах каталога CATALOG_SNAPSHOT_DIR, общего для всех
+# воркеров: небольшие тела отдаются из отображенной в память копии файла
+# (mmap), большие - потоком из файла. Формат сжатия выбирается по заголовку
+# Accept-Encoding, поэтому на пути запроса нет ни сериализации, ни сжатия.
+#
+# Снимки строятся в фоновом потоке: при первом запросе (ответ в этот раз
+# строится обычным образом) и после каждого изменения каталога (сигнал
+# catalog_version_changed); серия записей, пришедших в течение
+# CATALOG_SNAPSHOT_DELAY секунд, приводит к одной пересборке. Снимок
+# используется, только если его версия совпадает с текущей версией каталога,
+# поэтому устаревшие данные не отдаются. Команда build_catalog_snapshots
+# строит снимки заранее, например при развертывании.
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from functools import wraps
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import FileResponse, HttpRequest, HttpResponse, QueryDict
+from django.urls import resolve
+from django.utils.cache import patch_vary_headers
+
+from product.services.catalogVersion import CATALOG, aget_catalog_version, get_catalog_version
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Суффиксы файлов снимка по значению Content-Encoding
+EXTENSIONS = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# Максимальное количество отслеживаемых снимков в процессе (ключ списка
+# содержит адрес сервера из заголовка Host)
+MAX_SOURCES = 64
+
+
+# Ответ не подходит для снимка (например, каталог пуст)
+class SnapshotSkipped(Exception):
+    pass
+
+
+# Класс, отвечающий за построение тела снимка. Подклассы задают key,
+# content_type и метод chunks().
+class SnapshotSource:
+    key = None
+    content_type = None
+    headers = {}
+
+    # Возвращает тело ответа частями (bytes) для версии version - пары
+    # (версия, время изменения), прочитанной перед построением.
+    def chunks(self, version):
+        raise NotImplementedError
+
+
+# Снимок списка: ответ представления для адреса без параметров запроса.
+# Строится вызовом представления с запросом, собранным по адресу.
+class ListSnapshotSource(SnapshotSource):
+    content_type = 'application/json'
+
+    def __init__(self, url):
+        self.key = url
+
+    def chunks(self, version):
+        parts = urlsplit(self.key)
+        request = HttpRequest()
+        request.method = 'GET'
+        request.path = request.path_info = parts.path
+        request.GET = QueryDict()
+        request.META = {
+            'HTTP_HOST': parts.netloc,
+            'HTTP_ACCEPT': self.content_type,
+            'SERVER_NAME': parts.hostname,
+            'SERVER_PORT': str(parts.port or (443 if parts.scheme == 'https' else 80)),
+            'QUERY_STRING': '',
+        }
+        request._get_scheme = lambda: parts.scheme
+        request._catalog_versions = {CATALOG: version}
+        request._catalog_snapshot_build = True
+
+        view = resolve(parts.path).func
+        if iscoroutinefunction(view):
+            response = async_to_sync(view)(request)
+        else:
+            response = view(request)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code != 200:
+            raise SnapshotSkipped(response.status_code)
+        yield response.content
+
+
+# Класс, отвечающий за готовый снимок определенной версии
+class Snapshot:
+    def __init__(self, source, version, paths):
+        self.source = source
+        self.version = version
+        self.paths = paths
+        self.sizes = {encoding: os.path.getsize(path) for encoding, path in paths.items()}
+        # Небольшие тела отображаются в память сразу, поэтому удаление файлов
+        # при следующей пересборке на них не влияет
+        self._buffers = {
+            encoding: _map_file(path, self.sizes[encoding])
+            for encoding, path in paths.items()
+            if self.sizes[encoding] <= settings.CATALOG_SNAPSHOT_MEMORY_LIMIT
+        }
+
+    # Возвращает ответ или None, если файл снимка уже удален
+    def response(self, encoding):
+        if encoding in self._buffers:
+            response = HttpResponse(self._buffers[encoding], content_type=self.source.content_type)
+        else:
+            try:
+                file = open(self.paths[encoding], 'rb')
+            except FileNotFoundError:
+                return None
+            response = FileResponse(file, content_type=self.source.content_type)
+            del response['Content-Disposition']
+        for header, value in self.source.headers.items():
+            response[header] = value
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+def _map_file(path, size):
+    if not size:
+        return b''
+    with open(path, 'rb') as file:
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+# Потоковые компрессоры: Content-Encoding -> (compress(chunk), flush())
+def _compressors():
+    compressors = {}
+    gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    compressors['gzip'] = (gzip.compress, gzip.flush)
+    if brotli is not None:
+        br = brotli.Compressor(quality=BROTLI_QUALITY)
+        compressors['br'] = (br.process, br.finish)
+    return compressors
+
+
+# Класс, отвечающий за хранение снимков и их фоновую пересборку
+class SnapshotStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self._snapshots = {}
+        self._sources = {}
+        self._pending = {}
+        self._due = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+
+    @property
+    def encodings(self):
+        return ('identity', 'gzip', 'br') if brotli is not None else ('identity', 'gzip')
+
+    def _path(self, key, version, encoding):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}-v{version}{EXTENSIONS[encoding]}')
+
+    # Возвращает снимок текущей версии или None. Снимок, построенный другим
+    # воркером, находится по имени файла.
+    def get(self, source, version):
+        snapshot = self._snapshots.get(source.key)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        paths = {encoding: self._path(source.key, version, encoding) for encoding in self.encodings}
+        try:
+            snapshot = Snapshot(source, version, paths)
+        except FileNotFoundError:
+            return None
+        self._snapshots[source.key] = snapshot
+        return snapshot
+
+    # Ставит снимки в очередь фоновой пересборки
+    def schedule(self, sources=None, delay=0.0):
+        with self._lock:
+            if sources is None:
+                sources = list(self._sources.values())
+            for source in sources:
+                if source.key not in self._sources and len(self._sources) >= MAX_SOURCES:
+                    continue
+                self._sources[source.key] = source
+                if not self._pending:
+                    self._due = time.monotonic() + delay
+                self._pending[source.key] = source
+            if self._pending:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='catalog-snapshots', daemon=True)
+                    self._thread.start()
+                self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._pending:
+                    self._wakeup.wait()
+                # Записи, пришедшие до срока, объединяются в одну пересборку
+                while (remaining := self._due - time.monotonic()) > 0:
+                    self._wakeup.wait(remaining)
+                pending, self._pending = self._pending, {}
+            try:
+                for source in pending.values():
+                    try:
+                        self.build(source)
+                    except SnapshotSkipped:
+                        pass
+                    except Exception:
+                        logger.exception('Ошибка при построении снимка %s', source.key)
+            finally:
+                connections.close_all()
+
+    # Строит снимок для текущей версии каталога (если его еще нет)
+    def build(self, source):
+        version = get_catalog_version()
+        current = self.get(source, version[0])
+        if current is not None:
+            return current
+
+        os.makedirs(self.directory, exist_ok=True)
+        paths = {encoding: self._path(source.key, version[0], encoding) for encoding in self.encodings}
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        files = {encoding: open(path + suffix, 'wb') for encoding, path in paths.items()}
+        compressors = _compressors()
+        try:
+            for chunk in source.chunks(version):
+                files['identity'].write(chunk)
+                for encoding, (compress, _) in compressors.items():
+                    files[encoding].write(compress(chunk))
+            for encoding, (_, flush) in compressors.items():
+                files[encoding].write(flush())
+        except BaseException:
+            for encoding, file in files.items():
+                file.close()
+                os.remove(paths[encoding] + suffix)
+            raise
+
+        for encoding, file in files.items():
+            file.close()
+            os.replace(paths[encoding] + suffix, paths[encoding])
+        self._remove_old(source.key, version[0])
+
+        snapshot = Snapshot(source, version[0], paths)
+        self._snapshots[source.key] = snapshot
+        return snapshot
+
+    # Удаляет файлы предыдущих версий снимка. Воркеры, которые еще отдают
+    # старый снимок, продолжают читать уже открытые файлы.
+    def _remove_old(self, key, version):
+        prefix = hashlib.sha1(key.encode('utf-8')).hexdigest() + '-v'
+        current = f'{prefix}{version}'
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and not name.endswith('.tmp') and name.split('.')[0] != current:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Возвращает хранилище снимков или None, если снимки отключены
+def get_snapshot_store():
+    global _store
+    if not settings.CATALOG_SNAPSHOTS:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SnapshotStore(settings.CATALOG_SNAPSHOT_DIR)
+    return _store
+
+
+# Обработчик сигнала catalog_version_changed: пересборка известных снимков
+def rebuild_catalog_snapshots(sender, scope, **kwargs):
+    store = get_snapshot_store()
+    if store is not None and scope == CATALOG:
+        store.schedule(delay=settings.CATALOG_SNAPSHOT_DELAY)
+
+
+# Выбор Content-Encoding по заголовку Accept-Encoding
+def negotiate_encoding(header, encodings):
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in ('br', 'gzip'):
+        if encoding in encodings and accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return 'identity'
+
+
+def _snapshot_response(request, source, version):
+    store = get_snapshot_store()
+    snapshot = store.get(source, version)
+    if snapshot is None:
+        store.schedule([source])
+        return None
+    return snapshot.response(negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), snapshot.paths))
+
+
+# Возвращает ответ из снимка или None (снимок еще не построен; в этом случае
+# он ставится в очередь на построение)
+def catalog_snapshot_response(request, source):
+    if get_snapshot_store() is None or getattr(request, '_catalog_snapshot_build', False):
+        return None
+    version, _ = get_catalog_version(request=request)
+    return _snapshot_response(request, source, version)
+
+
+# Асинхронный вариант для представлений, работающих под ASGI
+async def acatalog_snapshot_response(request, source):
+    if get_snapshot_store() is None or getattr(request, '_catalog_snapshot_build', False):
+        return None
+    version, _ = await aget_catalog_version(request=request)
+    return _snapshot_response(request, source, version)
+
+
+# Декоратор метода get() списка (APIView): запрос без параметров в формате
+# JSON обслуживается из снимка
+def serve_catalog_snapshot(method):
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if not request.query_params and request.accepted_media_type == 'application/json':
+            response = catalog_snapshot_response(request, ListSnapshotSource(request.build_absolute_uri()))
+            if response is not None:
+                return response
+        return method(self, request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,75 @@
+# Модуль 'catalogVersion.py' отвечает за версию каталога - счетчик, который
+# увеличивается при каждой записи товаров или категорий. Версия используется
+# как часть ключа кэша ответов, поэтому инвалидация кэша сводится к
+# увеличению счетчика в той же транзакции, что и сама запись.
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from product.models.catalogVersionModel import CatalogVersion
+from product.services.updateReturning import update_returning
+
+CATALOG = 'catalog'
+# Версия категорий: увеличивается только при записи категорий (см. categoryCache.py)
+CATEGORIES = 'category'
+
+# Сигнал отправляется после фиксации транзакции, увеличившей версию.
+# Аргументы: scope.
+catalog_version_changed = Signal()
+
+
+# Увеличивает версию каталога и возвращает новое значение. Должна вызываться
+# внутри транзакции записи: строка счетчика блокируется до фиксации, а новая
+# версия становится видна одновременно с изменёнными данными. Новое значение
+# возвращается самим UPDATE, точка сохранения нужна только при создании счетчика.
+def bump_catalog_version(scope=CATALOG):
+    now = timezone.now()
+    counter = CatalogVersion.objects.filter(scope=scope)
+    with transaction.atomic(savepoint=False):
+        values = update_returning(counter, 'value', value=F('value') + 1, updated_at=now)
+        if not values:
+            try:
+                with transaction.atomic():
+                    CatalogVersion.objects.create(scope=scope, value=1, updated_at=now)
+                values = [1]
+            except IntegrityError:
+                # Счетчик создан конкурентной транзакцией
+                values = update_returning(counter, 'value', value=F('value') + 1, updated_at=now)
+        version = values[0]
+
+    transaction.on_commit(lambda: catalog_version_changed.send(sender=CatalogVersion, scope=scope))
+    return version
+
+
+# Возвращает пару (версия, время изменения). Для пустой базы - (0, None).
+# Если передан request, значение запоминается на время запроса, чтобы кэш
+# ответов и проверка ETag обходились одним запросом к базе.
+def get_catalog_version(scope=CATALOG, request=None):
+    versions = getattr(request, '_catalog_versions', None)
+    if versions is not None and scope in versions:
+        return versions[scope]
+
+    row = CatalogVersion.objects.filter(scope=scope).values_list('value', 'updated_at').first()
+    row = row or (0, None)
+    if request is not None:
+        if versions is None:
+            versions = request._catalog_versions = {}
+        versions[scope] = row
+    return row
+
+
+# Асинхронный вариант get_catalog_version для представлений под ASGI
+async def aget_catalog_version(scope=CATALOG, request=None):
+    versions = getattr(request, '_catalog_versions', None)
+    if versions is not None and scope in versions:
+        return versions[scope]
+
+    row = await CatalogVersion.objects.filter(scope=scope).values_list('value', 'updated_at').afirst()
+    row = row or (0, None)
+    if request is not None:
+        if versions is None:
+            versions = request._catalog_versions = {}
+        versions[scope] = row
+    return row
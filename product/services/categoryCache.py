@@ -0,0 +1,183 @@
+# Модуль 'categoryCache.py' отвечает за кэш категорий в памяти процесса.
+#
+# Категорий мало, а читаются они при каждой записи товара (проверка
+# categoryID) и при каждом чтении списка товаров (вложенная категория).
+# Кэш хранит строки категорий (id, name, description) с индексами
+# id -> строка и name -> id и ограничен CATEGORY_CACHE_MAX_ENTRIES записями
+# (давно не использованные вытесняются). Отсутствующие в кэше категории
+# загружаются одним запросом на набор id или названий.
+#
+# Актуальность проверяется по версии CatalogVersion со scope CATEGORIES,
+# которая увеличивается при каждой записи категорий (см. catalogChanges.py):
+#
+#   - при чтении списков версия каталога уже прочитана для ETag и кэша
+#     ответов, поэтому, пока она не изменилась, кэш используется без
+#     запросов; после ее изменения версия категорий читается один раз;
+#   - без запроса (проверка при записи, команды) версия категорий читается
+#     не чаще раза в CATEGORY_CACHE_CHECK_INTERVAL секунд. Категория,
+#     удаленная в другом процессе за это время, отклоняется внешним ключом
+#     в базе при записи товара.
+#
+# Процесс, изменивший категории, очищает свой кэш сразу после фиксации
+# транзакции (сигнал catalog_version_changed).
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from product.models.productCategoryModel import ProductCategory
+from product.services.catalogVersion import CATALOG, CATEGORIES, aget_catalog_version, get_catalog_version
+
+
+# Класс, отвечающий за кэш категорий процесса
+class CategoryCache:
+    FIELDS = ('id', 'name', 'description')
+
+    def __init__(self, max_entries, check_interval):
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self._rows = OrderedDict()
+        self._ids_by_name = {}
+        self._lock = threading.Lock()
+        # Версия категорий и версия каталога при последней проверке
+        self._version = None
+        self._catalog_version = None
+        self._checked_at = None
+
+    # Версия каталога, уже прочитанная в рамках запроса (или None)
+    @staticmethod
+    def _request_catalog_version(request):
+        versions = getattr(request, '_catalog_versions', None)
+        if versions and CATALOG in versions:
+            return versions[CATALOG][0]
+        return None
+
+    def _is_fresh(self, catalog_version):
+        # Выключенный кэш ничего не хранит
+        if not self.max_entries:
+            return True
+        if catalog_version is not None:
+            return catalog_version == self._catalog_version
+        return self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval
+
+    def _checked(self, version, catalog_version):
+        with self._lock:
+            if version != self._version:
+                self._rows.clear()
+                self._ids_by_name.clear()
+                self._version = version
+            if catalog_version is not None:
+                self._catalog_version = catalog_version
+            self._checked_at = time.monotonic()
+
+    # Сбрасывает кэш, если категории изменились в другом процессе
+    def refresh(self, request=None):
+        catalog_version = self._request_catalog_version(request)
+        if not self._is_fresh(catalog_version):
+            version, _ = get_catalog_version(scope=CATEGORIES, request=request)
+            self._checked(version, catalog_version)
+
+    async def arefresh(self, request=None):
+        catalog_version = self._request_catalog_version(request)
+        if not self._is_fresh(catalog_version):
+            version, _ = await aget_catalog_version(scope=CATEGORIES, request=request)
+            self._checked(version, catalog_version)
+
+    def _store(self, rows):
+        if not self.max_entries:
+            return
+        with self._lock:
+            for row in rows:
+                previous = self._rows.pop(row['id'], None)
+                if previous is not None:
+                    self._ids_by_name.pop(previous['name'], None)
+                self._rows[row['id']] = row
+                self._ids_by_name[row['name']] = row['id']
+            while len(self._rows) > self.max_entries:
+                _, evicted = self._rows.popitem(last=False)
+                self._ids_by_name.pop(evicted['name'], None)
+
+    def _lookup(self, ids):
+        found = {}
+        with self._lock:
+            for pk in ids:
+                row = self._rows.get(pk)
+                if row is not None:
+                    self._rows.move_to_end(pk)
+                    found[pk] = row
+        return found
+
+    def _lookup_names(self, names):
+        with self._lock:
+            return {name: self._ids_by_name[name] for name in names if name in self._ids_by_name}
+
+    # Возвращает {id: строка} для существующих категорий из ids
+    def get_many(self, ids, request=None):
+        self.refresh(request)
+        found = self._lookup(ids)
+        missing = set(ids) - found.keys()
+        if missing:
+            rows = list(ProductCategory.objects.filter(pk__in=missing).values(*self.FIELDS))
+            self._store(rows)
+            found.update((row['id'], row) for row in rows)
+        return found
+
+    async def aget_many(self, ids, request=None):
+        await self.arefresh(request)
+        found = self._lookup(ids)
+        missing = set(ids) - found.keys()
+        if missing:
+            rows = [row async for row in ProductCategory.objects.filter(pk__in=missing).values(*self.FIELDS)]
+            self._store(rows)
+            found.update((row['id'], row) for row in rows)
+        return found
+
+    # Возвращает строку категории или None, если категории нет
+    def get(self, pk, request=None):
+        return self.get_many((pk,), request=request).get(pk)
+
+    async def aget(self, pk, request=None):
+        return (await self.aget_many((pk,), request=request)).get(pk)
+
+    # Возвращает {название: id} для существующих категорий из names
+    def ids_by_name(self, names, request=None):
+        self.refresh(request)
+        found = self._lookup_names(names)
+        missing = set(names) - found.keys()
+        if missing:
+            rows = list(ProductCategory.objects.filter(name__in=missing).values(*self.FIELDS))
+            self._store(rows)
+            found.update((row['name'], row['id']) for row in rows)
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._ids_by_name.clear()
+
+
+# Экземпляр модели по строке кэша (для присваивания внешнему ключу)
+def category_from_row(row):
+    return ProductCategory.from_db(DEFAULT_DB_ALIAS, CategoryCache.FIELDS, [row[field] for field in CategoryCache.FIELDS])
+
+
+_category_cache = None
+
+
+# Возвращает кэш процесса. Если кэш выключен (CATEGORY_CACHE), строки не
+# сохраняются и каждый вызов читает категории из базы.
+def get_category_cache():
+    global _category_cache
+    if _category_cache is None:
+        max_entries = settings.CATEGORY_CACHE_MAX_ENTRIES if settings.CATEGORY_CACHE else 0
+        _category_cache = CategoryCache(max_entries, settings.CATEGORY_CACHE_CHECK_INTERVAL)
+    return _category_cache
+
+
+# Обработчик catalog_version_changed: категории изменены этим процессом
+def invalidate_category_cache(sender, scope, **kwargs):
+    if scope == CATEGORIES and _category_cache is not None:
+        _category_cache.clear()
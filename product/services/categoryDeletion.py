@@ -0,0 +1,139 @@
+# Модуль 'categoryDeletion.py' отвечает за удаление категорий без длинных
+# транзакций. Каскадное удаление Django загружает все связанные товары в
+# память и удаляет их в одной транзакции, блокирующей таблицу; вместо этого:
+#
+#   - категория, в которой не больше CATEGORY_DELETE_SYNC_THRESHOLD товаров,
+#     удаляется сразу: товары - одним запросом DELETE по CategoryID, затем
+#     категория, в одной транзакции;
+#   - для большей категории создается задача CategoryDeletionJob. Товары
+#     удаляются пачками по CATEGORY_DELETE_CHUNK_SIZE, каждая пачка в своей
+#     транзакции, после чего удаляется категория. Задача выполняется в
+#     фоновом потоке (CATEGORY_DELETE_BACKGROUND) или командой
+#     process_category_deletions, которая также подхватывает прерванные задачи.
+#
+# Каждая транзакция увеличивает версию каталога, поэтому удаленные товары
+# сразу пропадают из кэшированных списков, и записывает удаленные объекты в
+# журнал изменений (см. services/catalogChanges.py).
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from product.models.catalogChangeModel import CatalogChange
+from product.models.categoryDeletionJobModel import CategoryDeletionJob
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.services.catalogChanges import record_catalog_changes
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (CategoryDeletionJob.PENDING, CategoryDeletionJob.RUNNING)
+
+
+# Удаляет категорию. Возвращает None, если категория удалена сразу, или
+# задачу CategoryDeletionJob, если удаление выполняется в фоне.
+def delete_category(category):
+    threshold = settings.CATEGORY_DELETE_SYNC_THRESHOLD
+    products = Product.objects.filter(categoryID_id=category.pk)
+
+    # COUNT с LIMIT: не просматривает больше threshold + 1 строк индекса
+    if products[:threshold + 1].count() <= threshold:
+        with transaction.atomic():
+            # id товаров (не больше threshold) нужны для журнала изменений
+            ids = list(products.values_list('id', flat=True))
+            # У товаров нет зависимых объектов, поэтому Django удаляет их одним
+            # запросом DELETE, не загружая в память.
+            products.delete()
+            ProductCategory.objects.filter(pk=category.pk).delete()
+            record_catalog_changes(
+                (CatalogChange.PRODUCT, CatalogChange.DELETED, ids),
+                (CatalogChange.CATEGORY, CatalogChange.DELETED, [category.pk]),
+            )
+        return None
+
+    with transaction.atomic():
+        job = CategoryDeletionJob.objects.filter(category_id=category.pk, status__in=ACTIVE_STATUSES).first()
+        if job is None:
+            job = CategoryDeletionJob.objects.create(
+                category_id=category.pk,
+                category_name=category.name,
+                total=products.count(),
+            )
+            transaction.on_commit(lambda: start_deletion_job(job.pk))
+    return job
+
+
+# Запускает задачу в фоновом потоке (если это разрешено настройками)
+def start_deletion_job(job_id):
+    if not settings.CATEGORY_DELETE_BACKGROUND:
+        return
+    thread = threading.Thread(
+        target=_run_in_thread, args=(job_id,), name=f'category-deletion-{job_id}', daemon=True,
+    )
+    thread.start()
+
+
+def _run_in_thread(job_id):
+    try:
+        run_deletion_job(job_id)
+    finally:
+        connections.close_all()
+
+
+# Захватывает задачу условным UPDATE, чтобы одну задачу не выполняли два
+# обработчика. Задача в статусе running, не обновлявшаяся stale_after секунд,
+# считается прерванной и может быть захвачена повторно.
+def claim_deletion_job(job_id, stale_after=None):
+    now = timezone.now()
+    condition = Q(status=CategoryDeletionJob.PENDING)
+    if stale_after is not None:
+        condition |= Q(status=CategoryDeletionJob.RUNNING, updated_at__lt=now - timedelta(seconds=stale_after))
+    return bool(
+        CategoryDeletionJob.objects.filter(condition, pk=job_id)
+        .update(status=CategoryDeletionJob.RUNNING, updated_at=now)
+    )
+
+
+# Выполняет задачу. Возвращает False, если задача уже выполняется другим
+# обработчиком или завершена.
+def run_deletion_job(job_id, stale_after=None):
+    if not claim_deletion_job(job_id, stale_after=stale_after):
+        return False
+
+    job = CategoryDeletionJob.objects.get(pk=job_id)
+    chunk_size = settings.CATEGORY_DELETE_CHUNK_SIZE
+    jobs = CategoryDeletionJob.objects.filter(pk=job_id)
+    try:
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    Product.objects.filter(categoryID_id=job.category_id)
+                    .order_by('id').values_list('id', flat=True)[:chunk_size]
+                )
+                if ids:
+                    Product.objects.filter(pk__in=ids).delete()
+                    record_catalog_changes((CatalogChange.PRODUCT, CatalogChange.DELETED, ids))
+                jobs.update(deleted=F('deleted') + len(ids), updated_at=timezone.now())
+            if len(ids) < chunk_size:
+                break
+
+        # Товары, добавленные в категорию во время удаления, удаляются каскадно
+        with transaction.atomic():
+            ids = list(Product.objects.filter(categoryID_id=job.category_id).values_list('id', flat=True))
+            ProductCategory.objects.filter(pk=job.category_id).delete()
+            record_catalog_changes(
+                (CatalogChange.PRODUCT, CatalogChange.DELETED, ids),
+                (CatalogChange.CATEGORY, CatalogChange.DELETED, [job.category_id]),
+            )
+            now = timezone.now()
+            jobs.update(status=CategoryDeletionJob.DONE, updated_at=now, finished_at=now)
+    except Exception as exc:
+        logger.exception('Ошибка при удалении категории %s (задача %s)', job.category_id, job_id)
+        now = timezone.now()
+        jobs.update(status=CategoryDeletionJob.FAILED, error=str(exc), updated_at=now, finished_at=now)
+    return True
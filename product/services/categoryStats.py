@@ -0,0 +1,227 @@
+# Модуль 'categoryStats.py' отвечает за сводную статистику товаров по
+# категориям (количество, минимальная, максимальная и средняя цена).
+#
+# Статистика хранится в таблице "CategoryStats" и поддерживается триггерами
+# базы данных на таблице Product, поэтому она обновляется в той же транзакции
+# при любой записи товаров: через сериализаторы, пакетные операции, импорт
+# (COPY), админку и каскадное удаление категорий. Обновление инкрементальное:
+# к счетчикам прибавляются или вычитаются значения измененных строк, а
+# минимум/максимум пересчитываются только при удалении товара с крайней
+# ценой - одним поиском по индексу (CategoryID, Price).
+#
+#   - SQLite: строчные триггеры;
+#   - PostgreSQL: триггеры уровня оператора с таблицами переходов, поэтому
+#     пакетная вставка или удаление обновляет каждую категорию один раз.
+#
+# Триггеры создаются обработчиком post_migrate (см. ProductConfig.ready).
+# Команда rebuild_category_stats пересчитывает таблицу с нуля и проверяет ее.
+
+from django.db import connections, router, transaction
+from django.db.models import Count, Max, Min, Sum
+
+from product.models.categoryStatsModel import CategoryStats
+from product.models.productModel import Product
+
+STATS_COLUMNS = '"CategoryID", "ProductCount", "PriceSum", "MinPrice", "MaxPrice"'
+
+REBUILD_SQL = (
+    f'INSERT INTO "CategoryStats" ({STATS_COLUMNS}) '
+    'SELECT "CategoryID", COUNT(*), SUM("Price"), MIN("Price"), MAX("Price") '
+    'FROM "Product" GROUP BY "CategoryID"'
+)
+
+
+# Базовый класс бэкенда статистики
+class StatsBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        raise NotImplementedError
+
+    # Пересчитывает таблицу по всем товарам
+    def rebuild(self):
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM "CategoryStats"')
+            cursor.execute(REBUILD_SQL)
+
+    # Заполняет таблицу, если она пуста, а товары уже есть (первая установка)
+    def backfill(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT EXISTS(SELECT 1 FROM "CategoryStats"), EXISTS(SELECT 1 FROM "Product")')
+            has_stats, has_products = cursor.fetchone()
+        if has_products and not has_stats:
+            self.rebuild()
+
+
+# Строчные триггеры (SQLite)
+class SQLiteStatsBackend(StatsBackend):
+    # Добавление строки row (new или old) к статистике ее категории
+    @staticmethod
+    def _add(row):
+        return (
+            f'INSERT INTO "CategoryStats" ({STATS_COLUMNS}) '
+            f'VALUES ({row}."CategoryID", 1, {row}."Price", {row}."Price", {row}."Price") '
+            'ON CONFLICT ("CategoryID") DO UPDATE SET '
+            '"ProductCount" = "ProductCount" + 1, '
+            '"PriceSum" = "PriceSum" + excluded."PriceSum", '
+            # MIN/MAX с NULL возвращают NULL: пустая категория получает цену товара
+            '"MinPrice" = coalesce(min("MinPrice", excluded."MinPrice"), excluded."MinPrice"), '
+            '"MaxPrice" = coalesce(max("MaxPrice", excluded."MaxPrice"), excluded."MaxPrice");'
+        )
+
+    # Вычитание строки row из статистики ее категории
+    @staticmethod
+    def _subtract(row):
+        return (
+            'UPDATE "CategoryStats" SET '
+            '"ProductCount" = "ProductCount" - 1, '
+            f'"PriceSum" = "PriceSum" - {row}."Price", '
+            f'"MinPrice" = CASE WHEN {row}."Price" <= "MinPrice" THEN '
+            f'(SELECT MIN("Price") FROM "Product" WHERE "CategoryID" = {row}."CategoryID") ELSE "MinPrice" END, '
+            f'"MaxPrice" = CASE WHEN {row}."Price" >= "MaxPrice" THEN '
+            f'(SELECT MAX("Price") FROM "Product" WHERE "CategoryID" = {row}."CategoryID") ELSE "MaxPrice" END '
+            f'WHERE "CategoryID" = {row}."CategoryID";'
+        )
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TRIGGER IF NOT EXISTS "CategoryStats_insert" AFTER INSERT ON "Product" '
+                f'BEGIN {self._add("new")} END'
+            )
+            cursor.execute(
+                'CREATE TRIGGER IF NOT EXISTS "CategoryStats_delete" AFTER DELETE ON "Product" '
+                f'BEGIN {self._subtract("old")} END'
+            )
+            cursor.execute(
+                'CREATE TRIGGER IF NOT EXISTS "CategoryStats_update" '
+                'AFTER UPDATE OF "Price", "CategoryID" ON "Product" '
+                'WHEN old."Price" <> new."Price" OR old."CategoryID" <> new."CategoryID" '
+                f'BEGIN {self._subtract("old")} {self._add("new")} END'
+            )
+        self.backfill()
+
+
+# Триггеры уровня оператора с таблицами переходов (PostgreSQL)
+class PostgreSQLStatsBackend(StatsBackend):
+    # Агрегаты по категориям для набора строк rows (таблица или подзапрос)
+    @staticmethod
+    def _aggregate(rows):
+        return (
+            'SELECT "CategoryID", COUNT(*) AS count, SUM("Price") AS sum, MIN("Price") AS min, MAX("Price") AS max '
+            f'FROM {rows} AS changed_rows GROUP BY "CategoryID"'
+        )
+
+    def _add(self, rows):
+        return (
+            f'INSERT INTO "CategoryStats" AS stats ({STATS_COLUMNS}) '
+            f'SELECT "CategoryID", count, sum, min, max FROM ({self._aggregate(rows)}) AS changes '
+            'ON CONFLICT ("CategoryID") DO UPDATE SET '
+            '"ProductCount" = stats."ProductCount" + EXCLUDED."ProductCount", '
+            '"PriceSum" = stats."PriceSum" + EXCLUDED."PriceSum", '
+            '"MinPrice" = LEAST(stats."MinPrice", EXCLUDED."MinPrice"), '
+            '"MaxPrice" = GREATEST(stats."MaxPrice", EXCLUDED."MaxPrice");'
+        )
+
+    def _subtract(self, rows):
+        return (
+            'UPDATE "CategoryStats" AS stats SET '
+            '"ProductCount" = stats."ProductCount" - changes.count, '
+            '"PriceSum" = stats."PriceSum" - changes.sum, '
+            '"MinPrice" = CASE WHEN changes.min <= stats."MinPrice" THEN '
+            '(SELECT MIN("Price") FROM "Product" WHERE "CategoryID" = stats."CategoryID") ELSE stats."MinPrice" END, '
+            '"MaxPrice" = CASE WHEN changes.max >= stats."MaxPrice" THEN '
+            '(SELECT MAX("Price") FROM "Product" WHERE "CategoryID" = stats."CategoryID") ELSE stats."MaxPrice" END '
+            f'FROM ({self._aggregate(rows)}) AS changes WHERE stats."CategoryID" = changes."CategoryID";'
+        )
+
+    def install(self):
+        # Изменение цены или категории учитывается как удаление старой строки
+        # и вставка новой; строки, где они не менялись, пропускаются.
+        changed = (
+            '(SELECT {side}."CategoryID", {side}."Price" FROM old_rows JOIN new_rows USING ("id") '
+            'WHERE (old_rows."Price", old_rows."CategoryID") IS DISTINCT FROM (new_rows."Price", new_rows."CategoryID"))'
+        )
+        functions = {
+            'category_stats_insert': self._add('new_rows'),
+            'category_stats_delete': self._subtract('old_rows'),
+            'category_stats_update': self._subtract(changed.format(side='old_rows'))
+            + ' ' + self._add(changed.format(side='new_rows')),
+        }
+        triggers = (
+            ('category_stats_insert', 'INSERT', 'NEW TABLE AS new_rows'),
+            ('category_stats_delete', 'DELETE', 'OLD TABLE AS old_rows'),
+            ('category_stats_update', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+        )
+        with self.connection.cursor() as cursor:
+            for name, body in functions.items():
+                cursor.execute(
+                    f'CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$ '
+                    f'BEGIN {body} RETURN NULL; END $$ LANGUAGE plpgsql'
+                )
+            for name, event, referencing in triggers:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}_trigger ON "Product"')
+                cursor.execute(
+                    f'CREATE TRIGGER {name}_trigger AFTER {event} ON "Product" '
+                    f'REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {name}()'
+                )
+        self.backfill()
+
+    def rebuild(self):
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            # Запись товаров блокируется на время пересчета, чтобы
+            # изменения, сделанные во время него, не потерялись
+            cursor.execute('LOCK TABLE "Product" IN SHARE MODE')
+            cursor.execute('DELETE FROM "CategoryStats"')
+            cursor.execute(REBUILD_SQL)
+
+
+STATS_BACKENDS = {
+    'sqlite': SQLiteStatsBackend,
+    'postgresql': PostgreSQLStatsBackend,
+}
+
+
+# Возвращает бэкенд статистики для соединения или None, если СУБД не поддерживается
+def get_stats_backend(using='default'):
+    connection = connections[using]
+    backend_class = STATS_BACKENDS.get(connection.vendor)
+    return backend_class(connection) if backend_class else None
+
+
+# Обработчик post_migrate: создает триггеры статистики
+def install_category_stats(sender, using='default', **kwargs):
+    # Реплики получают статистику вместе с данными основной базы
+    if router.allow_migrate(using, sender.label) is False:
+        return
+    backend = get_stats_backend(using)
+    if backend is not None:
+        backend.install()
+
+
+# Сравнивает таблицу статистики с агрегацией по товарам. Возвращает список
+# расхождений: (id категории, ожидаемые значения, сохраненные значения).
+def verify_category_stats(using='default'):
+    empty = (0, 0, None, None)
+    expected = {
+        row['categoryID']: (row['count'], row['sum'], row['min'], row['max'])
+        for row in Product.objects.using(using).values('categoryID').annotate(
+            count=Count('id'), sum=Sum('price'), min=Min('price'), max=Max('price'),
+        ).order_by()
+    }
+    actual = {
+        row[0]: tuple(row[1:])
+        for row in CategoryStats.objects.using(using).values_list(
+            'category_id', 'product_count', 'price_sum', 'min_price', 'max_price',
+        )
+    }
+    mismatches = []
+    for category_id in sorted(expected.keys() | actual.keys()):
+        left = expected.get(category_id, empty)
+        right = actual.get(category_id, empty)
+        if left[0] == right[0] == 0:
+            continue
+        if left != right:
+            mismatches.append((category_id, left, right))
+    return mismatches
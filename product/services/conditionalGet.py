@@ -0,0 +1,75 @@
+# Модуль 'conditionalGet.py' отвечает за условные GET-запросы к спискам каталога
+# (ETag / If-None-Match, Last-Modified / If-Modified-Since). Отпечаток ответа
+# строится по версии каталога, поэтому ответ 304 отдается после одного
+# запроса к таблице CatalogVersion, без выборки и сериализации строк.
+#
+# Валидаторы (ETag, Last-Modified) добавляются только к ответам 200 и 304:
+# ответ с ошибкой (например, 400 на некорректные параметры) их не содержит,
+# иначе клиент, вернувший ETag такого ответа, получил бы 304 вместо ошибки.
+
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+
+from product.services.catalogVersion import get_catalog_version
+
+
+# Сильный ETag: зависит от версии каталога и от представления
+# (адрес с параметрами запроса, запрошенный формат и сжатие).
+def catalog_etag(request, *args, **kwargs):
+    version, _ = get_catalog_version(request=request)
+    fingerprint = '\n'.join((
+        str(version),
+        request.build_absolute_uri(),
+        request.META.get('HTTP_ACCEPT', ''),
+        request.META.get('HTTP_ACCEPT_ENCODING', ''),
+    ))
+    return '"%s"' % hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    _, updated_at = get_catalog_version(request=request)
+    return updated_at
+
+
+# Время изменения каталога в секундах (как в заголовке Last-Modified) или None
+def last_modified_timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+# Добавляет ETag и Last-Modified к ответу 200 или 304
+def add_catalog_validators(request, response):
+    if response.status_code in (200, 304):
+        response.headers['ETag'] = catalog_etag(request)
+        last_modified = catalog_last_modified(request)
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified_timestamp(last_modified))
+    return response
+
+
+# Проверка If-None-Match / If-Modified-Since по версии каталога: ответ 304
+# или None, если данные нужно отдать полностью
+def catalog_not_modified(request):
+    response = get_conditional_response(
+        request,
+        etag=catalog_etag(request),
+        last_modified=last_modified_timestamp(catalog_last_modified(request)),
+    )
+    return add_catalog_validators(request, response) if response is not None else None
+
+
+def _conditional_catalog_view(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = catalog_not_modified(request)
+        if response is not None:
+            return response
+        return add_catalog_validators(request, view(request, *args, **kwargs))
+    return wrapper
+
+
+# Декоратор метода get() представления списка каталога
+conditional_catalog_response = method_decorator(_conditional_catalog_view)
@@ -0,0 +1,89 @@
+# Модуль 'conditionalUpdate.py' отвечает за обновление товаров и категорий
+# одним условным UPDATE с оптимистичной блокировкой.
+#
+# У товара и категории есть номер версии (поле version), который
+# увеличивается при каждом изменении. Клиент получает его в заголовке ETag
+# (ответы на создание, обновление и чтение объекта) и передает в If-Match:
+#
+#   UPDATE ... SET <переданные поля>, version = version + 1
+#   WHERE id = %s AND version IN (<версии из If-Match>)
+#
+# Строка не загружается перед изменением и блокируется только на время
+# самого UPDATE, новая версия возвращается им же (RETURNING). Если условие
+# не выполнилось, одним SELECT выясняется, есть ли объект: нет - 404, есть -
+# 412 с текущим ETag. Без If-Match обновление
+# выполняется безусловно (если не включен CATALOG_REQUIRE_IF_MATCH).
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import parse_etags
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+from product.services.updateReturning import update_returning
+
+IF_MATCH_PARAMETER = OpenApiParameter(
+    'If-Match', OpenApiTypes.STR, OpenApiParameter.HEADER,
+    description='ETag объекта (ответы на создание, обновление и чтение); при несовпадении версии - 412',
+)
+
+
+# Заголовок If-Match обязателен (CATALOG_REQUIRE_IF_MATCH), но не передан
+class PreconditionRequired(Exception):
+    pass
+
+
+# Объект изменен после того, как клиент получил его версию
+class PreconditionFailed(Exception):
+    def __init__(self, version):
+        super().__init__(version)
+        self.version = version
+
+
+# ETag объекта по номеру версии
+def object_etag(version):
+    return f'"{version}"'
+
+
+# Версии из заголовка If-Match: None, если заголовка нет или он равен '*'
+# (подходит любая версия). Слабые и некорректные ETag не совпадают ни с
+# одной версией (If-Match использует строгое сравнение). Если заголовок
+# обязателен и не передан, выбрасывает PreconditionRequired.
+def if_match_versions(request):
+    header = request.META.get('HTTP_IF_MATCH')
+    if header is None:
+        if settings.CATALOG_REQUIRE_IF_MATCH:
+            raise PreconditionRequired
+        return None
+    etags = parse_etags(header)
+    if etags == ['*']:
+        return None
+    versions = set()
+    for etag in etags:
+        value = etag[1:-1] if etag.startswith('"') and etag.endswith('"') else ''
+        if value.isdigit():
+            versions.add(int(value))
+    return versions
+
+
+# Обновляет поля values объекта model с первичным ключом pk и возвращает
+# новую версию. versions - допустимые текущие версии (None - любая).
+# Вызывается внутри транзакции записи. Если объекта нет, выбрасывает
+# model.DoesNotExist, если версия не совпала - PreconditionFailed.
+def conditional_update(model, pk, values, versions=None):
+    queryset = model.objects.filter(pk=pk)
+    # UPDATE не заполняет auto_now-поля сам
+    values = {**values, 'version': F('version') + 1, 'updated_at': timezone.now()}
+    if versions is not None and not versions:
+        updated = []
+    else:
+        target = queryset if versions is None else queryset.filter(version__in=versions)
+        updated = update_returning(target, 'version', **values)
+
+    if not updated:
+        current = queryset.values_list('version', flat=True).first()
+        if current is None:
+            raise model.DoesNotExist
+        raise PreconditionFailed(current)
+    return updated[0]
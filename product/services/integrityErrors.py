@@ -0,0 +1,80 @@
+# Модуль 'integrityErrors.py' отвечает за определение ограничения, нарушение
+# которого вызвало IntegrityError. В транзакциях записи, кроме самих товаров и
+# категорий, изменяются CatalogVersion и CatalogChange, поэтому ошибки
+# пользователю ("товар уже существует", "категории нет") возвращаются только
+# для нарушения конкретного ограничения, а остальные выбрасываются дальше.
+#
+#   - PostgreSQL: код SQLSTATE и имя ограничения из диагностики драйвера;
+#   - SQLite: список колонок из сообщения "UNIQUE constraint failed: ...".
+#     SQLite не сообщает, какой внешний ключ нарушен; единственный внешний
+#     ключ, который записывают транзакции каталога, - Product.CategoryID.
+
+UNIQUE_VIOLATION = '23505'
+FOREIGN_KEY_VIOLATION = '23503'
+SQLITE_UNIQUE_PREFIX = 'UNIQUE constraint failed: '
+SQLITE_FOREIGN_KEY_MESSAGE = 'FOREIGN KEY constraint failed'
+
+
+# Исключение драйвера PostgreSQL (с диагностикой) или None
+def _postgres_error(exc):
+    cause = exc.__cause__
+    if getattr(cause, 'diag', None) is not None and getattr(cause, 'pgcode', None):
+        return cause
+    return None
+
+
+# Имена, которые ограничению уникальности полей fields дают Django и PostgreSQL
+def _unique_constraint_names(model, fields):
+    table = model._meta.db_table
+    names = {
+        constraint.name for constraint in model._meta.constraints
+        if tuple(getattr(constraint, 'fields', ())) == tuple(fields)
+    }
+    if len(fields) == 1:
+        column = model._meta.get_field(fields[0]).column
+        # unique=True в CREATE TABLE и в ALTER TABLE (AlterField)
+        names.add(f'{table}_{column}_key')
+        names.add((f'{table}_{column}_', '_uniq'))
+    return names
+
+
+def _matches(name, names):
+    for candidate in names:
+        if isinstance(candidate, tuple):
+            if name.startswith(candidate[0]) and name.endswith(candidate[1]):
+                return True
+        elif name == candidate:
+            return True
+    return False
+
+
+# Нарушено ли ограничение уникальности полей fields модели model
+def is_unique_violation(exc, model, fields):
+    error = _postgres_error(exc)
+    if error is not None:
+        return (
+            error.pgcode == UNIQUE_VIOLATION
+            and error.diag.table_name == model._meta.db_table
+            and _matches(error.diag.constraint_name or '', _unique_constraint_names(model, fields))
+        )
+    message = str(exc)
+    if not message.startswith(SQLITE_UNIQUE_PREFIX):
+        return False
+    table = model._meta.db_table
+    columns = {f'{table}.{model._meta.get_field(field).column}' for field in fields}
+    return {column.strip() for column in message[len(SQLITE_UNIQUE_PREFIX):].split(',')} == columns
+
+
+# Нарушен ли внешний ключ field модели model
+def is_foreign_key_violation(exc, model, field):
+    error = _postgres_error(exc)
+    if error is not None:
+        # Имя ограничения Django: <таблица>_<колонка>_<хэш>_fk_<таблица>_<колонка>
+        column = model._meta.get_field(field).column
+        name = error.diag.constraint_name or ''
+        return (
+            error.pgcode == FOREIGN_KEY_VIOLATION
+            and error.diag.table_name == model._meta.db_table
+            and name.startswith(f'{model._meta.db_table}_{column}_') and '_fk_' in name
+        )
+    return str(exc) == SQLITE_FOREIGN_KEY_MESSAGE
@@ -0,0 +1,181 @@
+# Модуль 'productSearch.py' отвечает за полнотекстовый поиск по названию и
+# описанию товаров. Индекс поддерживается триггерами базы данных, поэтому он
+# синхронизируется при любой записи в таблицу Product: через сериализаторы,
+# пакетные операции, админку, каскадное удаление и прямую загрузку данных.
+#
+#   - SQLite: внешняя FTS5-таблица "ProductSearch" с ранжированием bm25;
+#   - PostgreSQL: колонка tsvector "SearchVector" с GIN-индексом и ts_rank.
+#
+# Структуры индекса создаются обработчиком post_migrate (см. ProductConfig.ready).
+
+from django.conf import settings
+from django.db import connections, router
+
+from product.models.productModel import Product
+
+
+# Полнотекстовый поиск не поддерживается для СУБД соединения
+class SearchNotSupported(Exception):
+    pass
+
+
+# Базовый класс бэкенда поиска
+class SearchBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        raise NotImplementedError
+
+    # Возвращает список id товаров в порядке убывания релевантности
+    def search(self, query, category_ids=None, limit=20, offset=0):
+        raise NotImplementedError
+
+
+# Полнотекстовый поиск на FTS5 (SQLite)
+class SQLiteSearchBackend(SearchBackend):
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ProductSearch'"
+            )
+            exists = cursor.fetchone() is not None
+
+            cursor.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS "ProductSearch" USING fts5('
+                '"Name", "Description", content=\'Product\', content_rowid=\'id\', '
+                'tokenize=\'unicode61 remove_diacritics 2\')'
+            )
+            cursor.execute(
+                'CREATE TRIGGER IF NOT EXISTS "ProductSearch_insert" AFTER INSERT ON "Product" BEGIN '
+                'INSERT INTO "ProductSearch"(rowid, "Name", "Description") '
+                'VALUES (new."id", new."Name", new."Description"); END'
+            )
+            cursor.execute(
+                'CREATE TRIGGER IF NOT EXISTS "ProductSearch_delete" AFTER DELETE ON "Product" BEGIN '
+                'INSERT INTO "ProductSearch"("ProductSearch", rowid, "Name", "Description") '
+                'VALUES (\'delete\', old."id", old."Name", old."Description"); END'
+            )
+            cursor.execute(
+                'CREATE TRIGGER IF NOT EXISTS "ProductSearch_update" '
+                'AFTER UPDATE OF "Name", "Description" ON "Product" BEGIN '
+                'INSERT INTO "ProductSearch"("ProductSearch", rowid, "Name", "Description") '
+                'VALUES (\'delete\', old."id", old."Name", old."Description"); '
+                'INSERT INTO "ProductSearch"(rowid, "Name", "Description") '
+                'VALUES (new."id", new."Name", new."Description"); END'
+            )
+            if not exists:
+                # Индексация товаров, добавленных до создания индекса
+                cursor.execute('INSERT INTO "ProductSearch"("ProductSearch") VALUES (\'rebuild\')')
+
+    # Запрос пользователя превращается в набор терминов в кавычках (без операторов
+    # FTS5); последний термин ищется по префиксу.
+    @staticmethod
+    def build_match(query):
+        terms = ['"%s"' % term.replace('"', '""') for term in query.split()]
+        if terms:
+            terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, query, category_ids=None, limit=20, offset=0):
+        sql = (
+            'SELECT "Product"."id" FROM "ProductSearch" '
+            'JOIN "Product" ON "Product"."id" = "ProductSearch".rowid '
+            'WHERE "ProductSearch" MATCH %s'
+        )
+        params = [self.build_match(query)]
+        if category_ids:
+            sql += ' AND "Product"."CategoryID" IN (%s)' % ', '.join(['%s'] * len(category_ids))
+            params.extend(category_ids)
+        # Совпадение в названии весит больше, чем в описании
+        sql += ' ORDER BY bm25("ProductSearch", 10.0, 1.0), "Product"."id" LIMIT %s OFFSET %s'
+        params.extend([limit, offset])
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+# Полнотекстовый поиск на tsvector + GIN (PostgreSQL)
+class PostgreSQLSearchBackend(SearchBackend):
+    def install(self):
+        config = settings.CATALOG_SEARCH_CONFIG
+        vector = (
+            "setweight(to_tsvector('{config}', coalesce({row}.\"Name\", '')), 'A') || "
+            "setweight(to_tsvector('{config}', coalesce({row}.\"Description\", '')), 'B')"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute('ALTER TABLE "Product" ADD COLUMN IF NOT EXISTS "SearchVector" tsvector')
+            cursor.execute(
+                'CREATE OR REPLACE FUNCTION product_search_vector_update() RETURNS trigger AS $$ '
+                'BEGIN NEW."SearchVector" := %s; RETURN NEW; END $$ LANGUAGE plpgsql'
+                % vector.format(config=config, row='NEW')
+            )
+            cursor.execute('DROP TRIGGER IF EXISTS product_search_vector_trigger ON "Product"')
+            cursor.execute(
+                'CREATE TRIGGER product_search_vector_trigger '
+                'BEFORE INSERT OR UPDATE OF "Name", "Description" ON "Product" '
+                'FOR EACH ROW EXECUTE FUNCTION product_search_vector_update()'
+            )
+            cursor.execute(
+                'UPDATE "Product" SET "SearchVector" = %s WHERE "SearchVector" IS NULL'
+                % vector.format(config=config, row='"Product"')
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS product_search_vector_idx ON "Product" USING GIN ("SearchVector")'
+            )
+
+    def search(self, query, category_ids=None, limit=20, offset=0):
+        sql = (
+            'SELECT "Product"."id" FROM "Product", websearch_to_tsquery(%s, %s) AS query '
+            'WHERE "Product"."SearchVector" @@ query'
+        )
+        params = [settings.CATALOG_SEARCH_CONFIG, query]
+        if category_ids:
+            sql += ' AND "Product"."CategoryID" = ANY(%s)'
+            params.append(list(category_ids))
+        sql += ' ORDER BY ts_rank("Product"."SearchVector", query) DESC, "Product"."id" LIMIT %s OFFSET %s'
+        params.extend([limit, offset])
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+# Возвращает бэкенд поиска для соединения или None, если СУБД не поддерживается
+def get_search_backend(using='default'):
+    connection = connections[using]
+    backend_class = SEARCH_BACKENDS.get(connection.vendor)
+    return backend_class(connection) if backend_class else None
+
+
+# Обработчик post_migrate: создает структуры полнотекстового индекса
+def install_search_index(sender, using='default', **kwargs):
+    # Реплики получают индекс вместе с данными основной базы
+    if router.allow_migrate(using, sender.label) is False:
+        return
+    backend = get_search_backend(using)
+    if backend is not None:
+        backend.install()
+
+
+# Поиск товаров: возвращает товары (с категориями) в порядке релевантности.
+# По умолчанию база выбирается роутером, как для обычного чтения Product;
+# queryset позволяет ограничить загружаемые колонки.
+def search_products(query, category_ids=None, limit=20, offset=0, using=None, queryset=None):
+    using = using or router.db_for_read(Product)
+    backend = get_search_backend(using)
+    if backend is None:
+        raise SearchNotSupported(f'Полнотекстовый поиск не поддерживается для {connections[using].vendor}')
+
+    ids = backend.search(query, category_ids=category_ids, limit=limit, offset=offset)
+    if queryset is None:
+        queryset = Product.objects.with_category()
+    products = queryset.using(using).in_bulk(ids)
+    return [products[pk] for pk in ids if pk in products]
@@ -0,0 +1,107 @@
+# Модуль 'responseCache.py' отвечает за кэширование ответов списков каталога.
+# Ключ кэша содержит версию каталога (см. catalogVersion.py), поэтому после
+# фиксации любой записи ответы, построенные по старым данным, больше не
+# используются, а их записи вытесняются из кэша естественным образом.
+#
+# Бэкенд задается настройкой CATALOG_RESPONSE_CACHE:
+#   - LRUCacheBackend - кэш в памяти процесса с ограничением числа записей;
+#   - DjangoCacheBackend - кэш Django (settings.CACHES), общий для воркеров.
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.response import Response
+
+from product.services.catalogVersion import get_catalog_version
+
+
+# Кэш в памяти процесса, вытесняющий давно не использованные записи
+class LRUCacheBackend:
+    def __init__(self, MAX_ENTRIES=256, **options):
+        self.max_entries = MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Кэш на основе кэш-фреймворка Django
+class DjangoCacheBackend:
+    def __init__(self, ALIAS='default', TIMEOUT=300, KEY_PREFIX='catalog-response', **options):
+        self.alias = ALIAS
+        self.timeout = TIMEOUT
+        self.key_prefix = KEY_PREFIX
+
+    def _key(self, key):
+        return f'{self.key_prefix}:{hashlib.sha1(key.encode("utf-8")).hexdigest()}'
+
+    def get(self, key):
+        return caches[self.alias].get(self._key(key))
+
+    def set(self, key, value):
+        caches[self.alias].set(self._key(key), value, self.timeout)
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+# Возвращает настроенный бэкенд кэша или None, если кэш отключен
+def get_response_cache():
+    global _backend
+    config = settings.CATALOG_RESPONSE_CACHE
+    if not config or not config.get('BACKEND'):
+        return None
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _backend
+
+
+# Декоратор метода get() представления списка: отдает сохраненный ответ для
+# текущей версии каталога или строит и сохраняет новый.
+def cache_catalog_response(method):
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        cache = get_response_cache()
+        if cache is None:
+            return method(self, request, *args, **kwargs)
+
+        version, _ = get_catalog_version(request=request)
+        key = f'{version}:{request.build_absolute_uri()}'
+        cached = cache.get(key)
+        if cached is not None:
+            data, status_code = cached
+            return Response(data, status=status_code)
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code in (200, 204):
+            cache.set(key, (response.data, response.status_code))
+        return response
+    return wrapper
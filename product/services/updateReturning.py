@@ -0,0 +1,25 @@
+# Модуль 'updateReturning.py' отвечает за UPDATE, возвращающий новые значения
+# измененных строк (UPDATE ... RETURNING) одним запросом. QuerySet.update() в
+# Django 4.2 возвращает только количество строк, и новое значение счетчика
+# пришлось бы читать отдельным SELECT.
+#
+# RETURNING поддерживают PostgreSQL и SQLite начиная с 3.35 - обе СУБД,
+# с которыми работает проект.
+
+from django.db import connections, router, transaction
+from django.db.models import sql
+
+
+# Выполняет queryset.update(**values) и возвращает список значений поля
+# returning для измененных строк
+def update_returning(queryset, returning, **values):
+    using = queryset._db or router.db_for_write(queryset.model)
+    connection = connections[using]
+    query = queryset.query.chain(sql.UpdateQuery)
+    query.add_update_values(values)
+    query.annotations = {}
+    update_sql, params = query.get_compiler(using).as_sql()
+    column = connection.ops.quote_name(queryset.model._meta.get_field(returning).column)
+    with transaction.mark_for_rollback_on_error(using=using), connection.cursor() as cursor:
+        cursor.execute(f'{update_sql} RETURNING {column}', params)
+        return [row[0] for row in cursor.fetchall()]
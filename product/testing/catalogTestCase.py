@@ -0,0 +1,23 @@
+# Модуль 'catalogTestCase.py' содержит базовый класс тестов каталога.
+#
+# Кэши процесса (ответов списков и категорий) привязаны к версии каталога,
+# а версия откатывается вместе с транзакцией теста: без очистки следующий
+# тест получил бы ответ, построенный по данным предыдущего. Снимки списков
+# отключены - они строятся в фоновом потоке вне транзакции теста.
+
+from django.test import TestCase, override_settings
+
+from product.services import categoryCache
+from product.services.responseCache import get_response_cache
+
+
+# Класс, отвечающий за изоляцию кэшей каталога между тестами
+@override_settings(CATALOG_SNAPSHOTS=False)
+class CatalogTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        # Кэш категорий помнит и проверенную версию: создается заново
+        categoryCache._category_cache = None
+        response_cache = get_response_cache()
+        if response_cache is not None:
+            response_cache.clear()
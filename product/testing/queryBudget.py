@@ -0,0 +1,36 @@
+# Модуль 'queryBudget.py' содержит вспомогательные средства для тестов,
+# проверяющие, что представление укладывается в заданный бюджет SQL-запросов.
+# Это защищает пути чтения от регрессий вида N+1: бюджет задается константой
+# и не должен зависеть от количества возвращаемых строк.
+
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+# Контекстный менеджер, падающий с AssertionError, если внутри блока
+# было выполнено больше max_queries запросов к базе данных.
+@contextmanager
+def assert_max_queries(max_queries, using=DEFAULT_DB_ALIAS):
+    context = CaptureQueriesContext(connections[using])
+    with context:
+        yield context
+
+    executed = len(context.captured_queries)
+    if executed > max_queries:
+        queries = '\n'.join(
+            f'{index}. {query["sql"]}'
+            for index, query in enumerate(context.captured_queries, start=1)
+        )
+        raise AssertionError(
+            f'Превышен бюджет запросов: выполнено {executed}, допустимо {max_queries}.\n{queries}'
+        )
+
+
+# Проверка бюджета для запроса через тестовый клиент Django:
+# возвращает ответ, чтобы тест мог проверить и его содержимое.
+def assert_view_query_budget(client, url, max_queries, method='get', using=DEFAULT_DB_ALIAS, **kwargs):
+    with assert_max_queries(max_queries, using=using):
+        response = getattr(client, method)(url, **kwargs)
+    return response
@@ -0,0 +1,121 @@
+# Модуль 'serializationEquivalence.py' содержит проверку того, что быстрый
+# путь чтения (fastSerializer.py + jsonRenderer.py) возвращает побайтно тот
+# же JSON, что и сериализатор DRF с JSONRenderer. Проверка выполняется на
+# случайных наборах полей (?fields= / ?expand=) поверх данных в базе;
+# create_random_catalog заполняет базу данными, на которых расхождения
+# наиболее вероятны. Используется тестами (product/tests/) и командой
+# benchmark_serialization (для ее тестового каталога).
+
+import random
+from decimal import Decimal
+
+from django.http import QueryDict
+from rest_framework.renderers import JSONRenderer
+
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.renderers.jsonRenderer import CatalogJSONRenderer
+from product.serializers.fastSerializer import get_row_serializer
+from product.serializers.fieldsetSerializer import SparseFieldset
+
+# Символы, которые должны кодироваться одинаково: не-ASCII, U+2028/U+2029,
+# кавычки и экранируемые символы, управляющие символы, символы вне BMP
+ALPHABET = (
+    'abcXYZ019 ' 'АБВгдеёЖЩЯ' '"\\/\'<>&' '\t\n\r\x01\x1f\x7f'
+    '\u2028\u2029\u00a0\u200b' 'é漢字' '\U0001f600\U0001f4e6'
+)
+# Граничные цены (Price: max_digits=19, decimal_places=2)
+PRICES = (
+    Decimal('0.00'), Decimal('0.01'), Decimal('0.10'), Decimal('1.00'), Decimal('10'), Decimal('1000000'),
+    Decimal('9999999999999.99'),
+)
+
+
+def random_text(rnd, min_length, max_length):
+    return ''.join(rnd.choices(ALPHABET, k=rnd.randint(min_length, max_length))).strip() or 'x'
+
+
+def random_price(rnd):
+    if rnd.random() < 0.2:
+        return rnd.choice(PRICES)
+    return Decimal(rnd.lognormvariate(5, 2)).quantize(Decimal('0.01')) + Decimal('0.01')
+
+
+# Создает categories категорий (описание: None, пустое или случайное) и
+# products товаров со случайными названиями, описаниями и ценами
+def create_random_catalog(rnd, products, categories, batch_size=5000):
+    ProductCategory.objects.bulk_create([
+        ProductCategory(
+            name=f'{index:05d} {random_text(rnd, 1, 40)}'[:100],
+            description=rnd.choice((None, '', random_text(rnd, 1, 200))),
+        )
+        for index in range(categories)
+    ], batch_size=1000)
+    category_ids = list(ProductCategory.objects.values_list('id', flat=True))
+
+    for start in range(0, products, batch_size):
+        Product.objects.bulk_create([
+            Product(
+                name=f'{index:07d} {random_text(rnd, 1, 60)}'[:100],
+                description=rnd.choice(('', random_text(rnd, 1, 300))),
+                price=random_price(rnd),
+                categoryID_id=rnd.choice(category_ids),
+            )
+            for index in range(start, min(start + batch_size, products))
+        ], batch_size=batch_size)
+    return category_ids
+
+
+# Случайный набор параметров ?fields= / ?expand= для сериализатора чтения
+def random_fieldset_params(rnd, serializer_class):
+    available = list(serializer_class.Meta.fields)
+    params = QueryDict(mutable=True)
+    if rnd.random() < 0.2:
+        return params
+    if rnd.random() < 0.8:
+        fields = rnd.sample(available, rnd.randint(1, len(available)))
+        params['fields'] = ','.join(fields)
+    expandable = list(getattr(serializer_class, 'expandable', {}))
+    if expandable and rnd.random() < 0.5:
+        params['expand'] = ','.join(rnd.sample(expandable, rnd.randint(1, len(expandable))))
+    return params
+
+
+# Сравнивает ответ DRF и быстрого пути для одного набора параметров. Падает
+# с AssertionError, указывая первую отличающуюся запись.
+def assert_same_output(serializer_class, queryset, params):
+    fieldset = SparseFieldset(serializer_class, params)
+    assert fieldset.is_valid(), fieldset.errors
+    trimmed_class = fieldset.get_serializer_class()
+    row_serializer = get_row_serializer(trimmed_class)
+    if row_serializer is None:
+        raise AssertionError(f'Быстрый путь недоступен для {trimmed_class.__name__}')
+
+    queryset = queryset.order_by('id')
+    expected = trimmed_class(fieldset.apply(queryset), many=True).data
+    actual = row_serializer.serialize(row_serializer.apply(queryset))
+
+    expected_json = JSONRenderer().render(expected)
+    actual_json = CatalogJSONRenderer().render(actual)
+    if expected_json == actual_json:
+        return len(expected)
+
+    for index, (left, right) in enumerate(zip(expected, actual)):
+        left_json, right_json = JSONRenderer().render(left), CatalogJSONRenderer().render(right)
+        if left_json != right_json:
+            raise AssertionError(
+                f'Ответы различаются ({params.urlencode() or "без параметров"}), запись {index}:\n'
+                f'  DRF:    {left_json.decode()}\n  values: {right_json.decode()}'
+            )
+    raise AssertionError(f'Ответы различаются ({params.urlencode() or "без параметров"}): '
+                         f'{len(expected)} и {len(actual)} записей')
+
+
+# Проверяет examples случайных наборов полей; возвращает количество
+# сравненных записей
+def check_equivalence(serializer_class, queryset, examples=100, seed=0):
+    rnd = random.Random(seed)
+    compared = assert_same_output(serializer_class, queryset, QueryDict())
+    for _ in range(examples):
+        compared += assert_same_output(serializer_class, queryset, random_fieldset_params(rnd, serializer_class))
+    return compared
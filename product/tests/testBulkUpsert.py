@@ -0,0 +1,35 @@
+# Тесты пакетного обновления/создания товаров (ProductSerializerBulkUpsert).
+
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.serializers.productSerializer import ProductSerializerBulkUpsert
+from product.testing.catalogTestCase import CatalogTestCase
+
+
+class ProductBulkUpsertTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = ProductCategory.objects.create(name='Категория')
+        self.products = Product.objects.bulk_create(
+            Product(name=f'Товар {index}', description='', price='1.00', categoryID=self.category)
+            for index in range(3)
+        )
+
+    def upsert(self, items):
+        serializer = ProductSerializerBulkUpsert(data=items)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer, serializer.save()
+
+    def test_instances_hold_new_versions(self):
+        Product.objects.filter(pk=self.products[1].pk).update(version=5)
+        serializer, results = self.upsert([
+            {'id': self.products[0].pk, 'price': '2.00'},
+            {'id': self.products[1].pk, 'description': 'Описание'},
+            {'id': self.products[2].pk, 'price': '1.00'},
+            {'name': 'Новый товар', 'price': '3.00', 'categoryID': self.category.pk},
+        ])
+        self.assertEqual([result['status'] for result in results], ['updated', 'updated', 'unchanged', 'created'])
+        self.assertEqual([instance.version for instance in serializer.instance], [2, 6, 1, 1])
+        self.assertEqual(
+            list(Product.objects.order_by('id').values_list('version', flat=True)), [2, 6, 1, 1],
+        )
@@ -0,0 +1,162 @@
+# Тесты журнала изменений каталога: постраничное чтение, сжатие изменений
+# одного объекта и очистка журнала (см. services/catalogChanges.py).
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from product.models.catalogChangeModel import CatalogChange
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.services.catalogChanges import (
+    ChangeFeedExpired, get_feed_start, prune_catalog_changes, read_catalog_changes, record_catalog_changes,
+)
+from product.testing.catalogTestCase import CatalogTestCase
+
+PRODUCT = CatalogChange.PRODUCT
+CREATED, UPDATED, DELETED = CatalogChange.CREATED, CatalogChange.UPDATED, CatalogChange.DELETED
+
+
+class CatalogChangeFeedTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        # Номер, с которого клиент начинает синхронизацию
+        self.start = read_catalog_changes(None, 10)[1]
+
+    def record(self, op, *ids):
+        return record_catalog_changes((PRODUCT, op, list(ids)))
+
+    def ops(self, changes):
+        return [(change['id'], change['op']) for change in changes]
+
+    # Читает журнал постранично с since, возвращает список страниц
+    def read_pages(self, since, limit):
+        pages = []
+        while True:
+            changes, since, has_more = read_catalog_changes(since, limit)
+            pages.append(changes)
+            if not has_more:
+                return pages
+
+    def test_initial_since(self):
+        changes, next_since, has_more = read_catalog_changes(None, 10)
+        self.assertEqual((changes, has_more), ([], False))
+        seq = self.record(CREATED, 1)
+        self.assertEqual(seq, next_since + 1)
+        self.assertEqual(read_catalog_changes(None, 10)[1], seq)
+
+    def test_transaction_is_not_split_between_pages(self):
+        first = self.record(CREATED, 1)
+        second = self.record(CREATED, 2, 3, 4)
+        third = self.record(UPDATED, 5)
+
+        changes, next_since, has_more = read_catalog_changes(self.start, 2)
+        self.assertEqual(self.ops(changes), [(1, CREATED)])
+        self.assertEqual((next_since, has_more), (first, True))
+
+        # Транзакция больше limit возвращается целиком
+        changes, next_since, has_more = read_catalog_changes(next_since, 2)
+        self.assertEqual(self.ops(changes), [(2, CREATED), (3, CREATED), (4, CREATED)])
+        self.assertEqual({change['seq'] for change in changes}, {second})
+        self.assertEqual((next_since, has_more), (second, True))
+
+        changes, next_since, has_more = read_catalog_changes(next_since, 2)
+        self.assertEqual(self.ops(changes), [(5, UPDATED)])
+        self.assertEqual((next_since, has_more), (third, False))
+
+    def test_pages_cover_every_change_once(self):
+        for object_id in range(1, 8):
+            self.record(CREATED, *range(object_id * 10, object_id * 10 + object_id % 3 + 1))
+        expected = list(CatalogChange.objects.order_by('seq', 'id').values_list('seq', 'object_id'))
+        for limit in (1, 2, 3, 5, 100):
+            with self.subTest(limit=limit):
+                pages = self.read_pages(self.start, limit)
+                seen = [(change['seq'], change['id']) for page in pages for change in page]
+                self.assertEqual(seen, expected)
+                for page in pages:
+                    # Транзакции не разделяются: номер страницы целиком в ней
+                    for seq in {change['seq'] for change in page}:
+                        self.assertEqual(
+                            sum(change['seq'] == seq for change in page),
+                            CatalogChange.objects.filter(seq=seq).count(),
+                        )
+
+    def test_created_then_updated_is_created(self):
+        self.record(CREATED, 1, 2, 3)
+        self.record(UPDATED, 1, 2)
+        self.record(DELETED, 2)
+        last = self.record(UPDATED, 3)
+        self.record(UPDATED, 4)
+        self.record(DELETED, 4)
+
+        changes, _, _ = read_catalog_changes(self.start, 100)
+        self.assertEqual(self.ops(changes), [(1, CREATED), (2, DELETED), (3, CREATED), (4, DELETED)])
+        # Изменение объекта возвращается с номером последней транзакции
+        self.assertEqual(changes[2]['seq'], last)
+
+    def test_updated_after_since_stays_updated(self):
+        since = self.record(CREATED, 1)
+        self.record(UPDATED, 1)
+        changes, _, _ = read_catalog_changes(since, 100)
+        self.assertEqual(self.ops(changes), [(1, UPDATED)])
+
+    def test_since_after_current_version(self):
+        seq = self.record(CREATED, 1)
+        with self.assertRaises(ChangeFeedExpired):
+            read_catalog_changes(seq + 1, 10)
+
+    def test_pruned_feed_expires(self):
+        old = self.record(CREATED, 1)
+        self.record(UPDATED, 1)
+        CatalogChange.objects.filter(seq__lte=old + 1).update(created_at=timezone.now() - timedelta(days=2))
+        recent = self.record(CREATED, 2)
+
+        deleted, start = prune_catalog_changes(timezone.now() - timedelta(days=1))
+        self.assertEqual((deleted, start), (2, old + 1))
+        self.assertEqual(get_feed_start(), start)
+        self.assertEqual(list(CatalogChange.objects.values_list('seq', flat=True)), [recent])
+
+        for since in (self.start, old):
+            with self.subTest(since=since), self.assertRaises(ChangeFeedExpired):
+                read_catalog_changes(since, 10)
+        changes, _, _ = read_catalog_changes(start, 10)
+        self.assertEqual(self.ops(changes), [(2, CREATED)])
+
+        # Повторная очистка без старых записей не сдвигает начало журнала
+        self.assertEqual(prune_catalog_changes(timezone.now() - timedelta(days=1)), (0, start))
+
+
+class CatalogChangeFeedViewTests(CatalogTestCase):
+    def get(self, **params):
+        return self.client.get('/api/catalog/changes/', params)
+
+    def test_feed(self):
+        since = self.get().json()['next_since']
+        category = ProductCategory.objects.create(name='Категория')
+        response = self.client.post('/api/products/bulk-create/', [
+            {'name': f'Товар {index}', 'price': '1.00', 'categoryID': category.pk} for index in range(3)
+        ], content_type='application/json')
+        ids = response.json()['ids']
+        self.client.put(f'/api/products/update/{ids[0]}/', {
+            'name': 'Новое название', 'price': '2.00', 'categoryID': category.pk,
+        }, content_type='application/json')
+        self.client.delete(f'/api/products/delete/{ids[1]}/')
+
+        data = self.get(since=since).json()
+        changes = {change['id']: change for change in data['changes'] if change['entity'] == PRODUCT}
+        self.assertEqual({pk: change['op'] for pk, change in changes.items()},
+                         {ids[0]: CREATED, ids[1]: DELETED, ids[2]: CREATED})
+        self.assertEqual(changes[ids[0]]['object']['name'], 'Новое название')
+        self.assertIsNone(changes[ids[1]]['object'])
+        self.assertFalse(data['has_more'])
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_pruned_since_returns_gone(self):
+        since = self.get().json()['next_since']
+        record_catalog_changes((PRODUCT, CREATED, [1]))
+        CatalogChange.objects.update(created_at=timezone.now() - timedelta(days=2))
+        record_catalog_changes((PRODUCT, CREATED, [2]))
+        prune_catalog_changes(timezone.now() - timedelta(days=1))
+
+        self.assertEqual(self.get(since=since).status_code, 410)
+        self.assertEqual(self.get(since=get_feed_start()).status_code, 200)
@@ -0,0 +1,131 @@
+# Тесты удаления категорий: синхронное удаление небольших категорий и
+# задачи CategoryDeletionJob для больших (см. services/categoryDeletion.py).
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from product.models.catalogChangeModel import CatalogChange
+from product.models.categoryDeletionJobModel import CategoryDeletionJob
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.services.categoryDeletion import claim_deletion_job, run_deletion_job
+from product.testing.catalogTestCase import CatalogTestCase
+
+THRESHOLD = 3
+
+
+@override_settings(CATEGORY_DELETE_SYNC_THRESHOLD=THRESHOLD, CATEGORY_DELETE_CHUNK_SIZE=2,
+                   CATEGORY_DELETE_BACKGROUND=False)
+class CategoryDeletionTests(CatalogTestCase):
+    def create_category(self, products):
+        category = ProductCategory.objects.create(name=f'Категория {products}')
+        Product.objects.bulk_create(
+            Product(name=f'Товар {index}', description='', price='1.00', categoryID=category)
+            for index in range(products)
+        )
+        return category
+
+    def delete(self, category):
+        return self.client.delete(f'/api/product-categories/delete/{category.pk}/')
+
+    def deleted_ids(self, entity):
+        return set(CatalogChange.objects.filter(entity=entity, op=CatalogChange.DELETED)
+                   .values_list('object_id', flat=True))
+
+    def test_small_category_is_deleted_synchronously(self):
+        category = self.create_category(THRESHOLD)
+        other = self.create_category(1)
+        product_ids = set(Product.objects.filter(categoryID=category).values_list('id', flat=True))
+
+        response = self.delete(category)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(ProductCategory.objects.filter(pk=category.pk).exists())
+        self.assertFalse(Product.objects.filter(categoryID_id=category.pk).exists())
+        self.assertEqual(Product.objects.filter(categoryID=other).count(), 1)
+        self.assertFalse(CategoryDeletionJob.objects.exists())
+        self.assertEqual(self.deleted_ids(CatalogChange.PRODUCT), product_ids)
+        self.assertEqual(self.deleted_ids(CatalogChange.CATEGORY), {category.pk})
+
+    def test_missing_category(self):
+        self.assertEqual(self.client.delete('/api/product-categories/delete/999/').status_code, 404)
+
+    def test_large_category_creates_job(self):
+        category = self.create_category(THRESHOLD + 2)
+        product_ids = set(Product.objects.filter(categoryID=category).values_list('id', flat=True))
+
+        response = self.delete(category)
+        self.assertEqual(response.status_code, 202)
+        job = CategoryDeletionJob.objects.get()
+        self.assertTrue(response['Location'].endswith(f'/api/product-categories/delete-jobs/{job.pk}/'))
+        self.assertEqual((job.category_id, job.status, job.total), (category.pk, CategoryDeletionJob.PENDING, 5))
+        # До выполнения задачи товары не удаляются
+        self.assertEqual(Product.objects.filter(categoryID=category).count(), 5)
+
+        # Повторный запрос возвращает ту же задачу
+        self.assertEqual(self.delete(category).status_code, 202)
+        self.assertEqual(CategoryDeletionJob.objects.count(), 1)
+
+        self.assertTrue(run_deletion_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), (CategoryDeletionJob.DONE, 5))
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(ProductCategory.objects.filter(pk=category.pk).exists())
+        self.assertFalse(Product.objects.filter(categoryID_id=category.pk).exists())
+        self.assertEqual(self.deleted_ids(CatalogChange.PRODUCT), product_ids)
+        self.assertEqual(self.deleted_ids(CatalogChange.CATEGORY), {category.pk})
+
+        response = self.client.get(response['Location'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], CategoryDeletionJob.DONE)
+
+    def test_claimed_job_is_not_claimed_again(self):
+        self.delete(self.create_category(THRESHOLD + 1))
+        job = CategoryDeletionJob.objects.get()
+
+        self.assertTrue(claim_deletion_job(job.pk))
+        self.assertFalse(claim_deletion_job(job.pk))
+        # Второй обработчик не выполняет задачу, захваченную первым
+        self.assertFalse(run_deletion_job(job.pk, stale_after=60))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), (CategoryDeletionJob.RUNNING, 0))
+        self.assertEqual(Product.objects.count(), THRESHOLD + 1)
+
+    def test_finished_job_is_not_run_again(self):
+        self.delete(self.create_category(THRESHOLD + 1))
+        job = CategoryDeletionJob.objects.get()
+        self.assertTrue(run_deletion_job(job.pk))
+        self.assertFalse(run_deletion_job(job.pk, stale_after=0))
+
+    def test_stale_job_is_recovered(self):
+        category = self.create_category(THRESHOLD + 2)
+        self.delete(category)
+        job = CategoryDeletionJob.objects.get()
+        # Обработчик захватил задачу, удалил первую пачку и прервался
+        claim_deletion_job(job.pk)
+        first = list(Product.objects.filter(categoryID=category).order_by('id').values_list('id', flat=True)[:2])
+        Product.objects.filter(pk__in=first).delete()
+        CategoryDeletionJob.objects.filter(pk=job.pk).update(
+            deleted=2, updated_at=timezone.now() - timedelta(minutes=10),
+        )
+
+        output = StringIO()
+        call_command('process_category_deletions', stale=60, stdout=output)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), (CategoryDeletionJob.DONE, 5))
+        self.assertIn(f'Задача {job.pk}', output.getvalue())
+        self.assertFalse(ProductCategory.objects.filter(pk=category.pk).exists())
+        self.assertFalse(Product.objects.exists())
+
+    def test_recently_updated_running_job_is_not_recovered(self):
+        self.delete(self.create_category(THRESHOLD + 1))
+        job = CategoryDeletionJob.objects.get()
+        claim_deletion_job(job.pk)
+
+        call_command('process_category_deletions', stale=60, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, CategoryDeletionJob.RUNNING)
+        self.assertEqual(Product.objects.count(), THRESHOLD + 1)
@@ -0,0 +1,58 @@
+# Тесты условных GET-запросов к спискам каталога (ETag / If-None-Match,
+# Last-Modified / If-Modified-Since), см. services/conditionalGet.py.
+
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.testing.catalogTestCase import CatalogTestCase
+
+LIST_URLS = ('/api/products/', '/api/async/products/')
+INVALID_QUERY = '?fields=unknown'
+
+
+class ConditionalCatalogListTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.post('/api/product-categories/create/', {'name': 'Категория'}, content_type='application/json')
+        self.client.post('/api/products/create/', {
+            'name': 'Товар', 'price': '1.00', 'categoryID': ProductCategory.objects.get().pk,
+        }, content_type='application/json')
+
+    def assert_no_validators(self, response):
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_not_modified(self):
+        for url in LIST_URLS:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                self.assertTrue(response.has_header('Last-Modified'))
+
+                response = self.client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+    def test_changed_catalog_is_sent_again(self):
+        etag = self.client.get('/api/products/')['ETag']
+        self.client.put(f'/api/products/update/{Product.objects.get().pk}/', {
+            'name': 'Товар', 'price': '2.00', 'categoryID': ProductCategory.objects.get().pk,
+        }, content_type='application/json')
+        response = self.client.get('/api/products/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_errors_have_no_validators(self):
+        for url in LIST_URLS:
+            with self.subTest(url=url):
+                response = self.client.get(url + INVALID_QUERY)
+                self.assertEqual(response.status_code, 400)
+                self.assert_no_validators(response)
+
+    def test_empty_catalog_has_no_validators(self):
+        Product.objects.all().delete()
+        for url in LIST_URLS:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 204)
+                self.assert_no_validators(response)
@@ -0,0 +1,118 @@
+# Тесты обновления товаров и категорий с проверкой версии (ETag / If-Match),
+# см. services/conditionalUpdate.py.
+
+from django.test import override_settings
+
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.testing.catalogTestCase import CatalogTestCase
+
+
+class ProductConditionalUpdateTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = ProductCategory.objects.create(name='Категория')
+        response = self.client.post('/api/products/create/', {
+            'name': 'Товар', 'description': 'Описание', 'price': '10.00', 'categoryID': self.category.pk,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['ETag'], '"1"')
+        self.product = Product.objects.get()
+
+    def put(self, pk=None, price='20.00', **headers):
+        return self.client.put(f'/api/products/update/{pk or self.product.pk}/', {
+            'name': 'Товар', 'price': price, 'categoryID': self.category.pk,
+        }, content_type='application/json', headers=headers)
+
+    def assert_product(self, price, version):
+        product = Product.objects.get(pk=self.product.pk)
+        self.assertEqual(str(product.price), price)
+        self.assertEqual(product.version, version)
+
+    def test_update_increments_version_once(self):
+        response = self.put(**{'If-Match': '"1"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assert_product('20.00', 2)
+
+    def test_update_without_if_match(self):
+        response = self.put()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assert_product('20.00', 2)
+
+    def test_any_of_several_etags(self):
+        response = self.put(**{'If-Match': '"7", "1"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assert_product('20.00', 2)
+
+    def test_stale_if_match(self):
+        self.put(**{'If-Match': '"1"'})
+        response = self.put(price='30.00', **{'If-Match': '"1"'})
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assert_product('20.00', 2)
+
+    def test_weak_etag_never_matches(self):
+        response = self.put(**{'If-Match': 'W/"1"'})
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response['ETag'], '"1"')
+        self.assert_product('10.00', 1)
+
+    def test_star_matches_any_version(self):
+        self.put(**{'If-Match': '"1"'})
+        response = self.put(price='30.00', **{'If-Match': '*'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"3"')
+        self.assert_product('30.00', 3)
+
+    @override_settings(CATALOG_REQUIRE_IF_MATCH=True)
+    def test_missing_if_match_when_required(self):
+        response = self.put()
+        self.assertEqual(response.status_code, 428)
+        self.assert_product('10.00', 1)
+        self.assertEqual(self.put(**{'If-Match': '"1"'}).status_code, 200)
+
+    def test_missing_product(self):
+        response = self.put(pk=self.product.pk + 100, **{'If-Match': '"1"'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.put(pk=self.product.pk + 100).status_code, 404)
+
+    def test_async_update(self):
+        response = self.client.put(f'/api/async/products/update/{self.product.pk}/', {
+            'name': 'Товар', 'price': '20.00', 'categoryID': self.category.pk,
+        }, content_type='application/json', headers={'If-Match': '"1"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assert_product('20.00', 2)
+
+
+class CategoryConditionalUpdateTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = ProductCategory.objects.create(name='Категория', description='Описание')
+
+    def put(self, description, pk=None, **headers):
+        return self.client.put(f'/api/product-categories/update/{pk or self.category.pk}/', {
+            'description': description,
+        }, content_type='application/json', headers=headers)
+
+    def test_update_and_stale_if_match(self):
+        response = self.put('Новое описание', **{'If-Match': '"1"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+
+        response = self.put('Еще одно описание', **{'If-Match': '"1"'})
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response['ETag'], '"2"')
+        category = ProductCategory.objects.get()
+        self.assertEqual((category.description, category.version), ('Новое описание', 2))
+
+    @override_settings(CATALOG_REQUIRE_IF_MATCH=True)
+    def test_missing_if_match_when_required(self):
+        self.assertEqual(self.put('Новое описание').status_code, 428)
+        self.assertEqual(ProductCategory.objects.get().version, 1)
+
+    def test_missing_category(self):
+        self.assertEqual(self.put('Новое описание', pk=self.category.pk + 100).status_code, 404)
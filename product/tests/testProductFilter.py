@@ -0,0 +1,50 @@
+# Тесты фильтра списка товаров по префиксу названия (?name_prefix=): фильтр
+# строится диапазоном [prefix, верхняя граница), см. productFilterSerializer.py.
+
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.serializers.productFilterSerializer import prefix_upper_bound
+from product.testing.catalogTestCase import CatalogTestCase
+
+MAX_CHAR = '\U0010ffff'
+
+
+class PrefixUpperBoundTests(CatalogTestCase):
+    def test_increments_last_character(self):
+        self.assertEqual(prefix_upper_bound('ab'), 'ac')
+        self.assertEqual(prefix_upper_bound('чай'), 'чак')
+
+    def test_drops_trailing_max_character(self):
+        self.assertEqual(prefix_upper_bound('a' + MAX_CHAR), 'b')
+        self.assertEqual(prefix_upper_bound('ab' + MAX_CHAR * 2), 'ac')
+
+    def test_no_bound_for_max_characters_only(self):
+        self.assertIsNone(prefix_upper_bound(MAX_CHAR * 2))
+
+    def test_skips_surrogates(self):
+        self.assertEqual(prefix_upper_bound('a\ud7ff'), 'a\ue000')
+
+
+class ProductNamePrefixTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        category = ProductCategory.objects.create(name='Категория')
+        for name in ('ab', 'ab' + MAX_CHAR, 'ab' + MAX_CHAR + 'z', 'ac', 'b', MAX_CHAR * 3, 'a\ud7ff!', 'a\ue000'):
+            Product.objects.create(name=name, description='', price='1.00', categoryID=category)
+
+    def names(self, prefix):
+        response = self.client.get('/api/products/', {'name_prefix': prefix})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [product['name'] for product in response.json()['results']]
+
+    def test_prefix(self):
+        self.assertEqual(self.names('ab'), ['ab', 'ab' + MAX_CHAR, 'ab' + MAX_CHAR + 'z'])
+
+    def test_prefix_ending_in_max_character(self):
+        self.assertEqual(self.names('ab' + MAX_CHAR), ['ab' + MAX_CHAR, 'ab' + MAX_CHAR + 'z'])
+
+    def test_prefix_of_max_characters(self):
+        self.assertEqual(self.names(MAX_CHAR * 2), [MAX_CHAR * 3])
+
+    def test_prefix_before_surrogates(self):
+        self.assertEqual(self.names('a\ud7ff'), ['a\ud7ff!'])
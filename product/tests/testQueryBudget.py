@@ -0,0 +1,78 @@
+# Тесты бюджета SQL-запросов путей чтения каталога: количество запросов не
+# должно зависеть от количества возвращаемых строк (см. testing/queryBudget.py).
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.testing.catalogTestCase import CatalogTestCase
+from product.testing.queryBudget import assert_max_queries, assert_view_query_budget
+
+# Версия каталога, страница товаров, версия категорий, категории страницы
+PRODUCT_LIST_QUERIES = 4
+# Сессия, пользователь, два COUNT, страница товаров с категориями
+PRODUCT_ADMIN_QUERIES = 5
+MANY_ROWS = 25
+
+
+# Создает count товаров, каждый в собственной категории
+def create_products(count):
+    categories = ProductCategory.objects.bulk_create(
+        ProductCategory(name=f'Категория {index}', description='Описание') for index in range(count)
+    )
+    return Product.objects.bulk_create(
+        Product(name=f'Товар {index}', description='Описание', price='10.50', categoryID=category)
+        for index, category in enumerate(categories)
+    )
+
+
+class ProductListQueryBudgetTests(CatalogTestCase):
+    def assert_list_budget(self, count, url='/api/products/'):
+        create_products(count)
+        with assert_max_queries(PRODUCT_LIST_QUERIES) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), count)
+        self.assertEqual(len(context.captured_queries), PRODUCT_LIST_QUERIES)
+        return response
+
+    def test_one_row(self):
+        self.assert_list_budget(1)
+
+    def test_many_rows(self):
+        response = self.assert_list_budget(MANY_ROWS)
+        categories = {product['categoryID']['name'] for product in response.json()['results']}
+        self.assertEqual(len(categories), MANY_ROWS)
+
+    def test_many_rows_with_fieldset(self):
+        self.assert_list_budget(MANY_ROWS, '/api/products/?fields=id,name,categoryID&expand=category')
+
+    def test_repeated_request_uses_cache(self):
+        create_products(MANY_ROWS)
+        self.client.get('/api/products/')
+        # Версия каталога не изменилась: ответ берется из кэша
+        response = assert_view_query_budget(self.client, '/api/products/', 1)
+        self.assertEqual(len(response.json()['results']), MANY_ROWS)
+
+
+class ProductAdminQueryBudgetTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.admin_client = Client()
+        self.admin_client.force_login(user)
+
+    def assert_changelist_budget(self, count):
+        create_products(count)
+        with assert_max_queries(PRODUCT_ADMIN_QUERIES) as context:
+            response = self.admin_client.get('/admin/product/product/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, count)
+        self.assertEqual(len(context.captured_queries), PRODUCT_ADMIN_QUERIES)
+
+    def test_one_row(self):
+        self.assert_changelist_budget(1)
+
+    def test_many_rows(self):
+        self.assert_changelist_budget(MANY_ROWS)
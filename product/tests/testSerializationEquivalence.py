@@ -0,0 +1,67 @@
+# Тесты быстрого пути чтения списков (serializers/fastSerializer.py): ответ
+# должен побайтно совпадать с ответом сериализаторов DRF на случайных данных
+# и случайных наборах ?fields= / ?expand= (см. testing/serializationEquivalence.py).
+
+import random
+
+from django.http import QueryDict
+
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.serializers.productCategorySerializer import ProductCategorySerializerRead
+from product.serializers.productSerializer import ProductSerializerRead
+from product.testing.catalogTestCase import CatalogTestCase
+from product.testing.serializationEquivalence import PRICES, assert_same_output, check_equivalence, create_random_catalog
+
+SEEDS = (0, 1, 2)
+PRODUCTS = 300
+CATEGORIES = 30
+EXAMPLES = 60
+
+# Наборы параметров, которые проверяются всегда
+PRODUCT_PARAMS = (
+    '',
+    'fields=id,name,price',
+    'fields=id,categoryID',
+    'fields=categoryID&expand=category',
+    'fields=id,name,description,price,categoryID&expand=category',
+    'expand=category',
+)
+CATEGORY_PARAMS = ('', 'fields=id', 'fields=name,description')
+
+
+class SerializationEquivalenceTests(CatalogTestCase):
+    def products(self):
+        return Product.objects.with_category()
+
+    # Граничные значения, которые случайные данные могут не содержать
+    def create_edge_cases(self):
+        empty = ProductCategory.objects.create(name='Без описания', description=None)
+        blank = ProductCategory.objects.create(name='\u2028\u2029 "кавычки" \\ </script>', description='')
+        Product.objects.bulk_create(
+            Product(name=f'Цена {price}', description='\u2028\U0001f600\u2029\x1f', price=price, categoryID=category)
+            for price in PRICES
+            for category in (empty, blank)
+        )
+
+    def test_random_catalogs(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                Product.objects.all().delete()
+                ProductCategory.objects.all().delete()
+                create_random_catalog(random.Random(seed), PRODUCTS, CATEGORIES)
+                self.create_edge_cases()
+
+                compared = check_equivalence(ProductSerializerRead, self.products(), EXAMPLES, seed)
+                self.assertEqual(compared, (EXAMPLES + 1) * (PRODUCTS + 2 * len(PRICES)))
+                check_equivalence(ProductCategorySerializerRead, ProductCategory.objects.all(), EXAMPLES // 4, seed)
+
+    def test_fieldset_variants(self):
+        create_random_catalog(random.Random(0), PRODUCTS, CATEGORIES)
+        self.create_edge_cases()
+        for query in PRODUCT_PARAMS:
+            with self.subTest(query=query):
+                assert_same_output(ProductSerializerRead, self.products(), QueryDict(query))
+        for query in CATEGORY_PARAMS:
+            with self.subTest(query=query):
+                assert_same_output(ProductCategorySerializerRead, ProductCategory.objects.all(), QueryDict(query))
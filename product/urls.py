@@ -1,16 +1,38 @@
 from django.urls import path
 
-from product.views import productCategoryView, productView
+from product.views import catalogChangeView, productAsyncView, productCategoryAsyncView, productCategoryView, productExportView, productSearchView, productView
 urlpatterns = [
     # Категории товаров
     path('product-categories/', productCategoryView.ProductCategoryListView.as_view(), name='list-product-categories'),
     path('product-categories/create/', productCategoryView.ProductCategoryCreateView.as_view(), name='create-product-category'),
     path('product-categories/update/<int:pk>/', productCategoryView.ProductCategoryUpdateView.as_view(), name='update-product-category'),
     path('product-categories/delete/<int:pk>/', productCategoryView.ProductCategoryDeleteView.as_view(), name='delete-product-category'),
+    path('product-categories/delete-jobs/<int:pk>/', productCategoryView.CategoryDeletionJobView.as_view(), name='category-deletion-job'),
+    path('product-categories/stats/', productCategoryView.CategoryStatsView.as_view(), name='category-stats'),
 
     # Товары
     path('products/', productView.ProductListView.as_view(), name='list-products'),
+    path('products/search/', productSearchView.ProductSearchView.as_view(), name='search-products'),
+    path('products/export/', productExportView.ProductExportView.as_view(), name='export-products'),
     path('products/create/', productView.ProductCreateView.as_view(), name='create-product'),
+    path('products/bulk-create/', productView.ProductBulkCreateView.as_view(), name='bulk-create-products'),
+    path('products/bulk-upsert/', productView.ProductBulkUpsertView.as_view(), name='bulk-upsert-products'),
     path('products/update/<int:pk>/', productView.ProductUpdateView.as_view(), name='update-product'),
     path('products/delete/<int:pk>/', productView.ProductDeleteView.as_view(), name='delete-product'),
+
+    # Журнал изменений каталога
+    path('catalog/changes/', catalogChangeView.CatalogChangeFeedView.as_view(), name='catalog-changes'),
+
+    # Асинхронные версии (ASGI)
+    path('async/product-categories/', productCategoryAsyncView.ProductCategoryAsyncListView.as_view(), name='async-list-product-categories'),
+    path('async/product-categories/<int:pk>/', productCategoryAsyncView.ProductCategoryAsyncRetrieveView.as_view(), name='async-retrieve-product-category'),
+    path('async/product-categories/create/', productCategoryAsyncView.ProductCategoryAsyncCreateView.as_view(), name='async-create-product-category'),
+    path('async/product-categories/update/<int:pk>/', productCategoryAsyncView.ProductCategoryAsyncUpdateView.as_view(), name='async-update-product-category'),
+    path('async/product-categories/delete/<int:pk>/', productCategoryAsyncView.ProductCategoryAsyncDeleteView.as_view(), name='async-delete-product-category'),
+
+    path('async/products/', productAsyncView.ProductAsyncListView.as_view(), name='async-list-products'),
+    path('async/products/<int:pk>/', productAsyncView.ProductAsyncRetrieveView.as_view(), name='async-retrieve-product'),
+    path('async/products/create/', productAsyncView.ProductAsyncCreateView.as_view(), name='async-create-product'),
+    path('async/products/update/<int:pk>/', productAsyncView.ProductAsyncUpdateView.as_view(), name='async-update-product'),
+    path('async/products/delete/<int:pk>/', productAsyncView.ProductAsyncDeleteView.as_view(), name='async-delete-product'),
 ]
@@ -0,0 +1,68 @@
+# Модуль 'asyncApiView.py' содержит базовый класс асинхронных представлений
+# каталога. Асинхронные представления обслуживаются ASGI-приложением без
+# выделения потока на запрос и возвращают те же ответы, что и APIView:
+# JSON кодируется тем же кодировщиком, что и в CatalogJSONRenderer.
+
+import json
+
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+
+from product.renderers.jsonRenderer import render_json
+from product.services.catalogVersion import aget_catalog_version
+from product.services.conditionalGet import add_catalog_validators, catalog_not_modified
+
+
+class InvalidJSON(Exception):
+    pass
+
+
+# Базовый класс асинхронного представления
+class AsyncAPIView(View):
+    # Как и APIView, представления не используют сессионную аутентификацию,
+    # поэтому CSRF-проверка отключена.
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except InvalidJSON as exc:
+            return self.response({"detail": str(exc)}, status=400)
+        # Ошибки DRF (например, некорректный курсор пагинации) - в том же
+        # формате, что и у APIView
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+            return self.response(detail, status=exc.status_code)
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        return self.response({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+
+    @staticmethod
+    def response(data, status=200, headers=None):
+        return HttpResponse(render_json(data), status=status, content_type='application/json', headers=headers)
+
+    @staticmethod
+    def parse_json(request):
+        if not request.body:
+            return {}
+        try:
+            return json.loads(request.body)
+        except ValueError as exc:
+            raise InvalidJSON(f'JSON parse error - {exc}')
+
+    # Проверка If-None-Match / If-Modified-Since по версии каталога.
+    # Возвращает ответ 304 или None, если данные нужно отдать полностью.
+    @staticmethod
+    async def conditional_response(request):
+        await aget_catalog_version(request=request)
+        return catalog_not_modified(request)
+
+    # Валидаторы добавляются только к ответу 200 (см. conditionalGet.py)
+    @staticmethod
+    def set_conditional_headers(request, response):
+        return add_catalog_validators(request, response)
@@ -0,0 +1,72 @@
+from django.http import QueryDict
+from drf_spectacular.utils import extend_schema_view, extend_schema
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.views import APIView
+
+from product.models.catalogChangeModel import CatalogChange
+from product.models.productCategoryModel import ProductCategory
+from product.models.productModel import Product
+from product.serializers.catalogChangeSerializer import CatalogChangeFeedParamsSerializer, CatalogChangeFeedSerializerRead
+from product.serializers.fastSerializer import read_path
+from product.serializers.fieldsetSerializer import SparseFieldset
+from product.serializers.productCategorySerializer import ProductCategorySerializerRead
+from product.serializers.productSerializer import ProductSerializerRead
+from product.services.catalogChanges import ChangeFeedExpired, read_catalog_changes
+from product.services.conditionalGet import conditional_catalog_response
+
+# Объекты изменений строятся теми же сериализаторами, что и списки каталога
+ENTITY_SOURCES = {
+    CatalogChange.PRODUCT: (ProductSerializerRead, Product.objects.with_category()),
+    CatalogChange.CATEGORY: (ProductCategorySerializerRead, ProductCategory.objects.all()),
+}
+
+
+# Представление, отвечающее за журнал изменений каталога. Возвращает товары
+# и категории, созданные, измененные или удаленные после номера since, с
+# текущим состоянием объектов и записями об удалении.
+@extend_schema_view(
+    get=extend_schema(summary='Изменения каталога', tags=['Изменения каталога'],
+                      parameters=[CatalogChangeFeedParamsSerializer],
+                      responses=CatalogChangeFeedSerializerRead),
+)
+class CatalogChangeFeedView(APIView):
+    @conditional_catalog_response
+    def get(self, request):
+        params = CatalogChangeFeedParamsSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            changes, next_since, has_more = read_catalog_changes(
+                params.validated_data.get('since'), params.page_size, request=request,
+            )
+        except ChangeFeedExpired:
+            return Response(
+                {"error": "Изменения после указанного номера недоступны. Выполните полную синхронизацию."},
+                status=status.HTTP_410_GONE,
+            )
+
+        self._attach_objects(changes)
+        return Response({"changes": changes, "next_since": next_since, "has_more": has_more})
+
+    # Загружает текущее состояние созданных и измененных объектов одним
+    # запросом на тип объекта
+    def _attach_objects(self, changes):
+        for entity, (serializer_class, queryset) in ENTITY_SOURCES.items():
+            ids = [change['id'] for change in changes
+                   if change['entity'] == entity and change['op'] != CatalogChange.DELETED]
+            objects = {}
+            if ids:
+                queryset, serialize = read_path(
+                    SparseFieldset(serializer_class, QueryDict()), queryset.filter(pk__in=ids), request=self.request,
+                )
+                objects = {item['id']: item for item in serialize(queryset)}
+            for change in changes:
+                if change['entity'] != entity:
+                    continue
+                change['object'] = objects.get(change['id'])
+                # Объект удален после чтения журнала; удаление придет со
+                # следующим номером, а запись о нем идемпотентна
+                if change['object'] is None:
+                    change['op'] = CatalogChange.DELETED
@@ -0,0 +1,129 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from product.models.productModel import Product
+from product.pagination.keysetPagination import KeysetPagination
+from product.serializers.productFilterSerializer import ProductFilterSerializer
+from product.serializers.productSerializer import ProductSerializerBulkItem, ProductSerializerCreate, ProductSerializerDelete, ProductSerializerRead, ProductSerializerUpdate
+from product.serializers.fastSerializer import aread_path
+from product.serializers.fieldsetSerializer import SparseFieldset
+from product.services.catalogSnapshot import ListSnapshotSource, acatalog_snapshot_response
+from product.services.categoryCache import category_from_row, get_category_cache
+from product.services.conditionalUpdate import PreconditionFailed, PreconditionRequired, if_match_versions, object_etag
+from product.views.asyncApiView import AsyncAPIView
+
+# Асинхронные представления товаров. Чтение выполняется асинхронным ORM;
+# запись вместе с увеличением версии каталога должна идти в одной транзакции,
+# а транзакции в Django 4.2 доступны только синхронно, поэтому сама запись
+# выполняется через sync_to_async теми же методами сериализаторов, что и в
+# синхронном API.
+
+
+# Проверка полей товара без обращения к базе и загрузка категории из кэша
+# категорий процесса (запрос к базе только при промахе)
+async def _validate_product(data, request=None):
+    serializer = ProductSerializerBulkItem(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+
+    validated_data = dict(serializer.validated_data)
+    row = await get_category_cache().aget(validated_data['categoryID'], request=request)
+    if row is None:
+        message = PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+        return None, {'categoryID': [message.format(pk_value=validated_data['categoryID'])]}
+    validated_data['categoryID'] = category_from_row(row)
+    return validated_data, None
+
+
+# Асинхронное представление, отвечающее за создание продукта
+class ProductAsyncCreateView(AsyncAPIView):
+    async def post(self, request):
+        validated_data, errors = await _validate_product(self.parse_json(request), request)
+        if errors:
+            return self.response(errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            product = await sync_to_async(ProductSerializerCreate().create)(validated_data)
+        except ValidationError as exc:
+            return self.response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        return self.response({"message": "Товар успешно создан"}, status=status.HTTP_201_CREATED,
+                             headers={'ETag': object_etag(product.version)})
+
+
+# Асинхронное представление, отвечающее за предоставление списка продуктов
+class ProductAsyncListView(AsyncAPIView):
+    async def get(self, request):
+        not_modified = await self.conditional_response(request)
+        if not_modified is not None:
+            return not_modified
+        if not request.GET:
+            snapshot = await acatalog_snapshot_response(request, ListSnapshotSource(request.build_absolute_uri()))
+            if snapshot is not None:
+                return self.set_conditional_headers(request, snapshot)
+
+        filters = ProductFilterSerializer(data=request.GET)
+        fieldset = SparseFieldset(ProductSerializerRead, request.GET)
+        if not filters.is_valid() or not fieldset.is_valid():
+            return self.response({**filters.errors, **fieldset.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPagination(ordering=filters.keyset_ordering)
+        queryset, serialize = aread_path(
+            fieldset, filters.filter_queryset(Product.objects.with_category()), required=paginator.ordering,
+            request=request,
+        )
+        products = await paginator.apaginate_queryset(queryset, request)
+
+        if not products and paginator.cursor is None and not filters.has_filters:
+            response = self.response({"error": "Товары отсутствуют"}, status=status.HTTP_204_NO_CONTENT)
+        else:
+            response = self.response(paginator.get_paginated_data(await serialize(products)))
+        return self.set_conditional_headers(request, response)
+
+
+# Асинхронное представление, отвечающее за предоставление информации о продукте
+class ProductAsyncRetrieveView(AsyncAPIView):
+    async def get(self, request, pk):
+        fieldset = SparseFieldset(ProductSerializerRead, request.GET)
+        if not fieldset.is_valid():
+            return self.response(fieldset.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            product = await fieldset.apply(Product.objects.with_category(), required=('version',)).aget(pk=pk)
+        except Product.DoesNotExist:
+            return self.response({"error": "Товар не найден"}, status=status.HTTP_404_NOT_FOUND)
+        return self.response(fieldset.get_serializer_class()(product).data, headers={'ETag': object_etag(product.version)})
+
+
+# Асинхронное представление, отвечающее за обновление продукта (одним
+# условным UPDATE, см. services/conditionalUpdate.py)
+class ProductAsyncUpdateView(AsyncAPIView):
+    async def put(self, request, pk):
+        try:
+            versions = if_match_versions(request)
+        except PreconditionRequired:
+            return self.response({"error": "Требуется заголовок If-Match"}, status=status.HTTP_428_PRECONDITION_REQUIRED)
+
+        validated_data, errors = await _validate_product(self.parse_json(request), request)
+        if errors:
+            return self.response(errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            version = await sync_to_async(ProductSerializerUpdate().update_by_pk)(pk, validated_data, versions)
+        except ValidationError as exc:
+            return self.response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Product.DoesNotExist:
+            return self.response({"error": "Товар не найден"}, status=status.HTTP_404_NOT_FOUND)
+        except PreconditionFailed as exc:
+            return self.response({"error": "Товар был изменен другим запросом"},
+                                 status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': object_etag(exc.version)})
+        return self.response({"message": "Товар успешно обновлен"}, status=status.HTTP_200_OK,
+                             headers={'ETag': object_etag(version)})
+
+
+# Асинхронное представление, отвечающее за удаление продукта
+class ProductAsyncDeleteView(AsyncAPIView):
+    async def delete(self, request, pk):
+        try:
+            await sync_to_async(ProductSerializerDelete().delete)({'id': pk})
+        except ValidationError:
+            return self.response({"error": "Продукт с таким ID не найден."}, status=status.HTTP_404_NOT_FOUND)
+        return self.response({"message": "Продукт успешно удален."}, status=status.HTTP_204_NO_CONTENT)
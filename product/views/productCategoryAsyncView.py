@@ -0,0 +1,113 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from product.models.productCategoryModel import ProductCategory
+from product.pagination.keysetPagination import KeysetPagination
+from product.serializers.productCategorySerializer import ProductCategorySerializerCreate, ProductCategorySerializerDelete, ProductCategorySerializerRead, ProductCategorySerializerUpdate
+from product.serializers.fastSerializer import aread_path
+from product.serializers.fieldsetSerializer import SparseFieldset
+from product.services.catalogSnapshot import ListSnapshotSource, acatalog_snapshot_response
+from product.services.conditionalUpdate import PreconditionFailed, PreconditionRequired, if_match_versions, object_etag
+from product.views.asyncApiView import AsyncAPIView
+from product.views.productCategoryView import deletion_job_accepted
+
+# Асинхронные представления категорий товаров. Валидация сериализаторами
+# категорий не обращается к базе, чтение выполняется асинхронным ORM,
+# а транзакционная запись - через sync_to_async (см. productAsyncView.py).
+
+
+# Асинхронное представление, отвечающее за создание категории продукта
+class ProductCategoryAsyncCreateView(AsyncAPIView):
+    async def post(self, request):
+        serializer = ProductCategorySerializerCreate(data=self.parse_json(request))
+        if not serializer.is_valid():
+            return self.response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            category = await sync_to_async(serializer.save)()
+        except ValidationError as exc:
+            return self.response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        return self.response({"message": "Категория успешно создана"}, status=status.HTTP_201_CREATED,
+                             headers={'ETag': object_etag(category.version)})
+
+
+# Асинхронное представление, отвечающее за предоставление списка категорий
+class ProductCategoryAsyncListView(AsyncAPIView):
+    async def get(self, request):
+        not_modified = await self.conditional_response(request)
+        if not_modified is not None:
+            return not_modified
+        if not request.GET:
+            snapshot = await acatalog_snapshot_response(request, ListSnapshotSource(request.build_absolute_uri()))
+            if snapshot is not None:
+                return self.set_conditional_headers(request, snapshot)
+
+        fieldset = SparseFieldset(ProductCategorySerializerRead, request.GET)
+        if not fieldset.is_valid():
+            return self.response(fieldset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPagination()
+        queryset, serialize = aread_path(
+            fieldset, ProductCategory.objects.all(), required=paginator.ordering, request=request,
+        )
+        categories = await paginator.apaginate_queryset(queryset, request)
+
+        if not categories and paginator.cursor is None:
+            response = self.response({"error": "Категории товаров отсутствуют"}, status=status.HTTP_204_NO_CONTENT)
+        else:
+            response = self.response(paginator.get_paginated_data(await serialize(categories)))
+        return self.set_conditional_headers(request, response)
+
+
+# Асинхронное представление, отвечающее за предоставление информации о категории
+class ProductCategoryAsyncRetrieveView(AsyncAPIView):
+    async def get(self, request, pk):
+        fieldset = SparseFieldset(ProductCategorySerializerRead, request.GET)
+        if not fieldset.is_valid():
+            return self.response(fieldset.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            category = await fieldset.apply(ProductCategory.objects.all(), required=('version',)).aget(pk=pk)
+        except ProductCategory.DoesNotExist:
+            return self.response({"error": "Категория не найдена"}, status=status.HTTP_404_NOT_FOUND)
+        return self.response(fieldset.get_serializer_class()(category).data, headers={'ETag': object_etag(category.version)})
+
+
+# Асинхронное представление, отвечающее за обновление категории продукта
+# (одним условным UPDATE, см. services/conditionalUpdate.py)
+class ProductCategoryAsyncUpdateView(AsyncAPIView):
+    async def put(self, request, pk):
+        try:
+            versions = if_match_versions(request)
+        except PreconditionRequired:
+            return self.response({"error": "Требуется заголовок If-Match"}, status=status.HTTP_428_PRECONDITION_REQUIRED)
+
+        # partial=True позволяет обновлять только переданные поля
+        serializer = ProductCategorySerializerUpdate(data=self.parse_json(request), partial=True)
+        if not serializer.is_valid():
+            return self.response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            version = await sync_to_async(serializer.update_by_pk)(pk, serializer.validated_data, versions)
+        except ValidationError as exc:
+            return self.response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        except ProductCategory.DoesNotExist:
+            return self.response({"error": "Категория не найдена"}, status=status.HTTP_404_NOT_FOUND)
+        except PreconditionFailed as exc:
+            return self.response({"error": "Категория была изменена другим запросом"},
+                                 status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': object_etag(exc.version)})
+        return self.response({"message": "Категория успешно обновлена"}, status=status.HTTP_200_OK,
+                             headers={'ETag': object_etag(version)})
+
+
+# Асинхронное представление, отвечающее за удаление категории продукта
+class ProductCategoryAsyncDeleteView(AsyncAPIView):
+    async def delete(self, request, pk):
+        try:
+            job = await sync_to_async(ProductCategorySerializerDelete().delete)({'id': pk})
+        except ValidationError:
+            return self.response({"error": "Категория с таким ID не найдена."}, status=status.HTTP_404_NOT_FOUND)
+        if job is not None:
+            data, status_url = deletion_job_accepted(request, job)
+            response = self.response(data, status=status.HTTP_202_ACCEPTED)
+            response['Location'] = status_url
+            return response
+        return self.response({"message": "Категория успешно удалена."}, status=status.HTTP_204_NO_CONTENT)
@@ -1,11 +1,22 @@
-from drf_spectacular.utils import extend_schema_view, extend_schema
+from django.urls import reverse
+from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
 from rest_framework.response import Response
-from rest_framework import generics, status
+from rest_framework import generics, serializers, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
+from product.serializers.categoryDeletionJobSerializer import CategoryDeletionJobSerializerRead
+from product.serializers.categoryStatsSerializer import CategoryStatsSerializerRead
+from product.serializers.fastSerializer import read_path
+from product.serializers.fieldsetSerializer import FIELDS_PARAMETER, SparseFieldset
 from product.serializers.productCategorySerializer import ProductCategorySerializerCreate, ProductCategorySerializerDelete, ProductCategorySerializerRead, ProductCategorySerializerUpdate
+from product.models.categoryDeletionJobModel import CategoryDeletionJob
 from product.models.productCategoryModel import ProductCategory
+from product.pagination.keysetPagination import KeysetPagination
+from product.services.catalogSnapshot import serve_catalog_snapshot
+from product.services.conditionalUpdate import IF_MATCH_PARAMETER, PreconditionFailed, PreconditionRequired, if_match_versions, object_etag
+from product.services.conditionalGet import conditional_catalog_response
+from product.services.responseCache import cache_catalog_response
 
 # Представление, отвечающее за создание категории продукта
 @extend_schema_view(
@@ -16,58 +27,136 @@ class ProductCategoryCreateView(APIView):
     def post(self, request):
         serializer = ProductCategorySerializerCreate(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "Категория успешно создана"}, status=status.HTTP_201_CREATED)
+            category = serializer.save()
+            return Response({"message": "Категория успешно создана"}, status=status.HTTP_201_CREATED,
+                            headers={'ETag': object_etag(category.version)})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 
 # Представление, отвечающее за предоставление информации о категории продукта
 @extend_schema_view(
-    get=extend_schema(summary='Получение списка категорий товаров', tags=['Категории товаров']),
+    get=extend_schema(summary='Получение списка категорий товаров', tags=['Категории товаров'],
+                      parameters=[
+                          OpenApiParameter('cursor', str, description='Курсор страницы (из полей next/previous)'),
+                          OpenApiParameter('page_size', int, description='Количество категорий на странице'),
+                          FIELDS_PARAMETER,
+                      ]),
 )
 class ProductCategoryListView(APIView):
+    @conditional_catalog_response
+    @serve_catalog_snapshot
+    @cache_catalog_response
     def get(self, request):
-        categories = ProductCategory.objects.all()
-        
-        if not categories.exists():
+        fieldset = SparseFieldset(ProductCategorySerializerRead, request.query_params)
+        if not fieldset.is_valid():
+            return Response(fieldset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPagination()
+        # Проверка на пустую таблицу совмещена с запросом первой страницы
+        queryset, serialize = read_path(
+            fieldset, ProductCategory.objects.all(), required=paginator.ordering, request=request,
+        )
+        categories = paginator.paginate_queryset(queryset, request, view=self)
+
+        if not categories and paginator.cursor is None:
             return Response({"error": "Категории товаров отсутствуют"}, status=status.HTTP_204_NO_CONTENT)
 
-        serializer = ProductCategorySerializerRead(categories, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serialize(categories))
 
 # Представление, отвечающее за обновление категории продукта
 @extend_schema_view(
-    put=extend_schema(request=ProductCategorySerializerUpdate,
+    put=extend_schema(request=ProductCategorySerializerUpdate, parameters=[IF_MATCH_PARAMETER],
                       summary='Обновление категории товара', tags=['Категории товаров']),
 )
 class ProductCategoryUpdateView(APIView):
+    # Категория не загружается: переданные поля записываются одним UPDATE с
+    # проверкой версии из If-Match (см. services/conditionalUpdate.py)
     def put(self, request, pk):
         try:
-            category = ProductCategory.objects.get(pk=pk)
+            versions = if_match_versions(request)
+        except PreconditionRequired:
+            return Response({"error": "Требуется заголовок If-Match"}, status=status.HTTP_428_PRECONDITION_REQUIRED)
+
+        # partial=True позволяет обновлять только переданные поля
+        serializer = ProductCategorySerializerUpdate(data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            version = serializer.update_by_pk(pk, serializer.validated_data, versions)
         except ProductCategory.DoesNotExist:
             return Response({"error": "Категория не найдена"}, status=status.HTTP_404_NOT_FOUND)
+        except PreconditionFailed as exc:
+            return Response({"error": "Категория была изменена другим запросом"},
+                            status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': object_etag(exc.version)})
+        return Response({"message": "Категория успешно обновлена"}, status=status.HTTP_200_OK,
+                        headers={'ETag': object_etag(version)})
 
-        
-        # partial=True позволяет обновлять только переданные поля
-        serializer = ProductCategorySerializerUpdate(category, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "Категория успешно обновлена"}, status=status.HTTP_200_OK)
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# Тело ответа 202 на удаление большой категории: задача и адрес ее статуса
+def deletion_job_accepted(request, job):
+    status_url = request.build_absolute_uri(reverse('api:category-deletion-job', args=[job.pk]))
+    data = {
+        "message": "Категория содержит много товаров и будет удалена в фоновом режиме.",
+        "job": CategoryDeletionJobSerializerRead(job).data,
+        "status_url": status_url,
+    }
+    return data, status_url
+
 
 # Представление, отвечающее за удаление категории продукта
 @extend_schema_view(
     delete=extend_schema(request=None,  # Указываем, что запрос не требуется
-                         summary='Удаление категории товара', tags=['Категории товаров']),
+                         summary='Удаление категории товара', tags=['Категории товаров'],
+                         description='Категория с большим количеством товаров удаляется в фоновом режиме: '
+                                     'ответ 202 содержит адрес статуса задачи.'),
 )
 class ProductCategoryDeleteView(APIView):
     def delete(self, request, pk):
         try:
-            product_category = ProductCategory.objects.get(pk=pk)
-            product_category.delete()
-            return Response({"message": "Категория успешно удалена."}, status=status.HTTP_204_NO_CONTENT)
-        except ProductCategory.DoesNotExist:
+            job = ProductCategorySerializerDelete().delete({'id': pk})
+        except serializers.ValidationError:
             return Response({"error": "Категория с таким ID не найдена."}, status=status.HTTP_404_NOT_FOUND)
+        if job is not None:
+            data, status_url = deletion_job_accepted(request, job)
+            return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': status_url})
+        return Response({"message": "Категория успешно удалена."}, status=status.HTTP_204_NO_CONTENT)
+
+
+# Представление, отвечающее за статус задачи удаления категории
+@extend_schema_view(
+    get=extend_schema(summary='Статус удаления категории товара', tags=['Категории товаров'],
+                      responses=CategoryDeletionJobSerializerRead),
+)
+class CategoryDeletionJobView(APIView):
+    def get(self, request, pk):
+        try:
+            job = CategoryDeletionJob.objects.get(pk=pk)
+        except CategoryDeletionJob.DoesNotExist:
+            return Response({"error": "Задача с таким ID не найдена."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(CategoryDeletionJobSerializerRead(job).data)
+
+
+# Представление, отвечающее за статистику товаров по категориям. Данные
+# читаются из сводной таблицы CategoryStats: стоимость запроса зависит от
+# количества категорий на странице, а не от количества товаров.
+@extend_schema_view(
+    get=extend_schema(summary='Статистика товаров по категориям', tags=['Категории товаров'],
+                      parameters=[
+                          OpenApiParameter('cursor', str, description='Курсор страницы (из полей next/previous)'),
+                          OpenApiParameter('page_size', int, description='Количество категорий на странице'),
+                      ],
+                      responses=CategoryStatsSerializerRead(many=True)),
+)
+class CategoryStatsView(APIView):
+    @conditional_catalog_response
+    @cache_catalog_response
+    def get(self, request):
+        paginator = KeysetPagination()
+        queryset = ProductCategory.objects.values(
+            'id', 'name',
+            'stats__product_count', 'stats__price_sum', 'stats__min_price', 'stats__max_price',
+        )
+        categories = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = CategoryStatsSerializerRead(categories, many=True)
+        return paginator.get_paginated_response(serializer.data)
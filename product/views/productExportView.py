@@ -0,0 +1,123 @@
+import csv
+import json
+
+from django.conf import settings
+from django.db import router
+from django.http import StreamingHttpResponse
+from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from product.models.productModel import Product
+from product.services.catalogSnapshot import SnapshotSource, catalog_snapshot_response
+
+# Колонки выгрузки. Поля категории берутся JOIN-ом в том же запросе.
+EXPORT_COLUMNS = (
+    'id', 'name', 'description', 'price',
+    'categoryID_id', 'categoryID__name', 'categoryID__description',
+)
+CSV_HEADER = (
+    'id', 'name', 'description', 'price',
+    'categoryID', 'categoryName', 'categoryDescription',
+)
+
+# Цена форматируется так же, как в ProductSerializerRead
+_price_field = serializers.DecimalField(max_digits=19, decimal_places=2)
+
+
+# Псевдо-буфер для csv.writer: вместо накопления строк в памяти
+# сразу возвращает записанную строку.
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _export_rows(using):
+    queryset = Product.objects.using(using).order_by('id').values_list(*EXPORT_COLUMNS)
+    return queryset.iterator(chunk_size=settings.CATALOG_EXPORT_CHUNK_SIZE)
+
+
+def _ndjson_lines(using):
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    for pk, name, description, price, category_id, category_name, category_description in _export_rows(using):
+        yield dumps({
+            'id': pk,
+            'name': name,
+            'description': description,
+            'price': _price_field.to_representation(price),
+            'categoryID': {
+                'id': category_id,
+                'name': category_name,
+                'description': category_description,
+            },
+        }) + '\n'
+
+
+def _csv_lines(using):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in _export_rows(using):
+        row = list(row)
+        row[3] = _price_field.to_representation(row[3])
+        yield writer.writerow(row)
+
+
+EXPORT_FORMATS = {
+    'ndjson': (_ndjson_lines, 'application/x-ndjson', 'products.ndjson'),
+    'csv': (_csv_lines, 'text/csv', 'products.csv'),
+}
+
+# Размер части тела снимка выгрузки, передаваемой компрессорам
+SNAPSHOT_CHUNK_SIZE = 256 * 1024
+
+
+# Снимок выгрузки каталога в формате export_format
+class ExportSnapshotSource(SnapshotSource):
+    def __init__(self, export_format):
+        lines, content_type, filename = EXPORT_FORMATS[export_format]
+        self.key = f'export:{export_format}'
+        self.lines = lines
+        self.content_type = f'{content_type}; charset=utf-8'
+        self.headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+
+    def chunks(self, version):
+        buffer = []
+        size = 0
+        for line in self.lines(router.db_for_read(Product)):
+            line = line.encode('utf-8')
+            buffer.append(line)
+            size += len(line)
+            if size >= SNAPSHOT_CHUNK_SIZE:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b''.join(buffer)
+
+
+# Представление, отвечающее за потоковую выгрузку всего каталога товаров
+@extend_schema_view(
+    get=extend_schema(summary='Выгрузка каталога товаров (NDJSON/CSV)', tags=['Товары'],
+                      parameters=[
+                          OpenApiParameter('export_format', str, enum=list(EXPORT_FORMATS),
+                                           description='Формат выгрузки (по умолчанию ndjson)'),
+                      ],
+                      responses={(200, 'application/x-ndjson'): str, (200, 'text/csv'): str}),
+)
+class ProductExportView(APIView):
+    def get(self, request):
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "Неподдерживаемый формат выгрузки"}, status=status.HTTP_400_BAD_REQUEST)
+
+        snapshot = catalog_snapshot_response(request, ExportSnapshotSource(export_format))
+        if snapshot is not None:
+            return snapshot
+
+        lines, content_type, filename = EXPORT_FORMATS[export_format]
+        # База выбирается сейчас: поток читается уже после выхода из
+        # промежуточных слоев, определяющих маршрутизацию запроса.
+        using = router.db_for_read(Product)
+        response = StreamingHttpResponse(lines(using), content_type=f'{content_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
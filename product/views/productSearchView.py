@@ -0,0 +1,54 @@
+from drf_spectacular.utils import extend_schema_view, extend_schema
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
+
+from product.models.productModel import Product
+from product.serializers.fieldsetSerializer import EXPAND_PARAMETER, FIELDS_PARAMETER, SparseFieldset
+from product.serializers.productFilterSerializer import ProductSearchSerializer
+from product.serializers.productSerializer import ProductSerializerRead
+from product.services.productSearch import SearchNotSupported, search_products
+
+# Представление, отвечающее за полнотекстовый поиск товаров
+@extend_schema_view(
+    get=extend_schema(summary='Полнотекстовый поиск товаров', tags=['Товары'],
+                      parameters=[ProductSearchSerializer, FIELDS_PARAMETER, EXPAND_PARAMETER],
+                      responses=ProductSerializerRead(many=True)),
+)
+class ProductSearchView(APIView):
+    def get(self, request):
+        params = ProductSearchSerializer(data=request.query_params)
+        fieldset = SparseFieldset(ProductSerializerRead, request.query_params)
+        if not params.is_valid() or not fieldset.is_valid():
+            return Response({**params.errors, **fieldset.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = params.validated_data['page']
+        page_size = params.validated_data['page_size']
+        try:
+            # Запрашиваем на одну запись больше, чтобы узнать о следующей странице
+            products = search_products(
+                params.validated_data['q'],
+                category_ids=params.validated_data.get('category'),
+                limit=page_size + 1,
+                offset=(page - 1) * page_size,
+                queryset=fieldset.apply(Product.objects.with_category()),
+            )
+        except SearchNotSupported as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        url = request.build_absolute_uri()
+        next_link = replace_query_param(url, 'page', page + 1) if len(products) > page_size else None
+        if page == 1:
+            previous_link = None
+        elif page == 2:
+            previous_link = remove_query_param(url, 'page')
+        else:
+            previous_link = replace_query_param(url, 'page', page - 1)
+
+        serializer = fieldset.get_serializer_class()(products[:page_size], many=True)
+        return Response({
+            'next': next_link,
+            'previous': previous_link,
+            'results': serializer.data,
+        }, status=status.HTTP_200_OK)
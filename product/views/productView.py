@@ -1,10 +1,21 @@
-from drf_spectacular.utils import extend_schema_view, extend_schema
+from django.db import transaction
+from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
 
-from product.serializers.productSerializer import ProductSerializerCreate, ProductSerializerDelete, ProductSerializerRead, ProductSerializerUpdate
+from product.serializers.fastSerializer import read_path
+from product.serializers.fieldsetSerializer import EXPAND_PARAMETER, FIELDS_PARAMETER, SparseFieldset
+from product.serializers.productFilterSerializer import ProductFilterSerializer
+from product.serializers.productSerializer import ProductSerializerBulkCreate, ProductSerializerBulkItem, ProductSerializerBulkUpsert, ProductSerializerBulkUpsertItem, ProductSerializerCreate, ProductSerializerDelete, ProductSerializerRead, ProductSerializerUpdate
+from product.models.catalogChangeModel import CatalogChange
 from product.models.productModel import Product
+from product.pagination.keysetPagination import KeysetPagination
+from product.services.catalogChanges import record_catalog_changes
+from product.services.catalogSnapshot import serve_catalog_snapshot
+from product.services.conditionalUpdate import IF_MATCH_PARAMETER, PreconditionFailed, PreconditionRequired, if_match_versions, object_etag
+from product.services.conditionalGet import conditional_catalog_response
+from product.services.responseCache import cache_catalog_response
 
 # Представление, отвечающее за создание продукта
 @extend_schema_view(
@@ -15,40 +26,107 @@ class ProductCreateView(APIView):
     def post(self, request):
         serializer = ProductSerializerCreate(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "Товар успешно создан"}, status=status.HTTP_201_CREATED)
+            product = serializer.save()
+            return Response({"message": "Товар успешно создан"}, status=status.HTTP_201_CREATED,
+                            headers={'ETag': object_etag(product.version)})
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+# Представление, отвечающее за пакетное создание продуктов
+@extend_schema_view(
+    post=extend_schema(request=ProductSerializerBulkItem(many=True),
+                       summary='Пакетное создание товаров', tags=['Товары']),
+)
+class ProductBulkCreateView(APIView):
+    def post(self, request):
+        serializer = ProductSerializerBulkCreate(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            products = serializer.save()
+            return Response({
+                "message": "Товары успешно созданы",
+                "created": len(products),
+                "ids": [product.id for product in products],
+            }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Представление, отвечающее за предоставление информации о продукте
 @extend_schema_view(
-    get=extend_schema(summary='Получение списка товаров', tags=['Товары']),
+    get=extend_schema(summary='Получение списка товаров', tags=['Товары'],
+                      parameters=[
+                          ProductFilterSerializer,
+                          OpenApiParameter('cursor', str, description='Курсор страницы (из полей next/previous)'),
+                          OpenApiParameter('page_size', int, description='Количество товаров на странице'),
+                          FIELDS_PARAMETER,
+                          EXPAND_PARAMETER,
+                      ]),
 )
 class ProductListView(APIView):
+    @conditional_catalog_response
+    @serve_catalog_snapshot
+    @cache_catalog_response
     def get(self, request):
-        products = Product.objects.all()
-        
-        if not products.exists():
+        filters = ProductFilterSerializer(data=request.query_params)
+        fieldset = SparseFieldset(ProductSerializerRead, request.query_params)
+        if not filters.is_valid() or not fieldset.is_valid():
+            return Response({**filters.errors, **fieldset.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPagination(ordering=filters.keyset_ordering)
+        # Проверка на пустую таблицу совмещена с запросом первой страницы
+        queryset, serialize = read_path(
+            fieldset, filters.filter_queryset(Product.objects.with_category()), required=paginator.ordering,
+            request=request,
+        )
+        products = paginator.paginate_queryset(queryset, request, view=self)
+
+        if not products and paginator.cursor is None and not filters.has_filters:
             return Response({"error": "Товары отсутствуют"}, status=status.HTTP_204_NO_CONTENT)
 
-        serializer = ProductSerializerRead(products, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serialize(products))
 
 # Представление, отвечающее за обновление продукта
 @extend_schema_view(
-    put=extend_schema(request=ProductSerializerUpdate,
+    put=extend_schema(request=ProductSerializerUpdate, parameters=[IF_MATCH_PARAMETER],
                       summary='Обновление товара', tags=['Товары']),
 )
 class ProductUpdateView(APIView):
+    # Товар не загружается: переданные поля записываются одним UPDATE с
+    # проверкой версии из If-Match (см. services/conditionalUpdate.py)
     def put(self, request, pk):
         try:
-            product = Product.objects.get(pk=pk)
+            versions = if_match_versions(request)
+        except PreconditionRequired:
+            return Response({"error": "Требуется заголовок If-Match"}, status=status.HTTP_428_PRECONDITION_REQUIRED)
+
+        serializer = ProductSerializerUpdate(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            version = serializer.update_by_pk(pk, serializer.validated_data, versions)
         except Product.DoesNotExist:
             return Response({"error": "Товар не найден"}, status=status.HTTP_404_NOT_FOUND)
+        except PreconditionFailed as exc:
+            return Response({"error": "Товар был изменен другим запросом"}, status=status.HTTP_412_PRECONDITION_FAILED,
+                            headers={'ETag': object_etag(exc.version)})
+        return Response({"message": "Товар успешно обновлен"}, status=status.HTTP_200_OK,
+                        headers={'ETag': object_etag(version)})
 
-        serializer = ProductSerializerUpdate(product, data=request.data)
+# Представление, отвечающее за пакетное обновление/создание продуктов
+@extend_schema_view(
+    post=extend_schema(request=ProductSerializerBulkUpsertItem(many=True),
+                       summary='Пакетное обновление и создание товаров', tags=['Товары']),
+)
+class ProductBulkUpsertView(APIView):
+    def post(self, request):
+        serializer = ProductSerializerBulkUpsert(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "Товар успешно обновлен"}, status=status.HTTP_200_OK)
+            results = serializer.save()
+            summary = {status_name: 0 for status_name in ('created', 'updated', 'unchanged')}
+            for result in results:
+                summary[result['status']] += 1
+            return Response({
+                "message": "Товары успешно обновлены",
+                "summary": summary,
+                "results": results,
+            }, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Представление, отвечающее за удаление продукта
@@ -59,8 +137,10 @@ class ProductUpdateView(APIView):
 class ProductDeleteView(APIView):
     def delete(self, request, pk):
         try:
-            product = Product.objects.get(pk=pk)
-            product.delete()
+            with transaction.atomic():
+                product = Product.objects.get(pk=pk)
+                product.delete()
+                record_catalog_changes((CatalogChange.PRODUCT, CatalogChange.DELETED, [pk]))
             return Response({"message": "Продукт успешно удален."}, status=status.HTTP_204_NO_CONTENT)
         except Product.DoesNotExist:
             return Response({"error": "Продукт с таким ID не найден."}, status=status.HTTP_404_NOT_FOUND)